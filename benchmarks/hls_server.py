@@ -0,0 +1,193 @@
+"""Benchmark'lar için Kick API'sini ve HLS CDN'ini taklit eden yerel HTTP sunucusu"""
+import json
+import time
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class ServerConfig:
+    """Sunucunun ağ koşullarını ve içerik boyutunu belirler"""
+
+    def __init__(self, segment_count=120, segment_size=256 * 1024, segment_duration=6.0,
+                 latency=0.02, bandwidth=None, error_rate=0.0, seed=1):
+        self.segment_count = segment_count
+        self.segment_size = segment_size
+        self.segment_duration = segment_duration
+        self.latency = latency  # her istek için saniye
+        self.bandwidth = bandwidth  # bağlantı başına bayt/saniye, None = sınırsız
+        self.error_rate = error_rate  # segment isteklerinin 503 dönme olasılığı
+        self.seed = seed
+
+
+VIDEO_ID = "00000000-0000-4000-8000-000000000000"
+
+
+def make_segment(index, size):
+    """Geçerli MPEG-TS senkron baytlarıyla deterministik segment içeriği üretir"""
+    packet = bytes([0x47]) + bytes([index % 256]) * 187
+    return (packet * (size // len(packet) + 1))[:size]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    @property
+    def config(self):
+        return self.server.config
+
+    def do_GET(self):
+        if self.config.latency:
+            time.sleep(self.config.latency)
+
+        path = self.path.split('?')[0]
+        base = f"http://127.0.0.1:{self.server.server_port}"
+
+        if path == f"/api/v1/video/{VIDEO_ID}":
+            body = json.dumps({
+                'source': f"{base}/vod/master.m3u8",
+                'livestream': {
+                    'session_title': "Benchmark Yayını",
+                    'thumbnail': None,
+                    'created_at': "2025-01-01T00:00:00",
+                    'is_live': False,
+                },
+                'streamer': {'username': "bench"},
+            }).encode('utf-8')
+            return self._send(body, "application/json")
+
+        if path == "/vod/master.m3u8":
+            body = (
+                "#EXTM3U\n"
+                "#EXT-X-STREAM-INF:BANDWIDTH=6000000,RESOLUTION=1920x1080\n1080p60/playlist.m3u8\n"
+                "#EXT-X-STREAM-INF:BANDWIDTH=1500000,RESOLUTION=852x480\n480p30/playlist.m3u8\n"
+            ).encode('utf-8')
+            return self._send(body, "application/vnd.apple.mpegurl")
+
+        if path.endswith("/playlist.m3u8"):
+            return self._send(self.server.variant_playlist, "application/vnd.apple.mpegurl")
+
+        if path.endswith(".ts"):
+            try:
+                index = int(path.rsplit('/', 1)[1][:-3])
+            except ValueError:
+                return self._send(b"", code=404)
+            if index >= self.config.segment_count:
+                return self._send(b"", code=404)
+            if self.server.should_fail():
+                return self._send(b"", code=503)
+            return self._send_segment(index)
+
+        return self._send(b"", code=404)
+
+    def _send(self, body, content_type="application/octet-stream", code=200, headers=None):
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_segment(self, index):
+        body = self.server.get_segment(index)
+        code, headers = 200, {}
+
+        # Devam ettirilen indirmeler için Range desteği
+        range_header = self.headers.get("Range")
+        if range_header and range_header.startswith("bytes="):
+            start = int(range_header[6:].split('-')[0] or 0)
+            if start >= len(body):
+                return self._send(b"", code=416, headers={'Content-Range': f"bytes */{len(body)}"})
+            headers['Content-Range'] = f"bytes {start}-{len(body) - 1}/{len(body)}"
+            body, code = body[start:], 206
+
+        self.send_response(code)
+        self.send_header("Content-Type", "video/mp2t")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+
+        if not self.config.bandwidth:
+            self.wfile.write(body)
+            return
+
+        # Bant genişliği sınırı: küçük parçalar halinde, hedef hıza göre bekleyerek gönder
+        chunk_size = 16 * 1024
+        started = time.monotonic()
+        for offset in range(0, len(body), chunk_size):
+            self.wfile.write(body[offset:offset + chunk_size])
+            expected = (offset + chunk_size) / self.config.bandwidth
+            delay = expected - (time.monotonic() - started)
+            if delay > 0:
+                time.sleep(delay)
+
+
+class HLSStandInServer(ThreadingHTTPServer):
+    """Ayrı iş parçacığında çalışan yerel sunucu"""
+    daemon_threads = True
+    # Varsayılan kuyruk (5) aynı anda açılan bağlantılarda SYN düşürür; istemci yerine sunucu ölçülmüş olur
+    request_queue_size = 128
+
+    def __init__(self, config=None, port=0):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.config = config or ServerConfig()
+        self._random = random.Random(self.config.seed)
+        self._random_lock = threading.Lock()
+        self._segments = {}
+        self.variant_playlist = self._build_variant_playlist()
+        self._thread = None
+
+    def _build_variant_playlist(self):
+        # Gerçek VOD'lardaki gibi segment süreleri hafifçe değişir
+        durations_rng = random.Random(self.config.seed)
+        lines = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:3",
+            f"#EXT-X-TARGETDURATION:{int(self.config.segment_duration + 1)}",
+            "#EXT-X-MEDIA-SEQUENCE:0",
+            "#EXT-X-PLAYLIST-TYPE:VOD",
+        ]
+        for index in range(self.config.segment_count):
+            duration = self.config.segment_duration * durations_rng.uniform(0.9, 1.0)
+            lines.append(f"#EXTINF:{duration:.3f},")
+            lines.append(f"{index}.ts")
+        lines.append("#EXT-X-ENDLIST")
+        return ("\n".join(lines) + "\n").encode('utf-8')
+
+    def get_segment(self, index):
+        segment = self._segments.get(index)
+        if segment is None:
+            segment = self._segments[index] = make_segment(index, self.config.segment_size)
+        return segment
+
+    def should_fail(self):
+        if not self.config.error_rate:
+            return False
+        with self._random_lock:
+            return self._random.random() < self.config.error_rate
+
+    def handle_error(self, request, client_address):
+        # İstemcinin iptal ettiği bağlantılar benchmark çıktısını kirletmesin
+        pass
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_port}"
+
+    @property
+    def video_url(self):
+        return f"{self.base_url}/bench/videos/{VIDEO_ID}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
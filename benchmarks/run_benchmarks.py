@@ -0,0 +1,225 @@
+"""KickVOD indirme hattı için tekrarlanabilir benchmark'lar
+
+Yerel bir HLS sunucusu başlatır ve her senaryoyu ayrı bir süreçte gerçek
+get_m3u8_url_from_kick_api -> KickDownloader yolundan geçirir.
+
+    python benchmarks/run_benchmarks.py                    # tüm senaryolar
+    python benchmarks/run_benchmarks.py -s baseline lossy  # seçili senaryolar
+    python benchmarks/run_benchmarks.py --save-baseline    # sonuçları referans olarak kaydet
+    python benchmarks/run_benchmarks.py --compare          # referansla karşılaştır (gerileme varsa çıkış kodu 1)
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(BENCH_DIR), "src")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baselines", "baseline.json")
+
+sys.path.insert(0, BENCH_DIR)
+from hls_server import HLSStandInServer, ServerConfig
+
+
+# server: ServerConfig argümanları, downloader: KickDownloader argümanları, engine: thread/async
+SCENARIOS = {
+    'baseline': {'server': {}, 'downloader': {}},
+    'sequential': {'server': {}, 'downloader': {'max_workers': 1}},
+    'high_latency': {'server': {'latency': 0.15}, 'downloader': {}},
+    'lossy': {'server': {'error_rate': 0.05}, 'downloader': {}},
+    'throttled': {'server': {'bandwidth': 4 * 1024 * 1024}, 'downloader': {}},
+    'streaming': {'server': {}, 'downloader': {'stream_to_muxer': True}},
+    'async': {'server': {}, 'downloader': {}, 'engine': 'async'},
+    'async_high_latency': {'server': {'latency': 0.15}, 'downloader': {}, 'engine': 'async'},
+}
+
+# Karşılaştırmada kullanılan metrikler ve hangi yönün daha iyi olduğu
+COMPARED_METRICS = {
+    'wall_time': 'lower',
+    'ttfb': 'lower',
+    'throughput_mbps': 'higher',
+    'peak_rss_mb': 'lower',
+}
+
+
+def get_peak_rss_mb():
+    """Bu sürecin en yüksek bellek kullanımını MB olarak döndürür"""
+    # ru_maxrss Linux'ta exec sonrası ebeveynin değerini taşıyabilir, VmHWM yeni süreç için sıfırdan başlar
+    try:
+        with open("/proc/self/status", 'r') as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+
+    import resource
+    # Linux'ta KB, macOS'te bayt
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss / (1024 * 1024) if sys.platform == 'darwin' else peak_rss / 1024
+
+
+def run_child(spec):
+    """Alt süreçte tek bir senaryoyu çalıştırır ve metrikleri JSON olarak yazar"""
+    sys.path.insert(0, SRC_DIR)
+    import threading
+    from utils import get_m3u8_url_from_kick_api
+    from services.http_session import PooledSession
+    from services.downloader import KickDownloader
+    from services.async_downloader import AsyncKickDownloader
+
+    session = PooledSession()
+    finished = threading.Event()
+    result = {'completed': False}
+
+    started = time.monotonic()
+    m3u8_url, _ = get_m3u8_url_from_kick_api(spec['video_url'], use_cache=False)
+
+    output_path = os.path.join(spec['work_dir'], "output.mp4")
+    downloader_class = AsyncKickDownloader if spec['engine'] == 'async' else KickDownloader
+    downloader = downloader_class(
+        url=m3u8_url,
+        start_time=0,
+        end_time=spec['duration'],
+        output_path=output_path,
+        progress_callback=lambda value: None,
+        status_callback=lambda message: result.__setitem__('last_status', message),
+        complete_callback=lambda path: result.__setitem__('completed', True),
+        finished_callback=lambda d: finished.set(),
+        session=session,
+        resumable=False,
+        use_cache=False,
+        use_segment_cache=False,
+        **spec['downloader']
+    )
+    downloader.start()
+    finished.wait()
+    wall_time = time.monotonic() - started
+
+    peak_rss_mb = get_peak_rss_mb()
+    total_bytes = spec['segment_count'] * spec['segment_size']
+    result.update({
+        'wall_time': round(wall_time, 3),
+        # İki motor da ilk segment yanıtının başlıklarının geldiği anı kaydeder
+        'ttfb': round(downloader.first_byte_at - started, 3) if downloader.first_byte_at else None,
+        'throughput_mbps': round(total_bytes * 8 / wall_time / 1e6, 2),
+        'peak_rss_mb': round(peak_rss_mb, 1),
+        'bytes': total_bytes,
+        'segments': spec['segment_count'],
+        'retries': downloader.segment_retries,
+        'hedged': downloader.hedged_segments,
+        # asyncio motorunun segment bağlantıları requests oturumundan geçmez, connection_stats içinde sayılır
+        'connections': (downloader.connection_stats if spec['engine'] == 'async' else session.get_stats())['connections'],
+        'stages': downloader.metrics.summary()['stages'],
+    })
+    print(json.dumps(result))
+
+
+def run_scenario(name, scenario, segment_count, segment_size):
+    config = ServerConfig(segment_count=segment_count, segment_size=segment_size, **scenario['server'])
+    server = HLSStandInServer(config).start()
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            spec = {
+                'video_url': server.video_url,
+                'duration': int(segment_count * config.segment_duration),
+                'segment_count': segment_count,
+                'segment_size': segment_size,
+                'downloader': scenario['downloader'],
+                'engine': scenario.get('engine', 'thread'),
+                'work_dir': work_dir,
+            }
+            env = dict(os.environ)
+            env['KICKVOD_API_BASE'] = server.base_url
+            # Önbellekler ve geçici dosyalar kullanıcının dizinine karışmasın
+            env['HOME'] = work_dir
+            env['TMPDIR'] = work_dir
+
+            process = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--child', json.dumps(spec)],
+                capture_output=True, text=True, env=env
+            )
+    finally:
+        server.stop()
+
+    if process.returncode != 0:
+        raise RuntimeError(f"{name} senaryosu başarısız oldu:\n{process.stderr}")
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def compare(results, baseline, tolerance):
+    """Referansa göre tolerans dışı gerilemeleri döndürür"""
+    regressions = []
+    for name, metrics in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        for metric, better in COMPARED_METRICS.items():
+            current, previous = metrics.get(metric), reference.get(metric)
+            if not current or not previous:
+                continue
+            change = (current - previous) / previous
+            if (better == 'lower' and change > tolerance) or (better == 'higher' and -change > tolerance):
+                regressions.append(f"{name}.{metric}: {previous} -> {current} ({change:+.0%})")
+    return regressions
+
+
+def print_table(results):
+    columns = ['wall_time', 'ttfb', 'throughput_mbps', 'peak_rss_mb', 'retries', 'hedged', 'connections']
+    print(f"{'senaryo':<14}" + "".join(f"{column:>17}" for column in columns))
+    for name, metrics in results.items():
+        print(f"{name:<14}" + "".join(f"{str(metrics.get(column)):>17}" for column in columns))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="KickVOD benchmark'ları")
+    parser.add_argument('-s', '--scenario', nargs='*', choices=sorted(SCENARIOS), help="Çalıştırılacak senaryolar")
+    parser.add_argument('--segments', type=int, default=120, help="Senaryo başına segment sayısı")
+    parser.add_argument('--segment-size', type=int, default=256 * 1024, help="Segment boyutu (bayt)")
+    parser.add_argument('--save-baseline', action='store_true', help="Sonuçları referans olarak kaydet")
+    parser.add_argument('--compare', action='store_true', help="Kayıtlı referansla karşılaştır")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="İzin verilen gerileme oranı")
+    parser.add_argument('--json', action='store_true', help="Sonuçları JSON olarak yazdır")
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_child(json.loads(args.child))
+        return 0
+
+    results = {}
+    for name in args.scenario or SCENARIOS:
+        results[name] = run_scenario(name, SCENARIOS[name], args.segments, args.segment_size)
+        if not results[name]['completed']:
+            print(f"Uyarı: {name} tamamlanamadı: {results[name].get('last_status')}", file=sys.stderr)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(BASELINE_PATH), exist_ok=True)
+        with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Referans kaydedildi: {BASELINE_PATH}")
+
+    if args.compare:
+        if not os.path.exists(BASELINE_PATH):
+            print("Kayıtlı referans bulunamadı, önce --save-baseline çalıştırın", file=sys.stderr)
+            return 2
+        with open(BASELINE_PATH, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"GERİLEME {regression}")
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,367 @@
+"""KickVOD komut satırı arayüzü (Flet gerektirmez)
+
+Tek kesit:
+    python src/cli.py https://kick.com/kanal/videos/<id> --start 00:10:00 --end 00:20:00
+
+Toplu indirme (CSV başlıkları veya JSONL alanları: url, start, end, title):
+    python src/cli.py --batch jobs.csv --jobs 3
+
+Aynı URL'ye ait birden fazla aralık tek işte toplanır: API bir kez çözülür, ortak
+segmentler bir kez indirilir ve tüm kesitler tek FFmpeg çağrısıyla üretilir.
+
+Canlı yayın kaydı (--end süre sınırıdır; verilmezse yayın bitene ya da Ctrl+C'ye kadar):
+    python src/cli.py https://kick.com/kanal --live --end 01:00:00
+
+İlerleme stdout'a satır başına bir JSON nesnesi olarak yazılır. Aşama süreleri ve
+segment ölçümleri --metrics-out (JSON satırları) ve --prometheus ile dışa aktarılabilir.
+"""
+import os
+import sys
+import csv
+import json
+import argparse
+import threading
+from datetime import datetime
+from utils import (time_str_to_seconds, extract_video_id, get_m3u8_url_from_kick_api, get_live_m3u8_url,
+                   get_download_path, get_download_directory)
+from services.scheduler import DownloadScheduler, DownloadJob
+from services.downloader import KickDownloader
+from services.quality import QualityPolicy
+from services.ffmpeg_probe import get_ffmpeg
+from services.mux_worker import MuxWorkerPool
+from services.buffer_pool import BufferPool
+from services.metadata_cache import get_metadata_cache
+from services.job_manifest import collect_all_stale_jobs
+from services.metrics import JobMetrics, add_listener, get_registry
+
+
+EXIT_OK = 0
+EXIT_JOB_FAILED = 1
+EXIT_USAGE = 2
+EXIT_INTERRUPTED = 130
+
+
+class JsonLinesReporter:
+    """Olayları stdout'a JSON satırları olarak yazar"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+        self._last_progress = {}
+
+    def emit(self, event, **fields):
+        self.write_event({'event': event, **fields})
+
+    def write_event(self, event):
+        line = json.dumps(event, ensure_ascii=False)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+    def on_progress(self, job, value):
+        # Aynı değer tekrar tekrar yazılmasın
+        if self._last_progress.get(job.job_id) == value:
+            return
+        self._last_progress[job.job_id] = value
+        self.emit('progress', job=job.job_id, progress=value)
+
+    def on_status(self, job, message):
+        self.emit('status', job=job.job_id, message=message)
+
+    def on_state_change(self, job):
+        fields = {'job': job.job_id, 'state': job.state}
+        if job.state == DownloadJob.COMPLETED:
+            fields['output_path'] = job.output_path
+            fields['variant'] = job.variant
+        elif job.state == DownloadJob.FAILED:
+            fields['error'] = job.status
+        self.emit('state', **fields)
+
+
+def parse_time(value):
+    """HH:MM:SS ya da saniye cinsinden zamanı saniyeye çevirir"""
+    value = str(value).strip()
+    if ':' in value:
+        return time_str_to_seconds(value)
+    return int(float(value))
+
+
+def read_batch_file(path):
+    """CSV veya JSONL toplu iş dosyasını okur"""
+    entries = []
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.lower().endswith(('.jsonl', '.ndjson')):
+            for line in f:
+                line = line.strip()
+                if line:
+                    entries.append(json.loads(line))
+        else:
+            entries.extend(csv.DictReader(f))
+
+    jobs = []
+    for number, entry in enumerate(entries, start=1):
+        try:
+            jobs.append({
+                'url': entry['url'].strip(),
+                'start': parse_time(entry['start']),
+                'end': parse_time(entry['end']),
+                'title': (entry.get('title') or '').strip() or None,
+            })
+        except (KeyError, ValueError, AttributeError) as e:
+            raise ValueError(f"{path}: {number}. kayıt geçersiz ({str(e)})")
+    return jobs
+
+
+def group_by_url(entries):
+    """Aynı URL'ye ait kayıtları ilk görülme sırasıyla gruplar"""
+    groups = {}
+    for entry in entries:
+        groups.setdefault(entry['url'], []).append(entry)
+    return list(groups.values())
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="kickvod", description="Kick.com yayın kesiti indirici")
+    parser.add_argument('url', nargs='?', help="Kick.com video sayfası URL'si")
+    parser.add_argument('--start', default="00:00:00", help="Başlangıç (HH:MM:SS veya saniye)")
+    parser.add_argument('--end', help="Bitiş (HH:MM:SS veya saniye)")
+    parser.add_argument('--title', help="İndirilen video için isteğe bağlı başlık")
+    parser.add_argument('--batch', help="Toplu iş dosyası (.csv veya .jsonl)")
+    parser.add_argument('--output-dir', help="Varsayılan indirme klasörü yerine kullanılacak klasör")
+    parser.add_argument('--jobs', type=int, default=DownloadScheduler.DEFAULT_MAX_CONCURRENT_JOBS,
+                        help="Aynı anda çalışacak iş sayısı")
+    parser.add_argument('--segments', type=int, default=DownloadScheduler.DEFAULT_SEGMENT_BUDGET,
+                        help="Tüm işler için toplam eşzamanlı segment isteği")
+    parser.add_argument('--refresh', action='store_true',
+                        help="Önbellekteki API ve playlist verisini yok say ve yeniden al")
+    parser.add_argument('--clear-cache', action='store_true', help="Metadata önbelleğini temizle")
+    parser.add_argument('--live', action='store_true',
+                        help="Kanalın devam eden yayınını kaydet (URL kanal sayfasıdır, --end süre sınırıdır)")
+    parser.add_argument('--quality', default='best',
+                        help="Kalite: best, yükseklik (720p), bit hızı sınırı (<=3mbps) ya da auto[:hedef saniye]")
+    parser.add_argument('--stream', action='store_true',
+                        help="Segmentleri geldikçe FFmpeg'e aktar (geçici disk kullanımı azalır, devam ettirilemez)")
+    parser.add_argument('--engine', choices=['thread', 'async'], default='thread',
+                        help="Segment indirme motoru: iş başına iş parçacıkları ya da paylaşımlı asyncio döngüsü")
+    parser.add_argument('--processes', type=int, default=0,
+                        help="Uzun aralıkları parçalara bölüp bu kadar süreçte indir (0: kapalı)")
+    parser.add_argument('--mux-workers', type=int, default=MuxWorkerPool.DEFAULT_MAX_WORKERS,
+                        help="Aynı anda çalışacak birleştirme/FFmpeg dönüştürme sayısı")
+    parser.add_argument('--memory-budget', type=int, default=BufferPool.DEFAULT_MEMORY_BUDGET // (1024 * 1024),
+                        help="Tüm işlerin segment tamponları için toplam bellek (MB); dolunca indirmeler bekler")
+    parser.add_argument('--metrics-out', help="Aşama ve segment ölçümlerini JSON satırları olarak bu dosyaya yaz")
+    parser.add_argument('--prometheus', help="Toplanan ölçümleri Prometheus metin biçiminde bu dosyaya yaz")
+    return parser
+
+
+def write_prometheus(path):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(get_registry().export_prometheus())
+
+
+def collect_jobs(args, parser):
+    if args.batch:
+        if args.url:
+            parser.error("URL ve --batch birlikte kullanılamaz")
+        if args.live:
+            parser.error("--live ve --batch birlikte kullanılamaz")
+        return read_batch_file(args.batch)
+
+    if args.live:
+        if not args.url:
+            parser.error("--live için kanal URL'si gereklidir")
+        return [{
+            'url': args.url,
+            'start': 0,
+            'end': parse_time(args.end) if args.end else 0,
+            'title': args.title,
+        }]
+
+    if not args.url or not args.end:
+        parser.error("URL ve --end gereklidir (veya --batch kullanın)")
+    return [{
+        'url': args.url,
+        'start': parse_time(args.start),
+        'end': parse_time(args.end),
+        'title': args.title,
+    }]
+
+
+def get_output_path(args, video_info, start, end, title):
+    output_path = get_download_path(video_info, start, end, title)
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+        output_path = os.path.join(args.output_dir, os.path.basename(output_path))
+    return output_path
+
+
+def submit_clip_batch(scheduler, reporter, args, entries, m3u8_url, video_info, metrics, quality):
+    """Aynı VOD'un aralıklarını tek BatchClipDownloader işi olarak kuyruğa ekler"""
+    from services.batch_clipper import BatchClipDownloader
+
+    clips = [{
+        'start': entry['start'],
+        'end': entry['end'],
+        'title': entry['title'],
+        'output_path': get_output_path(args, video_info, entry['start'], entry['end'], entry['title']),
+    } for entry in entries]
+
+    job_ref = {}
+
+    def on_clip(clip, output_path):
+        reporter.emit('clip', job=job_ref['job'].job_id, start=clip['start'], end=clip['end'],
+                      output_path=output_path)
+
+    job = scheduler.submit(
+        m3u8_url, clips[0]['start'], clips[0]['end'], None, video_info,
+        downloader_class=BatchClipDownloader, clips=clips, clip_callback=on_clip,
+        metrics=metrics, quality=quality
+    )
+    job_ref['job'] = job
+    reporter.emit('queued', job=job.job_id, url=entries[0]['url'],
+                  output_paths=[clip['output_path'] for clip in clips])
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        jobs = collect_jobs(args, parser)
+    except (OSError, ValueError) as e:
+        print(f"Hata: {str(e)}", file=sys.stderr)
+        return EXIT_USAGE
+
+    if args.processes > 0 and (args.live or args.stream or args.engine == 'async'):
+        print("Hata: --processes, --live, --stream ve --engine async ile birlikte kullanılamaz", file=sys.stderr)
+        return EXIT_USAGE
+
+    # Canlı kayıt iş parçacığı motoruyla çalışır; async seçimi sessizce yok sayılmasın
+    if args.live and args.engine == 'async':
+        print("Hata: --live ve --engine async birlikte kullanılamaz", file=sys.stderr)
+        return EXIT_USAGE
+
+    # Aynı URL'nin aralıkları tek BatchClipDownloader işinde indirilir; bu seçenekleri desteklemez
+    if (args.stream or args.processes > 0 or args.engine == 'async') and \
+            any(len(group) > 1 for group in group_by_url(jobs)):
+        print("Hata: --stream, --processes ve --engine async aynı URL için birden çok aralık içeren "
+              "toplu işlerle kullanılamaz", file=sys.stderr)
+        return EXIT_USAGE
+
+    if args.engine == 'async':
+        from services.async_http import get_proxy
+        # Async istemci vekil sunucu desteklemez, ortamda tanımlı vekil sessizce atlanmasın
+        if any(get_proxy(entry['url']) for entry in jobs):
+            print("Hata: --engine async vekil sunucu (HTTP_PROXY/HTTPS_PROXY) ile kullanılamaz", file=sys.stderr)
+            return EXIT_USAGE
+
+    try:
+        quality = QualityPolicy.parse(args.quality)
+    except ValueError as e:
+        print(f"Hata: {str(e)}", file=sys.stderr)
+        return EXIT_USAGE
+
+    if args.clear_cache:
+        get_metadata_cache().clear()
+
+    reporter = JsonLinesReporter()
+    # FFmpeg bir kez sorgulanır; işler önbellekteki bilgiyi kullanır
+    reporter.emit('ffmpeg', **get_ffmpeg().describe())
+    # Terk edilmiş yarım indirmelerin geçici dizinlerini temizle (arayüzdeki açılış temizliğiyle aynı)
+    try:
+        removed = collect_all_stale_jobs(args.output_dir or get_download_directory())
+        if removed:
+            reporter.emit('cleanup', removed=len(removed))
+    except OSError as e:
+        print(f"Geçici dizin temizleme hatası: {str(e)}", file=sys.stderr)
+    downloader_class = KickDownloader
+    if args.engine == 'async':
+        from services.async_downloader import AsyncKickDownloader
+        downloader_class = AsyncKickDownloader
+    if args.live:
+        from services.live_recorder import LiveRecorder
+        downloader_class = LiveRecorder
+    elif args.processes > 0:
+        from services.sharded_downloader import ShardedKickDownloader
+        downloader_class = ShardedKickDownloader
+    metrics_file = open(args.metrics_out, 'w', encoding='utf-8') if args.metrics_out else None
+    if metrics_file:
+        add_listener(JsonLinesReporter(metrics_file).write_event)
+    if args.prometheus:
+        get_registry()
+    scheduler = DownloadScheduler(
+        max_concurrent_jobs=args.jobs,
+        segment_budget=args.segments,
+        on_progress=reporter.on_progress,
+        on_status=reporter.on_status,
+        on_state_change=reporter.on_state_change,
+        downloader_class=downloader_class,
+        mux_pool=MuxWorkerPool(args.mux_workers),
+        buffer_pool=BufferPool(args.memory_budget * 1024 * 1024)
+    )
+
+    failed = 0
+    valid = []
+    for entry in jobs:
+        if not args.live and entry['end'] <= entry['start']:
+            reporter.emit('error', url=entry['url'], error="Bitiş zamanı başlangıç zamanından büyük olmalıdır")
+            failed += 1
+            continue
+        valid.append(entry)
+
+    try:
+        for group in group_by_url(valid):
+            entry = group[0]
+            if args.refresh:
+                video_id = extract_video_id(entry['url'])
+                if video_id:
+                    get_metadata_cache().invalidate_video(video_id)
+
+            metrics = JobMetrics(extract_video_id(entry['url']) or entry['url'])
+            try:
+                with metrics.span('api'):
+                    if args.live:
+                        m3u8_url, video_info = get_live_m3u8_url(entry['url'])
+                    else:
+                        m3u8_url, video_info = get_m3u8_url_from_kick_api(entry['url'])
+            except Exception as e:
+                reporter.emit('error', url=entry['url'], error=f"M3U8 URL çıkarılamadı: {str(e)}")
+                failed += 1
+                continue
+
+            if len(group) > 1:
+                submit_clip_batch(scheduler, reporter, args, group, m3u8_url, video_info, metrics, quality)
+                continue
+
+            title = entry['title']
+            if args.live and not title:
+                # Aynı kanalın kayıtları birbirinin üzerine yazılmasın
+                title = f"{video_info['title']} {datetime.now():%Y-%m-%d %H.%M}"
+            output_path = get_output_path(args, video_info, entry['start'], entry['end'], title)
+
+            options = {'stream_to_muxer': args.stream, 'metrics': metrics, 'quality': quality}
+            if args.processes > 0:
+                options['processes'] = args.processes
+            job = scheduler.submit(m3u8_url, entry['start'], entry['end'], output_path, video_info, **options)
+            reporter.emit('queued', job=job.job_id, url=entry['url'], output_path=output_path)
+
+        scheduler.wait()
+    except KeyboardInterrupt:
+        scheduler.cancel_all()
+        scheduler.wait(timeout=10)
+        return EXIT_INTERRUPTED
+    finally:
+        if metrics_file:
+            metrics_file.close()
+        if args.prometheus:
+            write_prometheus(args.prometheus)
+
+    failed += sum(1 for job in scheduler.get_jobs() if job.state != DownloadJob.COMPLETED)
+    stats = [job.downloader.metrics.summary() for job in scheduler.get_jobs() if job.downloader]
+    reporter.emit('summary', total=len(jobs), failed=failed, metrics=stats,
+                  buffers=scheduler.buffer_pool.get_stats())
+    return EXIT_JOB_FAILED if failed else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
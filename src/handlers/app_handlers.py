@@ -1,61 +1,97 @@
 import flet as ft
-from services.downloader import KickDownloader
+from services.scheduler import DownloadScheduler
+from services.job_manifest import collect_all_stale_jobs
+from services.ffmpeg_probe import get_ffmpeg
 from utils import (time_str_to_seconds, get_m3u8_url_from_kick_api, 
                   get_download_directory, get_download_path, 
                   DownloadHistoryManager)
 from ui.components import open_local_file
+from ui.update_dispatcher import UIUpdateDispatcher
 import os
-import json
+import threading
 
 class AppHandlers:
     def __init__(self, page):
         self.page = page
-        self.downloader = None
         self.video_info = None
+        # İndirme iş parçacıklarından gelen ilerleme/durum güncellemeleri kare hızında birleştirilir
+        self.ui_dispatcher = UIUpdateDispatcher(page)
+        self.ui_dispatcher.start()
+        # Birden fazla kesit kuyruğa alınabilir; diyalog en son eklenen işi gösterir
+        self.current_job = None
+        self.scheduler = DownloadScheduler(
+            on_progress=self.update_job_progress,
+            on_status=self.update_job_status,
+            on_complete=self.download_complete
+        )
         # İndirme geçmişi yöneticisini oluştur
         self.history_manager = DownloadHistoryManager(page)
         
-        # Eski dosya tabanlı geçmişi client storage'a taşı
-        self.history_manager.migrate_from_file()
+        # Eski client storage ve dosya tabanlı geçmişi veritabanına taşı
+        self.history_manager.migrate()
+        
+        # Son indirilenler listesi sayfaları geçmiş yöneticisinden kendisi yükler
+        self.recent_downloads = None
         
-        # İndirme geçmişini al
-        self.download_history = self.history_manager.get_history()
+        # FFmpeg arka planda bir kez sorgulanır; ilk dönüştürme sonucu bekler
+        threading.Thread(target=get_ffmpeg, daemon=True).start()
+        
+        # Terk edilmiş yarım indirmelerin geçici dizinlerini temizle
+        try:
+            collect_all_stale_jobs(get_download_directory())
+        except OSError as e:
+            print(f"Geçici dizin temizleme hatası: {str(e)}")
         
     def close_app(self, event):
+        # Yarım kalan işler manifest sayesinde sonraki açılışta devam ettirilebilir
+        self.scheduler.cancel_all()
+        self.ui_dispatcher.stop()
         self.page.window.close()
     
     def minimize_app(self, event):
         self.page.window.minimized = True
         
     def update_progress(self, value):
-        self.progress_bar.value = value / 100
-        self.page.update()
+        self.ui_dispatcher.set(self.progress_bar, 'value', value / 100)
 
     def update_status(self, message):
-        self.status_text.value = message
-        self.page.update()
+        self.ui_dispatcher.set(self.status_text, 'value', message)
 
-    def download_complete(self, output_path):
-        # UI güncelle
-        self.download_button.disabled = False
-        self.cancel_button.disabled = True
-        
-        # İndirme geçmişini kaydet
-        if self.video_info:
-            start_time_seconds = time_str_to_seconds(self.start_time.value)
-            end_time_seconds = time_str_to_seconds(self.end_time.value)
-            # Client storage'a kaydet
-            self.download_history = self.history_manager.save_download(
-                self.video_info, output_path, start_time_seconds, end_time_seconds
+    def update_job_progress(self, job, value):
+        """Sadece diyalogda gösterilen işin ilerlemesi progress bar'a yansır"""
+        if job is self.current_job:
+            self.update_progress(value)
+
+    def update_job_status(self, job, message):
+        if job is self.current_job:
+            self.update_status(self._format_job_status(message))
+
+    def _format_job_status(self, message):
+        """Durum mesajına kuyruktaki iş sayısını ekler"""
+        pending = self.scheduler.pending_count
+        if pending:
+            return f"{message} ({pending} iş sırada)"
+        return message
+
+    def download_complete(self, job, output_path):
+        # İndirme geçmişini kaydet (işin kendi bilgileriyle, form değişmiş olabilir)
+        if job.video_info:
+            # Veritabanına kaydet
+            history_item = self.history_manager.save_download(
+                job.video_info, output_path, job.start_time, job.end_time
             )
             
-            # Son indirilenler listesini güncelle
-            self.update_download_history_ui()
+            # Sadece yeni öğeyi listenin başına ekle
+            if self.recent_downloads:
+                self.recent_downloads.insert(history_item)
         
-        # Diyalog penceresini kapat ve form verilerini sıfırla
-        self.reset_form()
-        self.page.close(self.dlg)
-        self.page.update()
+        # Diyalogdaki iş bittiyse diyalog penceresini kapat ve form verilerini sıfırla
+        if job is self.current_job:
+            self.download_button.disabled = False
+            self.cancel_button.disabled = True
+            self.reset_form()
+            self.page.close(self.dlg)
+            self.page.update()
         
         # Tamamlandı mesajı göster
         self.page.snack_bar = ft.SnackBar(
@@ -65,25 +101,6 @@ class AppHandlers:
         self.page.snack_bar.open = True
         self.page.update()
 
-    def update_download_history_ui(self):
-        """Son indirilenler listesini günceller"""
-        # Eğer indirme listesi container'ı varsa güncelle
-        if hasattr(self, 'downloads_container') and self.downloads_container:
-            from ui.components import create_recent_downloads_list
-            
-            # Client storage'dan güncel geçmişi al
-            self.download_history = self.history_manager.get_history()
-            
-            # Mevcut listeyi temizle ve yenisini oluştur
-            self.downloads_container.content = create_recent_downloads_list(
-                self.download_history, 
-                self.open_file_from_history,
-                self.open_file_in_folder,
-                self.delete_video_file
-            ).content
-            
-            self.page.update()
-    
     def open_file_from_history(self, file_path):
         """Dosyayı geçmişten açar"""
         from ui.components import open_local_file
@@ -103,16 +120,12 @@ class AppHandlers:
             if os.path.exists(file_path):
                 os.remove(file_path)
                 
-            # Geçmişten kaldır
-            history = self.history_manager.get_history()
-            updated_history = [item for item in history if item.get('video_id') != video_id]
+            # Geçmişten sadece bu dosyanın kaydını kaldır (aynı videodan başka kesitler kalabilir)
+            self.history_manager.delete_download(file_path)
             
-            # Güncellenen geçmişi kaydet
-            self.page.client_storage.set(self.history_manager.HISTORY_KEY, json.dumps(updated_history))
-            self.download_history = updated_history
-            
-            # UI'ı güncelle
-            self.update_download_history_ui()
+            # Listeden sadece bu öğeyi çıkar
+            if self.recent_downloads:
+                self.recent_downloads.remove(file_path)
             
             # Bildirim göster
             self.page.show_snack_bar(
@@ -180,22 +193,18 @@ class AppHandlers:
         output_path = get_download_path(video_info, start_time_seconds, end_time_seconds, custom_title)
             
         # Arayüzü güncelle
-        self.download_button.disabled = True
         self.cancel_button.disabled = False
+        self.ui_dispatcher.discard(self.progress_bar)
         self.progress_bar.value = 0
         self.page.update()
         
-        # İndirme işlemini başlat
-        self.downloader = KickDownloader(
-            url=m3u8_url,
-            start_time=start_time_seconds,
-            end_time=end_time_seconds,
-            output_path=output_path,
-            progress_callback=self.update_progress,
-            status_callback=self.update_status,
-            complete_callback=self.download_complete
+        # İşi kuyruğa ekle; eşzamanlı iş sınırı doluysa sırası gelince başlar
+        quality = self.quality_input.value if self.quality_input else None
+        self.current_job = self.scheduler.submit(
+            m3u8_url, start_time_seconds, end_time_seconds, output_path, video_info,
+            quality=quality
         )
-        self.downloader.start()
+        self.update_status(self._format_job_status(self.current_job.status))
 
     def show_error(self, message):
         """Hata mesajı göster"""
@@ -207,16 +216,19 @@ class AppHandlers:
         self.page.update()
 
     def cancel_download(self, e):
+        # Diyalogdaki işi iptal et (kuyruktaki diğer işler devam eder)
+        if self.current_job:
+            self.scheduler.cancel(self.current_job.job_id)
+            self.current_job = None
+        
         # Formu sıfırla ve dialog'u kapat
         self.reset_form()
         self.page.close(self.dlg)
-        
-        if self.downloader:
-            self.downloader.stop()
-            self.update_status("İndirme iptal edildi")
+        self.update_status("İndirme iptal edildi")
         
         self.download_button.disabled = False
         self.cancel_button.disabled = True
+        self.ui_dispatcher.discard(self.progress_bar)
         self.progress_bar.value = 0
         self.page.update()
 
@@ -226,7 +238,7 @@ class AppHandlers:
         
     def set_ui_elements(self, url_input, start_time, end_time, title_input, output_dir_text, 
                        progress_bar, status_text, download_button, cancel_button, 
-                       dlg, downloads_container):
+                       dlg, recent_downloads, quality_input=None):
         """UI elementlerini ayarlar"""
         self.url_input = url_input
         self.start_time = start_time
@@ -238,7 +250,8 @@ class AppHandlers:
         self.download_button = download_button
         self.cancel_button = cancel_button
         self.dlg = dlg
-        self.downloads_container = downloads_container
+        self.recent_downloads = recent_downloads
+        self.quality_input = quality_input
         
         # İndirme klasörünü göster
         self.output_dir_text.value = str(get_download_directory())
@@ -249,7 +262,8 @@ class AppHandlers:
         self.start_time.value = "00:00:00"
         self.end_time.value = "00:30:00"
         self.title_input.value = ""
+        self.ui_dispatcher.discard(self.status_text)
         self.status_text.value = "Hazır"
+        self.ui_dispatcher.discard(self.progress_bar)
         self.progress_bar.value = 0
         self.video_info = None
-        self.downloader = None
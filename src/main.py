@@ -1,6 +1,7 @@
 import flet as ft
 from handlers.app_handlers import AppHandlers
-from ui.components import create_app_bar, create_download_dialog, create_recent_downloads_list
+from ui.components import create_app_bar, create_download_dialog
+from ui.recent_downloads import RecentDownloadsList
 from utils import get_download_directory
 
 def main(page: ft.Page):
@@ -27,9 +28,6 @@ def main(page: ft.Page):
     # Olay işleyicileri oluştur
     handlers = AppHandlers(page)
     
-    # İndirme geçmişini AppHandlers sınıfından al
-    download_history = handlers.download_history
-    
     # UI bileşenlerini tanımla
     url_input = ft.TextField(
         hint_text="https://kick.com/ilkinsan/videos/bd70d614-45cd-4bad-b17c-5f3f13b2161d", 
@@ -38,6 +36,19 @@ def main(page: ft.Page):
     )
     start_time = ft.TextField(label="Başlangıç", value="00:00:00")
     end_time = ft.TextField(label="Bitiş", value="00:30:00")
+    quality_input = ft.Dropdown(
+        label="Kalite",
+        value="best",
+        width=160,
+        options=[
+            ft.dropdown.Option("best", "En iyi"),
+            ft.dropdown.Option("1080p", "1080p"),
+            ft.dropdown.Option("720p", "720p"),
+            ft.dropdown.Option("480p", "480p"),
+            ft.dropdown.Option("360p", "360p"),
+            ft.dropdown.Option("auto", "Otomatik"),
+        ]
+    )
     title_input = ft.TextField(
         hint_text="İndirilen video için isteğe bağlı başlık",
         label="Başlık"
@@ -56,12 +67,13 @@ def main(page: ft.Page):
     dlg = create_download_dialog(
         url_input, start_time, end_time, output_dir_text, title_input, progress_bar, 
         status_text, download_button, cancel_button, 
-        handlers.cancel_download, handlers.start_download, handlers.reset_form
+        handlers.cancel_download, handlers.start_download, handlers.reset_form,
+        quality_input
     )
     
-    # Son indirilenler listesini oluştur
-    downloads_container = create_recent_downloads_list(
-        download_history, 
+    # Son indirilenler listesini oluştur (kaydırdıkça sonraki sayfalar yüklenir)
+    recent_downloads = RecentDownloadsList(
+        handlers.history_manager.get_history, 
         handlers.open_file_from_history,
         handlers.open_file_in_folder,
         handlers.delete_video_file
@@ -70,7 +82,7 @@ def main(page: ft.Page):
     # UI elementlerini işleyiciye bağla
     handlers.set_ui_elements(
         url_input, start_time, end_time, output_dir_text, title_input,  progress_bar, 
-        status_text, download_button, cancel_button, dlg, downloads_container
+        status_text, download_button, cancel_button, dlg, recent_downloads, quality_input
     )
 
     # App bar oluştur
@@ -84,7 +96,7 @@ def main(page: ft.Page):
     )
 
     # Son indirilen videolar listesi ekle
-    page.add(downloads_container)
+    page.add(recent_downloads.control)
 
 
 ft.app(main, assets_dir="assets")
@@ -0,0 +1,380 @@
+import os
+import time
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor, CancelledError
+from urllib.parse import urljoin
+from services.downloader import KickDownloader, get_existing_size, remove_if_exists
+from services.async_http import AsyncHTTPClient, AsyncHTTPError, get_proxy
+from services.retry import SegmentFetchError
+
+
+class _EventLoopThread:
+    """Tüm işlerin segment aktarımlarını çoğullayan tek asyncio döngüsü"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.client = AsyncHTTPClient()
+        self._thread = threading.Thread(target=self._run, name="kickvod-async", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+
+_loop_thread = None
+_orchestrators = None
+_callback_executor = None
+_shared_lock = threading.Lock()
+
+
+def get_event_loop_thread():
+    global _loop_thread
+    with _shared_lock:
+        if _loop_thread is None:
+            _loop_thread = _EventLoopThread()
+        return _loop_thread
+
+
+def get_orchestrator_pool():
+    """Playlist, birleştirme ve FFmpeg gibi engelleyen adımlar için sınırlı iş parçacığı havuzu"""
+    global _orchestrators
+    with _shared_lock:
+        if _orchestrators is None:
+            _orchestrators = ThreadPoolExecutor(
+                max_workers=AsyncKickDownloader.ORCHESTRATOR_WORKERS, thread_name_prefix="kickvod-job"
+            )
+        return _orchestrators
+
+
+def get_callback_executor():
+    """Durum, ilerleme ve metrik geri çağrılarını sırasıyla çalıştıran tek iş parçacığı"""
+    global _callback_executor
+    with _shared_lock:
+        if _callback_executor is None:
+            _callback_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kickvod-callback")
+        return _callback_executor
+
+
+class AsyncKickDownloader(KickDownloader):
+    """KickDownloader ile aynı arayüz; segmentler paylaşımlı tek asyncio döngüsünde indirilir"""
+    ORCHESTRATOR_WORKERS = 8
+    # Zamanlayıcının iş parçacığı semaforu beklenirken döngü bloklanmaz, kısa aralıklarla yoklanır
+    BUDGET_POLL_INTERVAL = 0.02
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._segments_task = None
+        self._client_stats = None
+
+    def start(self):
+        self.is_running = True
+        self._stop_event.clear()
+        # İş başına ayrı iş parçacığı açılmaz, paylaşımlı havuz kullanılır
+        get_orchestrator_pool().submit(self._run)
+
+    def stop(self, discard=False):
+        super().stop(discard)
+        # Bekleyen tüm segment görevleri CancelledError ile sonlanır; sonuç temizlik bitince döner
+        task = self._segments_task
+        if task is not None:
+            get_event_loop_thread().loop.call_soon_threadsafe(task.cancel)
+
+    def _diff_stats(self, before, after):
+        stats = super()._diff_stats(before, after)
+        # Segment istekleri requests oturumundan değil asyncio istemcisinden geçer
+        for key, value in (self._client_stats or {}).items():
+            stats[key] = stats.get(key, 0) + value
+        return stats
+
+    def _download_segments(self, segments, base_url, on_segment_done=None):
+        """Segmentleri paylaşımlı olay döngüsünde indirir ve dosya yollarını sırasıyla döndürür"""
+        total = len(segments)
+        self.status_callback(f"Toplam {total} segment indirilecek...")
+
+        segment_urls = [
+            segment.uri if segment.uri.startswith('http') else urljoin(base_url, segment.uri)
+            for segment in segments
+        ]
+        segment_files = [None] * total
+        # İstemci vekil sunucu desteklemez; doğrudan bağlanıp vekili sessizce atlamak yerine iş durdurulur
+        if segment_urls and get_proxy(segment_urls[0]):
+            raise Exception("Async motor vekil sunucu desteklemez; --engine thread kullanın")
+
+        loop_thread = get_event_loop_thread()
+        stats_before = loop_thread.client.get_stats()
+        if self.segment_cache:
+            self.segment_cache.pin(segment_urls)
+        try:
+            future = loop_thread.submit(
+                self._download_all(loop_thread.client, segment_urls, segment_files, on_segment_done)
+            )
+            try:
+                future.result()
+            except CancelledError:
+                pass
+        finally:
+            if self.segment_cache:
+                self.segment_cache.unpin(segment_urls)
+        self._client_stats = self._diff_stats_only(stats_before, loop_thread.client.get_stats())
+
+        if self.is_running:
+            self.failed_segments = sum(1 for segment_file in segment_files if segment_file is None)
+
+        return [segment_file for segment_file in segment_files if segment_file]
+
+    @staticmethod
+    def _diff_stats_only(before, after):
+        return {key: after[key] - before[key] for key in after}
+
+    async def _download_all(self, client, segment_urls, segment_files, on_segment_done):
+        # stop() bu görevi döngü iş parçacığından iptal eder
+        self._segments_task = asyncio.current_task()
+        if not self.is_running:
+            return
+        total = len(segment_urls)
+        state = {'completed': 0}
+        # Geri basınç: havadaki istek sayısı sınırlı, görevler sırası gelince oluşturulur
+        in_flight = asyncio.Semaphore(self.max_in_flight)
+
+        async def download(index, segment_url):
+            try:
+                if self.is_running:
+                    segment_files[index] = await self._download_segment_async(client, index, segment_url)
+            except Exception as e:
+                # Tek segmentin beklenmeyen hatası diğer görevleri düşürmesin, nedeni raporlansın
+                await self._call(self._report_segment_error, index, e)
+            finally:
+                in_flight.release()
+                if on_segment_done:
+                    await self._call(on_segment_done, index, segment_files[index])
+                state['completed'] += 1
+                if self.is_running:
+                    completed = state['completed']
+                    await self._call(self.status_callback, f"Segment indiriliyor {completed}/{total}...")
+                    await self._call(self.progress_callback, int((completed / total) * 50))
+
+        tasks = []
+        try:
+            for index, segment_url in enumerate(segment_urls):
+                if not self.is_running:
+                    break
+                await in_flight.acquire()
+                tasks.append(asyncio.ensure_future(download(index, segment_url)))
+            await asyncio.gather(*tasks)
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            self._segments_task = None
+
+    async def _call(self, callback, *args, **kwargs):
+        """Geri çağrıyı döngü dışında çalıştırır; arayüz güncellemesi diğer işlerin aktarımını bekletmez"""
+        future = asyncio.get_running_loop().run_in_executor(
+            get_callback_executor(), functools.partial(callback, *args, **kwargs)
+        )
+        # Görev iptal edilse de geri çağrı yarıda kalmaz (akış yazıcısı segment bildirimini bekler)
+        return await asyncio.shield(future)
+
+    async def _acquire_budget(self):
+        """Zamanlayıcının paylaşımlı segment bütçesinden pay alır"""
+        if not self.segment_semaphore:
+            return True
+        while not self.segment_semaphore.acquire(blocking=False):
+            if not self.is_running:
+                return False
+            await asyncio.sleep(self.BUDGET_POLL_INTERVAL)
+        return True
+
+    async def _acquire_hedge_slot_async(self, primary):
+        """Yedek istek için bütçeden yer alır; asıl istek bu arada biterse False döndürür"""
+        if not self.segment_semaphore:
+            return True
+        while not self.segment_semaphore.acquire(blocking=False):
+            if not self.is_running:
+                return False
+            # Asıl istek biterse beklemeyi bırak
+            done, _ = await asyncio.wait({primary}, timeout=self.BUDGET_POLL_INTERVAL)
+            if done:
+                return False
+        return True
+
+    async def _acquire_buffer(self):
+        """Paylaşımlı tampon havuzundan tampon alır; iş durdurulursa None döndürür"""
+        buffer = self.buffer_pool.try_acquire()
+        while buffer is None and self.is_running:
+            await asyncio.sleep(self.BUDGET_POLL_INTERVAL)
+            # Aynı bekleme istatistikte bir kez sayılır
+            buffer = self.buffer_pool.try_acquire(count_wait=False)
+        return buffer
+
+    async def _download_segment_async(self, client, index, segment_url):
+        """_download_segment'in asyncio karşılığı: önbellek, devam, tekrar deneme ve yedek istek"""
+        if not await self._acquire_budget():
+            return None
+        try:
+            return await self._download_segment_body(client, index, segment_url)
+        finally:
+            if self.segment_semaphore:
+                self.segment_semaphore.release()
+
+    async def _download_segment_body(self, client, index, segment_url):
+        segment_file = os.path.join(self.temp_dir, f"segment_{index:05d}.ts")
+        started = time.monotonic()
+
+        # Kayıt adımları iş parçacığı motoruyla ortaktır; diske dokundukları için döngü dışında çalışır
+        source, size = await asyncio.to_thread(self._find_local_segment, segment_url, segment_file)
+        if source:
+            await self._call(
+                self.metrics.record_segment, index, size, self._local_latency(source, started), source=source
+            )
+            return segment_file
+
+        for attempt in range(self.retry_policy.max_retries + 1):
+            if not self.is_running:
+                return None
+            try:
+                part_file, hedged = await self._fetch_segment_hedged_async(client, segment_url, segment_file)
+            except SegmentFetchError as e:
+                if not await self._call(self._handle_fetch_error, index, attempt, e, started):
+                    return None
+                await asyncio.sleep(self.retry_policy.get_delay(attempt))
+                continue
+
+            if part_file is None:
+                return None
+
+            size = await asyncio.to_thread(self._commit_segment, segment_url, part_file, segment_file)
+            await self._call(
+                self.metrics.record_segment, index, size, time.monotonic() - started,
+                retries=attempt, hedged=hedged
+            )
+            return segment_file
+
+        return None
+
+    async def _fetch_segment_hedged_async(self, client, segment_url, segment_file):
+        """Segment p95 süresini aşarsa yedek istek gönderir; kaybeden görev iptal edilir"""
+        primary_part = segment_file + ".part"
+        threshold = self.latency_tracker.percentile(self.HEDGE_PERCENTILE) if self.hedge_requests else None
+        primary = asyncio.ensure_future(
+            self._fetch_to_part_async(client, segment_url, primary_part, bool(self.manifest))
+        )
+        if threshold is None:
+            return await primary, False
+
+        pending = {primary}
+        error = None
+        try:
+            done, _ = await asyncio.wait(pending, timeout=threshold)
+            if done:
+                return primary.result(), False
+
+            # Yedek istek de paylaşımlı segment bütçesinden yer alır
+            if not await self._acquire_hedge_slot_async(primary):
+                return await primary, False
+            with self._stats_lock:
+                self.hedged_segments += 1
+            hedge = asyncio.ensure_future(
+                self._fetch_to_part_async(client, segment_url, segment_file + ".hedge.part", False)
+            )
+            if self.segment_semaphore:
+                hedge.add_done_callback(lambda task: self.segment_semaphore.release())
+            pending.add(hedge)
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    try:
+                        part_file = task.result()
+                    except SegmentFetchError as e:
+                        error = e
+                        continue
+                    if part_file:
+                        return part_file, True
+        finally:
+            # Geride kalan istek iptal edilir, yarım dosyası silinir
+            pending = [task for task in pending if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        if error:
+            raise error
+        return None, True
+
+    async def _fetch_to_part_async(self, client, segment_url, part_file, resume):
+        """Segmenti parça dosyasına indirir; iptal edilirse yarım dosyayı siler"""
+        # Havuzda boş tampon yoksa istek gönderilmeden, döngü bloklanmadan beklenir
+        buffer = await self._acquire_buffer()
+        if buffer is None:
+            return None
+        try:
+            return await self._fetch_with_buffer(client, segment_url, part_file, resume, memoryview(buffer))
+        finally:
+            self.buffer_pool.release(buffer)
+
+    async def _fetch_with_buffer(self, client, segment_url, part_file, resume, view):
+        resume_from = await asyncio.to_thread(get_existing_size, part_file) if resume else 0
+        request_headers = {'Range': f"bytes={resume_from}-"} if resume_from else None
+
+        started = time.monotonic()
+        try:
+            response = await client.get(segment_url, headers=request_headers, timeout=self.timeout)
+        except AsyncHTTPError as e:
+            raise SegmentFetchError(str(e))
+        if self.first_byte_at is None:
+            self.first_byte_at = time.monotonic()
+
+        async with response:
+            status_code = response.status_code
+            mode = self._get_write_mode(status_code, resume_from)
+            if mode is None:
+                raise await asyncio.to_thread(self._reject_response, status_code, part_file)
+
+            # Açma ve yazma iş parçacığında yapılır; yavaş disk diğer işlerin aktarımını bekletmez
+            f = await asyncio.to_thread(open, part_file, mode)
+            try:
+                if not await self._write_body(response, f, view):
+                    return None
+            except AsyncHTTPError as e:
+                raise SegmentFetchError(str(e))
+            except asyncio.CancelledError:
+                f.close()
+                # Devam ettirilebilir işlerde asıl isteğin yarım dosyası saklanır
+                if not resume:
+                    await asyncio.shield(asyncio.to_thread(remove_if_exists, part_file))
+                raise
+            finally:
+                # Tampon _write_body sonunda boşaltıldığı için kapatma diske yazma beklemez
+                f.close()
+
+        self.latency_tracker.record(time.monotonic() - started)
+        return part_file
+
+    async def _write_body(self, response, f, view):
+        """Gövdeyi tampona toplayıp dolunca iş parçacığında diske yazar; iş durdurulursa False döndürür"""
+        filled = 0
+        async for chunk in response.iter_content(self.chunk_size):
+            if not self.is_running:
+                return False
+            if filled + len(chunk) > len(view):
+                await asyncio.to_thread(f.write, view[:filled])
+                filled = 0
+            if len(chunk) >= len(view):
+                await asyncio.to_thread(f.write, chunk)
+                continue
+            view[filled:filled + len(chunk)] = chunk
+            filled += len(chunk)
+        if filled:
+            await asyncio.to_thread(f.write, view[:filled])
+        await asyncio.to_thread(f.flush)
+        return True
@@ -0,0 +1,247 @@
+import ssl
+import asyncio
+import threading
+from urllib.parse import urlsplit, urljoin
+from requests.utils import get_environ_proxies, select_proxy
+from services.http_session import DEFAULT_HEADERS
+
+
+class AsyncHTTPError(Exception):
+    """Bağlantı, zaman aşımı ya da bozuk yanıt hatası"""
+
+
+def get_proxy(url):
+    """Ortam değişkenlerinde (HTTP(S)_PROXY, NO_PROXY) bu adres için tanımlı vekil sunucu; yoksa None"""
+    return select_proxy(url, get_environ_proxies(url))
+
+
+class AsyncResponse:
+    """Gövdesi parça parça okunan HTTP yanıtı; bitince bağlantı havuza döner"""
+
+    def __init__(self, client, key, reader, writer, status_code, headers, read_timeout):
+        self.client = client
+        self.status_code = status_code
+        self.headers = headers
+        self._key = key
+        self._reader = reader
+        self._writer = writer
+        self._read_timeout = read_timeout
+        self._chunked = 'chunked' in headers.get('transfer-encoding', '').lower()
+        length = headers.get('content-length')
+        self._remaining = int(length) if length is not None and not self._chunked else None
+        # Uzunluğu belirsiz gövde bağlantı kapanana kadar okunur, bağlantı tekrar kullanılamaz
+        self._reusable = (
+            (self._chunked or self._remaining is not None)
+            and headers.get('connection', '').lower() != 'close'
+        )
+        self._finished = False
+
+    async def _read(self, coroutine):
+        try:
+            return await asyncio.wait_for(coroutine, self._read_timeout)
+        except asyncio.TimeoutError:
+            raise AsyncHTTPError("Okuma zaman aşımı")
+        except (OSError, asyncio.IncompleteReadError) as e:
+            raise AsyncHTTPError(f"Bağlantı hatası: {str(e)}")
+
+    async def iter_content(self, chunk_size):
+        """Gövdeyi en fazla chunk_size baytlık parçalar halinde döndürür"""
+        if self._chunked:
+            async for chunk in self._iter_chunked(chunk_size):
+                yield chunk
+        elif self._remaining is not None:
+            while self._remaining > 0:
+                chunk = await self._read(self._reader.read(min(chunk_size, self._remaining)))
+                if not chunk:
+                    raise AsyncHTTPError("Yanıt beklenenden kısa")
+                self._remaining -= len(chunk)
+                yield chunk
+        else:
+            while True:
+                chunk = await self._read(self._reader.read(chunk_size))
+                if not chunk:
+                    break
+                yield chunk
+        self._finished = True
+
+    async def _iter_chunked(self, chunk_size):
+        while True:
+            size_line = await self._read(self._reader.readline())
+            try:
+                size = int(size_line.split(b';')[0].strip(), 16)
+            except ValueError:
+                raise AsyncHTTPError("Bozuk chunked yanıt")
+            if size == 0:
+                # Sondaki başlıkları ve boş satırı tüket
+                while (await self._read(self._reader.readline())) not in (b"\r\n", b"\n", b""):
+                    pass
+                return
+            while size > 0:
+                chunk = await self._read(self._reader.read(min(chunk_size, size)))
+                if not chunk:
+                    raise AsyncHTTPError("Yanıt beklenenden kısa")
+                size -= len(chunk)
+                yield chunk
+            await self._read(self._reader.readline())
+
+    async def read(self):
+        return b"".join([chunk async for chunk in self.iter_content(64 * 1024)])
+
+    def release(self):
+        """Gövde tamamen okunduysa bağlantıyı havuza, değilse kapatır"""
+        if self._writer is None:
+            return
+        if self._finished and self._reusable:
+            self.client._release(self._key, self._reader, self._writer)
+        else:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.release()
+
+
+class AsyncHTTPClient:
+    """Keep-alive bağlantı havuzlu, sadece GET destekleyen küçük asyncio HTTP/1.1 istemcisi
+
+    Vekil sunucu ve sıkıştırılmış gövde desteklemez; gövde her zaman olduğu gibi istenir."""
+    DEFAULT_MAX_IDLE_PER_HOST = 32
+    MAX_REDIRECTS = 5
+
+    def __init__(self, headers=None, max_idle_per_host=DEFAULT_MAX_IDLE_PER_HOST):
+        self.headers = dict(DEFAULT_HEADERS if headers is None else headers)
+        self.max_idle_per_host = max_idle_per_host
+        # (şema, host, port) -> boşta bekleyen (reader, writer) listesi
+        self._idle = {}
+        self._ssl_context = None
+        self._stats = {'requests': 0, 'connections': 0, 'reused': 0}
+        self._stats_lock = threading.Lock()
+
+    def get_stats(self):
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _count(self, key):
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    async def get(self, url, headers=None, timeout=(10, 30)):
+        """GET isteği gönderir; yanıt gövdesi iter_content ile okunmalı ve release edilmelidir"""
+        for _ in range(self.MAX_REDIRECTS + 1):
+            response = await self._request(url, headers, timeout)
+            location = response.headers.get('location')
+            if response.status_code in (301, 302, 303, 307, 308) and location:
+                await response.read()
+                response.release()
+                url = urljoin(url, location)
+                continue
+            encoding = response.headers.get('content-encoding', 'identity').lower()
+            if encoding != 'identity':
+                response.release()
+                raise AsyncHTTPError(f"Desteklenmeyen içerik kodlaması: {encoding}")
+            return response
+        raise AsyncHTTPError("Çok fazla yönlendirme")
+
+    async def _request(self, url, headers, timeout):
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise AsyncHTTPError(f"Desteklenmeyen şema: {parts.scheme}")
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        key = (parts.scheme, parts.hostname, port)
+        path = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+
+        request_headers = dict(self.headers)
+        request_headers.update(headers or {})
+        request_headers['Host'] = parts.hostname if port in (80, 443) else f"{parts.hostname}:{port}"
+        request_headers.setdefault('Connection', 'keep-alive')
+        # Gövde açılmadan diske yazılır, sunucunun sıkıştırma yapmaması istenir
+        request_headers['Accept-Encoding'] = 'identity'
+        request = f"GET {path} HTTP/1.1\r\n" + "".join(
+            f"{name}: {value}\r\n" for name, value in request_headers.items()
+        ) + "\r\n"
+
+        connect_timeout, read_timeout = timeout
+        self._count('requests')
+        # Havuzdaki bağlantı sunucu tarafından kapatılmış olabilir, bir kez yeni bağlantıyla dene
+        while True:
+            reader, writer, reused = await self._acquire(key, connect_timeout)
+            try:
+                writer.write(request.encode('latin-1'))
+                await asyncio.wait_for(writer.drain(), read_timeout)
+                status_code, response_headers = await asyncio.wait_for(
+                    self._read_head(reader), read_timeout
+                )
+            except (OSError, asyncio.IncompleteReadError, AsyncHTTPError) as e:
+                writer.close()
+                if reused:
+                    continue
+                raise AsyncHTTPError(f"Bağlantı hatası: {str(e)}")
+            except asyncio.TimeoutError:
+                writer.close()
+                raise AsyncHTTPError("Okuma zaman aşımı")
+            except BaseException:
+                writer.close()
+                raise
+            return AsyncResponse(self, key, reader, writer, status_code, response_headers, read_timeout)
+
+    async def _read_head(self, reader):
+        status_line = await reader.readline()
+        if not status_line:
+            raise AsyncHTTPError("Sunucu bağlantıyı kapattı")
+        try:
+            status_code = int(status_line.split()[1])
+        except (IndexError, ValueError):
+            raise AsyncHTTPError(f"Geçersiz durum satırı: {status_line[:80]!r}")
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        return status_code, headers
+
+    async def _acquire(self, key, connect_timeout):
+        idle = self._idle.get(key)
+        while idle:
+            reader, writer = idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                self._count('reused')
+                return reader, writer, True
+            writer.close()
+
+        scheme, host, port = key
+        ssl_context = None
+        if scheme == 'https':
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            ssl_context = self._ssl_context
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port, ssl=ssl_context,
+                                        server_hostname=host if ssl_context else None),
+                connect_timeout
+            )
+        except asyncio.TimeoutError:
+            raise AsyncHTTPError(f"Bağlantı zaman aşımı: {host}")
+        except OSError as e:
+            raise AsyncHTTPError(f"Bağlantı kurulamadı: {str(e)}")
+        self._count('connections')
+        return reader, writer, False
+
+    def _release(self, key, reader, writer):
+        idle = self._idle.setdefault(key, [])
+        if len(idle) >= self.max_idle_per_host:
+            writer.close()
+            return
+        idle.append((reader, writer))
+
+    def close(self):
+        for connections in self._idle.values():
+            for _, writer in connections:
+                writer.close()
+        self._idle.clear()
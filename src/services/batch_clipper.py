@@ -0,0 +1,173 @@
+import os
+import hashlib
+from services.downloader import KickDownloader, preallocate
+from services.job_manifest import get_job_key
+from services.timeline import SegmentTimeline
+from services.ffmpeg_probe import get_ffmpeg
+from utils import seconds_to_time_str
+
+
+class BatchClipDownloader(KickDownloader):
+    """Tek VOD'dan birden fazla kesit: segmentlerin birleşimi bir kez indirilir, tek FFmpeg çağrısıyla kesilir
+
+    clips: [{'start': saniye, 'end': saniye, 'output_path': yol, 'title': isteğe bağlı}]
+    clip_callback(clip, output_path) her kesit dosyası hazır olduğunda çağrılır.
+    """
+
+    def __init__(self, url, start_time, end_time, output_path, progress_callback, status_callback,
+                 complete_callback, clips=None, clip_callback=None, **kwargs):
+        if not clips:
+            raise ValueError("En az bir kesit gereklidir")
+        # Her kesit kendi dosyasına yazılır, tek bir FFmpeg akışına aktarılamaz
+        kwargs['stream_to_muxer'] = False
+        self.clips = sorted((dict(clip) for clip in clips), key=lambda clip: clip['start'])
+        self.clip_callback = clip_callback
+        start_time = min(clip['start'] for clip in self.clips)
+        end_time = max(clip['end'] for clip in self.clips)
+        output_path = output_path or self.clips[0]['output_path']
+        super().__init__(url, start_time, end_time, output_path, progress_callback, status_callback,
+                         complete_callback, **kwargs)
+
+        # Aynı kesit listesi her seferinde aynı iş dizinini kullanır (devam ettirme için)
+        signature = hashlib.sha1(
+            "|".join(f"{clip['start']}-{clip['end']}" for clip in self.clips).encode('utf-8')
+        ).hexdigest()[:8]
+        self.job_key = get_job_key(
+            f"{self.video_id or url}|{signature}", start_time, end_time, self.quality.describe(), output_path
+        )
+        if 'metrics' not in kwargs or kwargs['metrics'] is None:
+            self.metrics.job_id = self.job_key
+        # Birleşimin ardışık parçaları: {'positions': [...], 'start': saniye}
+        self.spans = []
+        self.output_paths = []
+
+    def _calculate_segments(self, playlist):
+        """Tüm kesitlerin kapsadığı segmentlerin birleşimini hesaplar"""
+        timeline = SegmentTimeline(playlist.segments, playlist.target_duration or 6)
+        total_duration = timeline.total_duration
+
+        needed = set()
+        valid_clips = []
+        for clip in self.clips:
+            if clip['start'] >= total_duration:
+                self.status_callback(f"Uyarı: {seconds_to_time_str(int(clip['start']))} yayın süresinden sonra, kesit atlandı.")
+                continue
+            if clip['end'] > total_duration:
+                clip['end'] = total_duration
+            first, last = timeline.find_range(clip['start'], clip['end'])
+            clip['segments'] = (first, last)
+            needed.update(range(first, last))
+            valid_clips.append(clip)
+        self.clips = valid_clips
+
+        union = sorted(needed)
+        # Birleşimdeki sıra -> playlist indeksi; ardışık indeksler aynı parçaya düşer
+        position_of = {index: position for position, index in enumerate(union)}
+        self.spans = []
+        for position, index in enumerate(union):
+            if not self.spans or index != union[position - 1] + 1:
+                self.spans.append({'positions': [], 'first_index': index, 'start': timeline.segment_start(index)})
+            self.spans[-1]['positions'].append(position)
+
+        for clip in self.clips:
+            first_position = position_of[clip['segments'][0]]
+            clip['span'] = next(
+                number for number, span in enumerate(self.spans) if first_position in span['positions']
+            )
+            clip['trim_start'] = max(0.0, clip['start'] - self.spans[clip['span']]['start'])
+            clip['duration'] = max(0.0, clip['end'] - clip['start'])
+
+        shared = sum(clip['segments'][1] - clip['segments'][0] for clip in self.clips) - len(union)
+        if shared > 0:
+            self.status_callback(f"{len(self.clips)} kesit için {len(union)} segment indirilecek ({shared} segment ortak).")
+        return [playlist.segments[index] for index in union], union[0] if union else 0
+
+    def _merge_segments(self, segment_files):
+        """Ardışık parçaları birleştirir ve tüm kesitleri tek FFmpeg çağrısıyla üretir; iptal edildiyse False döndürür"""
+        self.status_callback("Segmentler birleştiriliyor...")
+        self.progress_callback(60)
+
+        span_paths = []
+        with self.metrics.span('concat'):
+            for number, span in enumerate(self.spans):
+                span_path = os.path.join(self.temp_dir, f"span_{number:03d}.ts")
+                files = [segment_files[position] for position in span['positions']]
+                with open(span_path, 'wb') as outfile:
+                    preallocate(outfile, sum(os.path.getsize(path) for path in files))
+                    for path in files:
+                        with open(path, 'rb') as infile:
+                            self.buffer_pool.copy(infile, outfile)
+                span_paths.append(span_path)
+        self.progress_callback(70)
+
+        for number, clip in enumerate(self.clips):
+            clip['output_path'] = os.path.splitext(clip['output_path'])[0] + '.mp4'
+            clip['staged_path'] = os.path.join(self.temp_dir, f"clip_{number:03d}.mp4")
+
+        ffmpeg = get_ffmpeg()
+        if ffmpeg.available:
+            self.status_callback(f"{len(self.clips)} kesit MP4 formatına dönüştürülüyor...")
+            converted = self._run_ffmpeg(ffmpeg, span_paths)
+            if self.stop_requested:
+                self.status_callback("İndirme iptal edildi.")
+                return False
+            if not converted:
+                self.status_callback("Dönüştürme başarısız, kesitler TS formatında kaydediliyor...")
+                self._write_ts_clips(segment_files)
+        else:
+            self.status_callback("FFmpeg bulunamadı. TS formatında kaydediliyor...")
+            self._write_ts_clips(segment_files)
+
+        self.output_paths = []
+        for clip in self.clips:
+            self._move_into_place(clip['staged_path'], clip['output_path'])
+            self.output_paths.append(clip['output_path'])
+            if self.clip_callback:
+                self.clip_callback(clip, clip['output_path'])
+
+        self.output_path = self.output_paths[0]
+        self.progress_callback(90)
+        self.status_callback("İşlem tamamlandı!")
+        self.progress_callback(100)
+        return True
+
+    def _run_ffmpeg(self, ffmpeg, span_paths):
+        """Her parça bir girdi, her kesit bir çıktı olacak şekilde tek FFmpeg süreci çalıştırır"""
+        cmd = ffmpeg.command()
+        for span_path in span_paths:
+            cmd += ['-i', span_path]
+        for clip in self.clips:
+            cmd += [
+                '-map', str(clip['span']),
+                '-ss', f"{clip['trim_start']:.3f}",
+                '-t', f"{clip['duration']:.3f}",
+                '-c:v', 'copy',
+                *ffmpeg.audio_codec_args(),
+                '-y',
+                clip['staged_path'],
+            ]
+
+        try:
+            with self.metrics.span('mux', clips=len(self.clips)):
+                process = self._run_ffmpeg_process(cmd)
+        except OSError as e:
+            self.status_callback(f"Dönüştürme hatası: {str(e)}")
+            return False
+        if process.returncode != 0:
+            self.status_callback(f"Dönüştürme hatası: {process.stderr[-500:]}")
+            return False
+        return all(os.path.exists(clip['staged_path']) for clip in self.clips)
+
+    def _write_ts_clips(self, segment_files):
+        """FFmpeg olmadan her kesitin segmentlerini kendi dosyasına ekler (kesim segment sınırındadır)"""
+        union_position = {}
+        for span in self.spans:
+            for offset, position in enumerate(span['positions']):
+                union_position[span['first_index'] + offset] = position
+
+        for clip in self.clips:
+            first, last = clip['segments']
+            with open(clip['staged_path'], 'wb') as outfile:
+                for index in range(first, last):
+                    with open(segment_files[union_position[index]], 'rb') as infile:
+                        self.buffer_pool.copy(infile, outfile)
@@ -0,0 +1,108 @@
+import threading
+from contextlib import contextmanager
+
+
+class BufferPool:
+    """Segment verisi için sabit boyutlu, tekrar kullanılan tampon havuzu
+
+    Tüm işlerin indirme ve yazma adımları aynı havuzu paylaşır; toplam bellek
+    memory_budget ile sınırlıdır. Havuz boşsa tampon isteyen taraf bekler.
+    """
+    DEFAULT_BUFFER_SIZE = 256 * 1024
+    DEFAULT_MEMORY_BUDGET = 32 * 1024 * 1024
+    # İptal isteği bu aralıklarla kontrol edilir
+    ACQUIRE_POLL_INTERVAL = 0.1
+
+    def __init__(self, memory_budget=DEFAULT_MEMORY_BUDGET, buffer_size=DEFAULT_BUFFER_SIZE):
+        self.buffer_size = max(1, int(buffer_size))
+        self.capacity = max(1, int(memory_budget) // self.buffer_size)
+        # Tamponlar ihtiyaç oldukça oluşturulur ve serbest listesinde saklanır
+        self._free = []
+        self._allocated = 0
+        self._in_use = 0
+        self._stats = {'peak': 0, 'waits': 0}
+        self._condition = threading.Condition()
+
+    @property
+    def memory_budget(self):
+        return self.capacity * self.buffer_size
+
+    def acquire(self, cancel_event=None):
+        """Boş tampon döndürür; havuz doluysa bekler, cancel_event set edilirse None döndürür"""
+        with self._condition:
+            buffer = self._take()
+            if buffer is None:
+                self._stats['waits'] += 1
+            while buffer is None:
+                if cancel_event is not None and cancel_event.is_set():
+                    return None
+                self._condition.wait(self.ACQUIRE_POLL_INTERVAL)
+                buffer = self._take()
+            return buffer
+
+    def try_acquire(self, count_wait=True):
+        """Beklemeden tampon döndürür; havuz doluysa None (asyncio döngüsü için)"""
+        with self._condition:
+            buffer = self._take()
+            if buffer is None and count_wait:
+                self._stats['waits'] += 1
+            return buffer
+
+    def _take(self):
+        if self._free:
+            buffer = self._free.pop()
+        elif self._allocated < self.capacity:
+            buffer = bytearray(self.buffer_size)
+            self._allocated += 1
+        else:
+            return None
+        self._in_use += 1
+        self._stats['peak'] = max(self._stats['peak'], self._in_use)
+        return buffer
+
+    def release(self, buffer):
+        with self._condition:
+            self._in_use -= 1
+            self._free.append(buffer)
+            self._condition.notify()
+
+    @contextmanager
+    def lease(self, cancel_event=None):
+        buffer = self.acquire(cancel_event)
+        try:
+            yield buffer
+        finally:
+            if buffer is not None:
+                self.release(buffer)
+
+    def copy(self, infile, outfile):
+        """Dosya içeriğini havuzdan alınan tamponla kopyalar (okuma başına yeni bayt nesnesi oluşmaz)"""
+        with self.lease() as buffer:
+            view = memoryview(buffer)
+            while True:
+                count = infile.readinto(buffer)
+                if not count:
+                    break
+                outfile.write(view[:count])
+
+    def get_stats(self):
+        with self._condition:
+            return {
+                'capacity': self.capacity,
+                'buffer_size': self.buffer_size,
+                'allocated': self._allocated,
+                'in_use': self._in_use,
+                **self._stats,
+            }
+
+
+_buffer_pool = None
+_buffer_pool_lock = threading.Lock()
+
+
+def get_buffer_pool():
+    global _buffer_pool
+    with _buffer_pool_lock:
+        if _buffer_pool is None:
+            _buffer_pool = BufferPool()
+        return _buffer_pool
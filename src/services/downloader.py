@@ -1,16 +1,47 @@
 import os
+import time
 import threading
-import tempfile
+import socket
 import shutil
-import requests
 import m3u8
+import requests
+from urllib3.exceptions import HTTPError as TransportError
 import subprocess
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait, FIRST_COMPLETED
 from urllib.parse import urljoin
 from utils import seconds_to_time_str
+from services.http_session import get_session
+from services.timeline import SegmentTimeline
+from services.job_manifest import JobManifest, get_job_key, get_job_dir, get_staging_root, create_temp_dir, remove_staging_root
+from services.stream_muxer import StreamMuxer, MuxError, is_ffmpeg_available
+from services.ffmpeg_probe import get_ffmpeg
+from services.buffer_pool import BufferPool, get_buffer_pool
+from services.metadata_cache import get_metadata_cache
+from services.segment_cache import get_segment_cache
+from services.retry import RetryPolicy, LatencyTracker, SegmentFetchError, RETRYABLE_STATUS_CODES
+from services.metrics import JobMetrics
+from services.quality import QualityPolicy, describe_variant, measure_throughput
 
 
 class KickDownloader:
-    def __init__(self, url, start_time, end_time, output_path, progress_callback, status_callback, complete_callback):
+    DEFAULT_MAX_WORKERS = 8
+    DEFAULT_CONNECT_TIMEOUT = 10
+    DEFAULT_READ_TIMEOUT = 30
+    # Bu yüzdelik dilimden uzun süren segment için yedek istek gönderilir
+    HEDGE_PERCENTILE = 0.95
+    # Yedek istek segment bütçesinde yer beklerken asıl isteğin bitip bitmediği bu aralıkla kontrol edilir
+    HEDGE_SLOT_POLL_INTERVAL = 0.05
+    # Disk alanı kontrolünde tahmine eklenen pay
+    DISK_SPACE_MARGIN = 64 * 1024 * 1024
+    
+    def __init__(self, url, start_time, end_time, output_path, progress_callback, status_callback, complete_callback,
+                 max_workers=DEFAULT_MAX_WORKERS, max_in_flight=None, session=None,
+                 chunk_size=None, video_id=None, resumable=True,
+                 segment_semaphore=None, finished_callback=None, stream_to_muxer=False,
+                 use_cache=True, use_segment_cache=True, retry_policy=None,
+                 connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT,
+                 hedge_requests=True, metrics=None, quality=None, mux_pool=None, download_done_callback=None,
+                 buffer_pool=None):
         self.url = url
         self.start_time = start_time  # saniye cinsinden
         self.end_time = end_time  # saniye cinsinden
@@ -19,250 +50,946 @@ class KickDownloader:
         self.status_callback = status_callback
         self.complete_callback = complete_callback
         self.is_running = False
+        self.completed = False
+        self.stop_requested = False
         self.thread = None
         self.temp_dir = None
+        # Birleştirilmiş TS içindeki kesim noktaları (_calculate_segments tarafından ayarlanır)
+        self.trim_start = 0.0
+        self.trim_duration = None
+        # Eşzamanlı segment indirme ayarları (max_workers=1 sıralı indirme demektir)
+        self.max_workers = max(1, int(max_workers))
+        self.max_in_flight = max(1, int(max_in_flight or self.max_workers))
+        # Tüm istekler keep-alive havuzlu paylaşımlı oturumdan geçer
+        self.session = session or get_session()
+        self.connection_stats = None
+        # Aynı VOD'dan art arda kesit alınırken playlist'ler tekrar indirilip ayrıştırılmaz
+        self.metadata_cache = get_metadata_cache() if use_cache else None
+        # Çakışan kesitler önceki işlerin indirdiği segmentleri yeniden kullanır
+        self.segment_cache = get_segment_cache() if use_segment_cache else None
+        # Devam ettirilebilir indirme: aynı VOD ve aralık her zaman aynı iş dizinini kullanır
+        self.video_id = video_id
+        # Akış modunda segmentler FFmpeg'e aktarıldıktan sonra silindiği için devam ettirilemez
+        self.stream_to_muxer = stream_to_muxer
+        self.resumable = resumable and not stream_to_muxer
+        self.variant_url = None
+        # Kalite politikası (varsayılan: en yüksek bit hızı); seçilen varyant işin metadata'sında gösterilir
+        self.quality = QualityPolicy.parse(quality)
+        self.job_key = get_job_key(video_id or url, start_time, end_time, self.quality.describe(), output_path)
+        self.selected_variant = None
+        self.manifest = None
+        # Zamanlayıcı tarafından birden fazla iş arasında paylaşılan segment bütçesi
+        self.segment_semaphore = segment_semaphore
+        # Başarılı, hatalı ya da iptal edilmiş her durumda iş bitince çağrılır
+        self.finished_callback = finished_callback
+        # Hatalı segmentler üstel geri çekilme ile yeniden denenir, yavaş olanlar için yedek istek atılır
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.timeout = (connect_timeout, read_timeout)
+        self.hedge_requests = hedge_requests
+        self.latency_tracker = LatencyTracker()
+        self.failed_segments = 0
+        # Segment indirirken oluşan ilk beklenmeyen hata (disk dolu, dosya taşınamadı vb.)
+        self.segment_error = None
+        self.segment_retries = 0
+        self.hedged_segments = 0
+        # İlk segment yanıtının başlıklarının geldiği an (time.monotonic)
+        self.first_byte_at = None
+        self._stats_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._hedge_executor = None
+        # Yedek yarışındaki isteklerin yanıtları; kaybedenin bağlantısı kapatılır
+        self._hedge_responses = {}
+        # Aşama süreleri ve segment ölçümleri dinleyicilere/dışa aktarıma açılır
+        self.metrics = metrics or JobMetrics(self.job_key)
+        # Verilirse birleştirme/dönüştürme bu havuzda yapılır, indirme iş parçacığı beklemez
+        self.mux_pool = mux_pool
+        # Segmentler inip iş dönüştürme sırasına girdiğinde çağrılır
+        self.download_done_callback = download_done_callback
+        # Segment verisi tüm işlerin paylaştığı, bellek bütçesiyle sınırlı tampon havuzundan geçer;
+        # farklı chunk_size isteyen iş kendi havuzunu kullanır
+        if buffer_pool is None:
+            buffer_pool = get_buffer_pool()
+            if chunk_size is not None and int(chunk_size) != buffer_pool.buffer_size:
+                buffer_pool = BufferPool(buffer_pool.memory_budget, buffer_size=chunk_size)
+        elif chunk_size is not None and int(chunk_size) != buffer_pool.buffer_size:
+            raise ValueError("chunk_size, buffer_pool tampon boyutuyla aynı olmalıdır")
+        self.buffer_pool = buffer_pool
+        # Segment gövdeleri havuzdaki tampon boyutunda parçalar halinde diske yazılır
+        self.chunk_size = buffer_pool.buffer_size
+        self._mux_process = None
 
     def start(self):
         self.is_running = True
-        self.thread = threading.Thread(target=self._download_process)
+        self._stop_event.clear()
+        self.thread = threading.Thread(target=self._run)
         self.thread.daemon = True
         self.thread.start()
 
-    def stop(self):
+    def stop(self, discard=False):
         self.is_running = False
-        if self.temp_dir and os.path.exists(self.temp_dir):
+        self.stop_requested = True
+        self._stop_event.set()
+        # Dönüştürme aşamasındaysa FFmpeg beklenmeden sonlandırılır
+        process = self._mux_process
+        if process and process.poll() is None:
+            process.kill()
+        # Devam ettirilebilir işlerde inmiş segmentler sonraki deneme için saklanır
+        if (discard or not self.resumable) and self.temp_dir and os.path.exists(self.temp_dir):
             try:
                 shutil.rmtree(self.temp_dir)
             except:
                 pass
 
+    def _run(self):
+        deferred = False
+        try:
+            deferred = self._download_process()
+        finally:
+            # Dönüştürme havuza devredildiyse iş orada biter
+            if not deferred:
+                self._finish()
+
+    def _finish(self):
+        self.is_running = False
+        if self.finished_callback:
+            self.finished_callback(self)
+
     def _download_process(self):
         try:
             self.status_callback("Yayın bilgileri alınıyor...")
 
-            # M3U8 içeriğini alma
-            headers = self._get_request_headers()
-            
-            response = requests.get(self.url, headers=headers)
-            if response.status_code != 200:
-                self.status_callback(f"Hata: Yayın bilgileri alınamadı. Durum kodu: {response.status_code}")
-                return
+            stats_before = self.session.get_stats()
 
-            # M3U8 verilerini analiz et
-            try:
-                master_playlist = m3u8.loads(response.text)
-            except Exception as e:
-                self.status_callback(f"M3U8 ayrıştırma hatası: {str(e)}")
-                return
+            with self.metrics.span('playlist'):
+                # M3U8 içeriğini alma
+                status_code, playlist_text = self._fetch_playlist(self.url)
+                if status_code != 200:
+                    self.status_callback(f"Hata: Yayın bilgileri alınamadı. Durum kodu: {status_code}")
+                    return
 
-            # Alt playlist ve base URL'yi al
-            playlist, base_url = self._process_playlist(master_playlist, headers)
-            
-            # Segmentleri kontrol et
-            if not playlist.segments:
-                self.status_callback("Hata: Yayın segmentleri bulunamadı. Playlist içeriği: " + response.text[:200])
-                return
+                # M3U8 verilerini analiz et
+                try:
+                    master_playlist = self._parse_playlist(self.url, playlist_text)
+                except Exception as e:
+                    self.status_callback(f"M3U8 ayrıştırma hatası: {str(e)}")
+                    return
 
-            # Geçici dizin oluştur
-            self.temp_dir = tempfile.mkdtemp()
+                # Alt playlist ve base URL'yi al
+                playlist, base_url = self._process_playlist(master_playlist)
             
+                # Segmentleri kontrol et
+                if not playlist.segments:
+                    self.status_callback("Hata: Yayın segmentleri bulunamadı. Playlist içeriği: " + playlist_text[:200])
+                    return
+
             # İndirilecek segmentleri hesapla
-            segments_to_download, segment_duration = self._calculate_segments(playlist)
+            segments_to_download, first_segment_index = self._calculate_segments(playlist)
             
             if not segments_to_download:
                 self.status_callback("Hata: İndirilebilecek segment bulunamadı.")
                 return
 
-            # Segmentleri indir
-            segment_files = self._download_segments(segments_to_download, base_url, headers)
+            # Geçici dizin oluştur (devam ettirilebilir işlerde önceki denemenin dizini)
+            self._prepare_temp_dir()
             
-            if not self.is_running:
-                self.status_callback("İndirme iptal edildi.")
+            # Yer yetmeyecekse indirmeye hiç başlama
+            if not self._check_disk_space(segments_to_download):
                 return
+
+            if self.stream_to_muxer:
+                # İndirme ve dönüştürme aynı anda: segmentler geldikçe FFmpeg'e aktarılır
+                with self.metrics.span('stream', segments=len(segments_to_download)):
+                    streamed = self._download_and_stream(segments_to_download, base_url)
+                if not streamed:
+                    return
+                self.connection_stats = self._diff_stats(stats_before, self.session.get_stats())
+            else:
+                # Segmentleri indir
+                with self.metrics.span('segments', segments=len(segments_to_download)):
+                    segment_files = self._download_segments(segments_to_download, base_url)
                 
-            if not segment_files:
-                self.status_callback("Hata: Hiçbir segment indirilemedi.")
-                return
+                if not self.is_running:
+                    self.status_callback("İndirme iptal edildi.")
+                    return
                 
-            # Segmentleri birleştir
-            self._merge_segments(segment_files)
-            
-            # Tamamlandı bilgisini gönder
-            self.complete_callback(self.output_path)
+                # Eksik segmentle kesit oluşturulmaz; devam ettirilebilir işler sonraki denemede tamamlanır
+                if self.failed_segments:
+                    if self.segment_error:
+                        self.status_callback(f"Hata: {self.failed_segments} segment indirilemedi ({self.segment_error})")
+                    else:
+                        self.status_callback(f"Hata: {self.failed_segments} segment tekrar denemelere rağmen indirilemedi.")
+                    return
+                    
+                if not segment_files:
+                    self.status_callback("Hata: Hiçbir segment indirilemedi.")
+                    return
+                    
+                self.connection_stats = self._diff_stats(stats_before, self.session.get_stats())
+                
+                if self.mux_pool:
+                    # Birleştirme ayrı aşamada; indirme yuvası bir sonraki işe bırakılır
+                    return self._submit_mux(segment_files)
+                
+                # Segmentleri birleştir
+                if not self._merge_segments(segment_files):
+                    return
             
-            # Geçici dosyaları temizle
-            self._cleanup_temp_files()
+            self._complete()
             
         except Exception as e:
             self.status_callback(f"Beklenmeyen hata: {str(e)}")
             self.progress_callback(0)
     
-    def _get_request_headers(self):
-        """İstek başlıklarını döndürür"""
-        return {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': '*/*',
-            'Accept-Language': 'tr-TR,tr;q=0.9,en-US;q=0.8,en;q=0.7',
-            'Origin': 'https://kick.com',
-            'Referer': 'https://kick.com/'
-        }
-    
-    def _process_playlist(self, master_playlist, headers):
+    def _complete(self):
+        # Tamamlandı bilgisini gönder
+        self.completed = True
+        self.complete_callback(self.output_path)
+        
+        # Geçici dosyaları temizle
+        self._cleanup_temp_files()
+    
+    def _submit_mux(self, segment_files):
+        """İşi dönüştürme havuzuna devreder; devredildiyse True döndürür"""
+        self.status_callback("Dönüştürme sırası bekleniyor...")
+        # Havuz doluysa burada beklenir; indirme yuvası bırakılmadığı için yeni iş başlamaz
+        if not self.mux_pool.acquire(self._stop_event):
+            self.status_callback("İndirme iptal edildi.")
+            return False
+        if self.download_done_callback:
+            self.download_done_callback(self)
+        self.mux_pool.submit(self._mux_stage, segment_files)
+        return True
+    
+    def _mux_stage(self, segment_files):
+        """Dönüştürme havuzunda çalışır: birleştirir, tamamlar ve işi bitirir"""
+        try:
+            if not self.is_running:
+                self.status_callback("İndirme iptal edildi.")
+                return
+            if self._merge_segments(segment_files):
+                self._complete()
+        except Exception as e:
+            self.status_callback(f"Beklenmeyen hata: {str(e)}")
+            self.progress_callback(0)
+        finally:
+            self._finish()
+    
+    def _prepare_temp_dir(self):
+        """Geçici dizini ve devam ettirilebilir işler için manifesti hazırlar"""
+        # Hazırlık dizini çıktıyla aynı dosya sisteminde olursa son dosya kopyalanmadan taşınır
+        output_dir = os.path.dirname(os.path.abspath(self.output_path))
+        os.makedirs(output_dir, exist_ok=True)
+        if not self.resumable:
+            self.temp_dir = create_temp_dir(output_dir)
+            return
+        
+        self.temp_dir = get_job_dir(self.job_key, get_staging_root(output_dir))
+        self.manifest = JobManifest.load_or_create(
+            self.temp_dir, self.video_id, self.start_time, self.end_time, self.variant_url
+        )
+        if self.manifest.completed_count:
+            self.status_callback(f"Önceki denemeden {self.manifest.completed_count} segment devam ettiriliyor...")
+    
+    def _estimate_clip_bytes(self, segments):
+        """Seçilen varyantın bit hızı ve segment sürelerinden kesitin yaklaşık boyutu"""
+        bandwidth = (self.selected_variant or {}).get('bandwidth')
+        if not bandwidth:
+            return None
+        duration = sum(segment.duration or 0 for segment in segments)
+        return int(bandwidth / 8 * duration)
+    
+    def _check_disk_space(self, segments):
+        """Tahmini gereken alan yoksa hata bildirir ve False döndürür"""
+        estimated = self._estimate_clip_bytes(segments)
+        if not estimated:
+            return True
+        
+        # Akış modunda segmentler yazıldıkça silinir; normal modda segmentler, birleşik TS ve çıktı aynı anda durur
+        required = estimated * (1 if self.stream_to_muxer else 3) + self.DISK_SPACE_MARGIN
+        try:
+            free = shutil.disk_usage(self.temp_dir).free
+        except OSError:
+            return True
+        
+        if free < required:
+            self.status_callback(
+                f"Hata: Yetersiz disk alanı. Gereken yaklaşık {required / 1024 ** 3:.2f} GB, "
+                f"boş {free / 1024 ** 3:.2f} GB."
+            )
+            if not self.resumable:
+                self._cleanup_temp_files()
+            return False
+        return True
+    
+    def _diff_stats(self, before, after):
+        """Bu iş süresince yapılan istek ve açılan bağlantı sayılarını hesaplar"""
+        # Paylaşımlı oturumda diğer işlerin istekleri de sayılabilir, değerler yaklaşıktır
+        return {key: after[key] - before[key] for key in after}
+    
+    def _process_playlist(self, master_playlist):
         """Master playlist işleme ve alt playlist elde etme"""
         if master_playlist.is_variant:
-            # Master playlist ise, en yüksek kaliteyi seç
-            playlists = sorted(master_playlist.playlists, 
-                              key=lambda x: x.stream_info.bandwidth if x.stream_info else 0, 
-                              reverse=True)
+            # Master playlist ise, kalite politikasına göre seç
+            variant = self.quality.select(
+                master_playlist.playlists,
+                clip_duration=max(0, self.end_time - self.start_time),
+                probe=lambda: self._probe_throughput(master_playlist.playlists)
+            )
             
-            if not playlists:
+            if not variant:
                 raise Exception("Uygun yayın kalitesi bulunamadı.")
             
-            # En yüksek kaliteyi içeren playlist URL'sini al
-            variant_url = playlists[0].uri
-            
-            # URL'yi normalize et (göreceli ise tam URL'ye çevir)
-            if not variant_url.startswith('http'):
-                base_url = '/'.join(self.url.split('/')[:-1]) + '/'
-                variant_url = urljoin(base_url, variant_url)
+            variant_url = self._resolve_variant_url(variant)
+            self.selected_variant = describe_variant(variant, variant_url)
+            if self.quality.mode != QualityPolicy.BEST:
+                self.status_callback(f"Seçilen kalite: {self.selected_variant['name']}")
             
             # Alt playlist'i indir
             self.status_callback("Alt playlist indiriliyor...")
-            variant_response = requests.get(variant_url, headers=headers)
-            if variant_response.status_code != 200:
-                raise Exception(f"Alt playlist alınamadı. Durum kodu: {variant_response.status_code}")
+            status_code, variant_text = self._fetch_playlist(variant_url)
+            if status_code != 200:
+                raise Exception(f"Alt playlist alınamadı. Durum kodu: {status_code}")
             
             # Alt playlist'i analiz et
-            playlist = m3u8.loads(variant_response.text)
+            playlist = self._parse_playlist(variant_url, variant_text)
+            self.variant_url = variant_url
             base_url = '/'.join(variant_url.split('/')[:-1]) + '/'
         else:
             # Zaten segment playlist'i ise
             playlist = master_playlist
             base_url = '/'.join(self.url.split('/')[:-1]) + '/'
+            self.variant_url = self.url
+            self.selected_variant = {'url': self.url, 'name': None, 'bandwidth': None, 'resolution': None, 'height': None}
         
         return playlist, base_url
     
-    def _calculate_segments(self, playlist):
-        """İndirilecek segmentleri hesaplar"""
-        # Her segmentin süresini tespit et (ortalama)
-        segment_duration = playlist.target_duration or 6  # varsayılan 6 saniye
+    def _resolve_variant_url(self, variant):
+        """Göreceli varyant URL'sini tam URL'ye çevirir"""
+        if variant.uri.startswith('http'):
+            return variant.uri
+        base_url = '/'.join(self.url.split('/')[:-1]) + '/'
+        return urljoin(base_url, variant.uri)
+    
+    def _probe_throughput(self, variants):
+        """En düşük kalitenin kesit başındaki ilk segmentleriyle indirme hızını ölçer (bayt/saniye)"""
+        lowest = min(variants, key=lambda x: x.stream_info.bandwidth if x.stream_info else 0)
+        variant_url = self._resolve_variant_url(lowest)
+        self.status_callback("Bağlantı hızı ölçülüyor...")
+        try:
+            status_code, text = self._fetch_playlist(variant_url)
+            if status_code != 200:
+                return None
+            playlist = self._parse_playlist(variant_url, text)
+            timeline = SegmentTimeline(playlist.segments, playlist.target_duration or 6)
+            first, _ = timeline.find_range(min(self.start_time, timeline.total_duration), self.end_time)
+            base_url = '/'.join(variant_url.split('/')[:-1]) + '/'
+            segment_urls = [
+                segment.uri if segment.uri.startswith('http') else urljoin(base_url, segment.uri)
+                for segment in playlist.segments[first:first + QualityPolicy.PROBE_SEGMENTS]
+            ]
+        except Exception as e:
+            self.status_callback(f"Hız ölçümü yapılamadı: {str(e)}")
+            return None
+        # Ölçüm az sayıda paralel istekle yapılır, gerçek indirme daha hızlı olabilir (temkinli tahmin)
+        return measure_throughput(self.session, segment_urls, self.timeout)
+    
+    def _fetch_playlist(self, url):
+        """Playlist metnini önbellekten ya da ağdan alır, (durum kodu, metin) döndürür"""
+        if self.metadata_cache:
+            cached = self.metadata_cache.get(url)
+            if cached is not None:
+                return 200, cached
         
-        # Hesaplanan segment indekslerini bul
-        total_segments = len(playlist.segments)
-        total_duration = total_segments * segment_duration
+        response = self.session.get(url, timeout=self.timeout)
+        if response.status_code == 200 and self.metadata_cache:
+            # ENDLIST içeren playlist bitmiş bir yayına aittir, değişmez
+            self.metadata_cache.set(
+                url, response.text,
+                immutable='#EXT-X-ENDLIST' in response.text,
+                video_id=self.video_id
+            )
+        return response.status_code, response.text
+    
+    def _parse_playlist(self, url, text):
+        """Playlist'i ayrıştırır, aynı içerik daha önce ayrıştırıldıysa onu kullanır"""
+        if self.metadata_cache:
+            return self.metadata_cache.get_parsed(url, text, m3u8.loads)
+        return m3u8.loads(text)
+    
+    def _calculate_segments(self, playlist):
+        """İndirilecek segmentleri EXTINF sürelerine göre hesaplar"""
+        # Segment süreleri farklı olabilir, kümülatif zaman indeksi oluştur
+        timeline = SegmentTimeline(playlist.segments, playlist.target_duration or 6)
+        total_duration = timeline.total_duration
         
         # Zaman aralığını kontrol et
         if self.end_time > total_duration:
             self.end_time = total_duration
-            self.status_callback(f"Uyarı: Bitiş zamanı yayın süresinden uzun. {seconds_to_time_str(total_duration)} olarak ayarlandı.")
+            self.status_callback(f"Uyarı: Bitiş zamanı yayın süresinden uzun. {seconds_to_time_str(int(total_duration))} olarak ayarlandı.")
         
-        # Segment indekslerini hesapla
-        start_segment = min(int(self.start_time / segment_duration), total_segments - 1)
-        end_segment = min(int(self.end_time / segment_duration), total_segments)
+        # Aralığı kapsayan ilk ve son segmenti ikili arama ile bul
+        start_segment, end_segment = timeline.find_range(self.start_time, self.end_time)
+        
+        # FFmpeg'in ilk segmentin başından itibaren keseceği kesin süreler
+        self.trim_start = max(0.0, self.start_time - timeline.segment_start(start_segment))
+        self.trim_duration = max(0.0, self.end_time - self.start_time)
         
         segments_to_download = playlist.segments[start_segment:end_segment]
         
-        return segments_to_download, segment_duration
+        return segments_to_download, start_segment
+    
+    def _download_segments(self, segments, base_url, on_segment_done=None):
+        """Segmentleri eşzamanlı indirir ve dosya yollarını playlist sırasıyla döndürür"""
+        return self._download_segment_urls(self._get_segment_urls(segments, base_url), on_segment_done)
+    
+    @staticmethod
+    def _get_segment_urls(segments, base_url):
+        """Göreceli segment URL'lerini tam URL'ye dönüştürür"""
+        return [
+            segment.uri if segment.uri.startswith('http') else urljoin(base_url, segment.uri)
+            for segment in segments
+        ]
     
-    def _download_segments(self, segments, base_url, headers):
-        """Segmentleri indirir ve dosya yollarını döndürür"""
-        self.status_callback(f"Toplam {len(segments)} segment indirilecek...")
-        segment_files = []
+    def _download_segment_urls(self, segment_urls, on_segment_done=None):
+        total = len(segment_urls)
+        self.status_callback(f"Toplam {total} segment indirilecek...")
+        
+        segment_files = [None] * total
+        state = {'completed': 0}
+        lock = threading.Lock()
+        # Aynı anda havada olabilecek istek sayısını sınırla
+        in_flight = threading.BoundedSemaphore(self.max_in_flight)
+        
+        def download(index, segment_url):
+            try:
+                if self.is_running:
+                    segment_files[index] = self._download_segment_with_budget(index, segment_url)
+            except Exception as e:
+                # Havuzdaki iş parçacığında oluşan hata sonuçla birlikte kaybolmasın
+                self._report_segment_error(index, e)
+            finally:
+                in_flight.release()
+                if on_segment_done:
+                    on_segment_done(index, segment_files[index])
+                with lock:
+                    state['completed'] += 1
+                    completed = state['completed']
+                if self.is_running:
+                    # İlerleme tamamlanan segment sayısına göre raporlanır
+                    self.status_callback(f"Segment indiriliyor {completed}/{total}...")
+                    self.progress_callback(int((completed / total) * 50))
+        
+        # İş sürerken kullandığı segmentler önbellekten tahliye edilmesin
+        if self.segment_cache:
+            self.segment_cache.pin(segment_urls)
+        if self.hedge_requests:
+            # Asıl ve yedek istekler ayrı bir havuzda çalışır, böylece bekleme süresi sınırlanabilir
+            self._hedge_executor = ThreadPoolExecutor(max_workers=self.max_workers * 2)
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for i, segment_url in enumerate(segment_urls):
+                    if not self.is_running:
+                        break
+                    
+                    in_flight.acquire()
+                    executor.submit(download, i, segment_url)
+        finally:
+            if self._hedge_executor:
+                # Kaybeden istekler bağlantıları kapatıldığı için kendiliğinden biter, beklenmez
+                self._hedge_executor.shutdown(wait=False, cancel_futures=True)
+                self._hedge_executor = None
+            if self.segment_cache:
+                self.segment_cache.unpin(segment_urls)
         
-        for i, segment in enumerate(segments):
+        if self.is_running:
+            self.failed_segments = sum(1 for segment_file in segment_files if segment_file is None)
+        
+        # Sıralama korunur; başarısız segment varsa çağıran taraf işi durdurur
+        return [segment_file for segment_file in segment_files if segment_file]
+    
+    def _report_segment_error(self, index, error):
+        """Tekrar denemeyle çözülmeyen beklenmeyen segment hatasını bildirir; ilki iş sonucunda gösterilir"""
+        message = f"Segment {index + 1}: {str(error) or error.__class__.__name__}"
+        with self._stats_lock:
+            if self.segment_error is None:
+                self.segment_error = message
+        self.status_callback(f"Segment indirme hatası: {message}")
+        self.metrics.record_segment(index, 0, 0.0, ok=False)
+    
+    def _download_segment_with_budget(self, index, segment_url):
+        """Paylaşımlı segment bütçesi varsa ondan pay alarak segmenti indirir"""
+        if not self.segment_semaphore:
+            return self._download_segment(index, segment_url)
+        
+        with self.segment_semaphore:
             if not self.is_running:
-                break
-            
-            segment_url = segment.uri
-            if not segment_url.startswith('http'):
-                # Göreceli URL'yi tam URL'ye dönüştür
-                segment_url = urljoin(base_url, segment_url)
-            
-            segment_file = os.path.join(self.temp_dir, f"segment_{i:05d}.ts")
+                return None
+            return self._download_segment(index, segment_url)
+    
+    def _download_segment(self, index, segment_url):
+        """Tek bir segmenti gerekirse yeniden deneyerek indirir, başarılıysa dosya yolunu döndürür"""
+        segment_file = os.path.join(self.temp_dir, f"segment_{index:05d}.ts")
+        
+        started = time.monotonic()
+        
+        source, size = self._find_local_segment(segment_url, segment_file)
+        if source:
+            self.metrics.record_segment(index, size, self._local_latency(source, started), source=source)
+            return segment_file
+        
+        for attempt in range(self.retry_policy.max_retries + 1):
+            if not self.is_running:
+                return None
+            try:
+                part_file, hedged = self._fetch_segment_hedged(segment_url, segment_file)
+            except SegmentFetchError as e:
+                if not self._handle_fetch_error(index, attempt, e, started):
+                    return None
+                # İptal edilirse beklemeden çık
+                if self._stop_event.wait(self.retry_policy.get_delay(attempt)):
+                    return None
+                continue
             
-            # Segmenti indir
-            self.status_callback(f"Segment indiriliyor {i+1}/{len(segments)}...")
-            self.progress_callback(int((i / len(segments)) * 50))
+            if part_file is None:
+                return None
             
-            try:
-                segment_response = requests.get(segment_url, headers=headers)
-                if segment_response.status_code != 200:
-                    self.status_callback(f"Segment indirme hatası: {segment_response.status_code}")
+            size = self._commit_segment(segment_url, part_file, segment_file)
+            self.metrics.record_segment(
+                index, size, time.monotonic() - started, retries=attempt, hedged=hedged
+            )
+            return segment_file
+        
+        return None
+    
+    # İki indirme motorunun (iş parçacığı ve asyncio) ortak segment kayıt adımları
+    
+    def _find_local_segment(self, segment_url, segment_file):
+        """Segment devam kaydında veya önbellekte varsa (kaynak, boyut), yoksa (None, 0) döndürür"""
+        # Önceki denemede doğrulanmış segmentler tekrar indirilmez
+        if self.manifest and self.manifest.is_verified(segment_file):
+            return 'resume', os.path.getsize(segment_file)
+        # Başka bir işin indirdiği segment önbellekteyse ağa hiç çıkılmaz
+        if self.segment_cache and self.segment_cache.fetch(segment_url, segment_file):
+            if self.manifest:
+                self.manifest.mark_completed(segment_file)
+            return 'cache', os.path.getsize(segment_file)
+        return None, 0
+    
+    @staticmethod
+    def _local_latency(source, started):
+        # Devam kaydındaki segment için süre ölçülmez, önbellekten kopyalama süresi ölçülür
+        return 0.0 if source == 'resume' else time.monotonic() - started
+    
+    def _commit_segment(self, segment_url, part_file, segment_file):
+        """Tamamlanan parça dosyasını yerine taşır, kaydeder ve boyutunu döndürür"""
+        # Yarım kalan dosyalar birleştirmeye girmesin diye sonradan yeniden adlandır
+        os.replace(part_file, segment_file)
+        if self.manifest:
+            self.manifest.mark_completed(segment_file)
+        if self.segment_cache:
+            self.segment_cache.store(segment_url, segment_file)
+        return os.path.getsize(segment_file)
+    
+    def _handle_fetch_error(self, index, attempt, error, started):
+        """Başarısız denemeyi bildirir; tekrar denenecekse True, segment başarısızsa False döndürür"""
+        max_retries = self.retry_policy.max_retries
+        if not error.retryable or attempt == max_retries:
+            self.status_callback(f"Segment indirme hatası: {str(error)}")
+            self.metrics.record_segment(index, 0, time.monotonic() - started, retries=attempt, ok=False)
+            return False
+        
+        with self._stats_lock:
+            self.segment_retries += 1
+        self.status_callback(f"Segment {index + 1} tekrar deneniyor ({attempt + 1}/{max_retries}): {str(error)}")
+        return True
+    
+    @staticmethod
+    def _get_write_mode(status_code, resume_from):
+        """Yanıt durumuna göre parça dosyasının açılış kipi; beklenmeyen durumda None"""
+        if status_code == 206 and resume_from:
+            return "ab"
+        if status_code == 200:
+            return "wb"
+        return None
+    
+    @staticmethod
+    def _reject_response(status_code, part_file):
+        """Beklenmeyen yanıt için döndürülecek hata; 416'da yarım dosya sonraki denemede baştan indirilsin diye silinir"""
+        if status_code == 416:
+            remove_if_exists(part_file)
+        return SegmentFetchError(f"Durum kodu: {status_code}", retryable=status_code in RETRYABLE_STATUS_CODES)
+    
+    def _fetch_segment_hedged(self, segment_url, segment_file):
+        """Segment p95 süresini aşarsa yedek istek gönderir; (parça dosyası, yedek gönderildi mi) döndürür"""
+        primary_part = segment_file + ".part"
+        threshold = None
+        if self._hedge_executor:
+            threshold = self.latency_tracker.percentile(self.HEDGE_PERCENTILE)
+        
+        # Yeterli gecikme örneği yoksa düz istek
+        if threshold is None:
+            return self._fetch_to_part(segment_url, primary_part, bool(self.manifest), None), False
+        
+        cancel_primary = threading.Event()
+        primary = self._hedge_executor.submit(
+            self._fetch_to_part, segment_url, primary_part, bool(self.manifest), cancel_primary
+        )
+        try:
+            return primary.result(timeout=threshold), False
+        except FutureTimeoutError:
+            pass
+        
+        # Yedek istek de paylaşımlı segment bütçesinden yer alır; bütçe ve bağlantı havuzu aşılmaz
+        if not self._acquire_hedge_slot(primary):
+            return primary.result(), False
+        with self._stats_lock:
+            self.hedged_segments += 1
+        cancel_hedge = threading.Event()
+        hedge = self._hedge_executor.submit(
+            self._fetch_to_part, segment_url, segment_file + ".hedge.part", False, cancel_hedge
+        )
+        if self.segment_semaphore:
+            # İptal edilen (hiç başlamayan) yedek istek de yerini geri verir
+            hedge.add_done_callback(lambda future: self.segment_semaphore.release())
+        
+        pending = {primary: cancel_primary, hedge: cancel_hedge}
+        error = None
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.pop(future)
+                try:
+                    part_file = future.result()
+                except SegmentFetchError as e:
+                    error = e
                     continue
-                    
-                with open(segment_file, "wb") as f:
-                    f.write(segment_response.content)
-                segment_files.append(segment_file)
+                if part_file:
+                    # Geride kalan isteği durdur, bekleyen okuma bağlantı kapatılınca hemen biter
+                    for cancel_event in pending.values():
+                        cancel_event.set()
+                        self._abort_response(cancel_event)
+                    return part_file, True
+        
+        if error:
+            raise error
+        return None, True
+    
+    def _acquire_hedge_slot(self, primary):
+        """Yedek istek için segment bütçesinden yer alır; asıl istek bu arada biterse False döndürür"""
+        if not self.segment_semaphore:
+            return True
+        while not self.segment_semaphore.acquire(timeout=self.HEDGE_SLOT_POLL_INTERVAL):
+            if primary.done() or not self.is_running:
+                return False
+        return True
+    
+    def _fetch_to_part(self, segment_url, part_file, resume, cancel_event):
+        """Segmenti parça dosyasına indirir; iptal edilirse None döndürür"""
+        # Yarım kalan segment varsa Range isteği ile kaldığı yerden devam et
+        resume_from = get_existing_size(part_file) if resume else 0
+        request_headers = {'Range': f"bytes={resume_from}-"} if resume_from else None
+        
+        # Havuzda boş tampon yoksa istek gönderilmeden beklenir; tüm işlerin bellek kullanımı sınırlı kalır
+        buffer = self.buffer_pool.acquire(self._stop_event)
+        if buffer is None:
+            return None
+        
+        started = time.monotonic()
+        cancelled = False
+        try:
+            # Yanıtın tamamını belleğe almadan tampon doldukça diske yaz
+            with self.session.get(segment_url, stream=True, headers=request_headers,
+                                  timeout=self.timeout) as segment_response:
+                if self.first_byte_at is None:
+                    self.first_byte_at = time.monotonic()
+                if cancel_event is not None:
+                    with self._stats_lock:
+                        self._hedge_responses[cancel_event] = segment_response
+                status_code = segment_response.status_code
+                mode = self._get_write_mode(status_code, resume_from)
+                if mode is None:
+                    raise self._reject_response(status_code, part_file)
+                
+                view = memoryview(buffer)
+                with open(part_file, mode) as f:
+                    for count in self._read_body(segment_response, view, cancel_event):
+                        if not self.is_running:
+                            return None
+                        f.write(view[:count])
+                cancelled = cancel_event is not None and cancel_event.is_set()
+        except (requests.RequestException, TransportError, OSError, ValueError) as e:
+            if cancel_event is not None and cancel_event.is_set():
+                # Yarışı kaybeden isteğin bağlantısı diğer iş parçacığından kapatıldı
+                cancelled = True
+            elif isinstance(e, (requests.RequestException, TransportError)):
+                raise SegmentFetchError(str(e))
+            else:
+                raise
+        finally:
+            if cancel_event is not None:
+                with self._stats_lock:
+                    self._hedge_responses.pop(cancel_event, None)
+            self.buffer_pool.release(buffer)
+        
+        if cancelled:
+            # Yedek yarışını kaybeden isteğin dosyası gereksiz
+            if os.path.exists(part_file):
+                os.remove(part_file)
+            return None
+        
+        self.latency_tracker.record(time.monotonic() - started)
+        return part_file
+    
+    def _abort_response(self, cancel_event):
+        """Yarışı kaybeden isteğin soketini kapatır; okuma bekleyen iş parçacığı hemen uyanır"""
+        with self._stats_lock:
+            response = self._hedge_responses.pop(cancel_event, None)
+        if response is None:
+            return
+        connection = getattr(response.raw, 'connection', None)
+        sock = getattr(connection, 'sock', None)
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        # Bağlantı havuza geri verilmez, yarım gövdeli bağlantı yeniden kullanılamaz
+        response.close()
+    
+    def _read_body(self, response, view, cancel_event=None):
+        """Yanıt gövdesini tampona doldurur; tampon her dolduğunda yazılacak bayt sayısını döndürür
+
+        cancel_event set edilirse her okumadan sonra kontrol edilir ve okuma bırakılır.
+        """
+        size = len(view)
+        filled = 0
+        if response.headers.get('Content-Encoding', 'identity').lower() == 'identity':
+            # Sıkıştırılmamış gövde ara bayt nesnesi oluşturulmadan doğrudan tampona okunur
+            while True:
+                # Yarış kaybedildiyse her okumadan sonra bırakılır
+                if cancel_event is not None and cancel_event.is_set():
+                    return
+                count = response.raw.readinto(view[filled:])
+                if not count:
+                    break
+                filled += count
+                if filled == size:
+                    yield filled
+                    filled = 0
+        else:
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                if cancel_event is not None and cancel_event.is_set():
+                    return
+                while chunk:
+                    count = min(len(chunk), size - filled)
+                    view[filled:filled + count] = chunk[:count]
+                    filled += count
+                    chunk = chunk[count:]
+                    if filled == size:
+                        yield filled
+                        filled = 0
+        if filled:
+            yield filled
+    
+    def _download_and_stream(self, segments, base_url):
+        """Segmentleri indirirken sıralı olarak FFmpeg'e aktarır, başarılıysa True döndürür"""
+        self._normalize_output_path()
+        use_ffmpeg = is_ffmpeg_available()
+        if not use_ffmpeg:
+            self.status_callback("FFmpeg bulunamadı. TS formatında kaydediliyor...")
+        
+        # Yarım çıktı hedef yolda görünmesin; bitince yeniden adlandırılır
+        staged_output = os.path.join(self.temp_dir, "output.mp4")
+        muxer = StreamMuxer(
+            staged_output, self._get_trim_args(), log_dir=self.temp_dir,
+            use_ffmpeg=use_ffmpeg, chunk_size=self.chunk_size, buffer_pool=self.buffer_pool
+        )
+        muxer.open()
+        
+        # Sırası gelmemiş segmentler diskte bekler, sırası gelen aktarılıp silinir
+        ready = {}
+        condition = threading.Condition()
+        state = {'error': None, 'written': 0}
+        
+        def on_segment_done(index, segment_file):
+            with condition:
+                ready[index] = segment_file
+                condition.notify_all()
+        
+        def writer():
+            try:
+                write_segments()
             except Exception as e:
-                self.status_callback(f"Segment indirme hatası: {str(e)}")
-                continue
+                # Beklenmeyen hata iş parçacığını sessizce bitirmesin, yarım dosya başarılı sayılmasın
+                state['error'] = str(e) or e.__class__.__name__
+                self.is_running = False
+                with condition:
+                    condition.notify_all()
+        
+        def write_segments():
+            for index in range(len(segments)):
+                with condition:
+                    condition.wait_for(lambda: index in ready or not self.is_running)
+                    if index not in ready:
+                        return
+                    segment_file = ready.pop(index)
+                
+                # Eksik segmentle devam edilmez, akış hatayla sonlanır
+                if not segment_file:
+                    if self.is_running:
+                        state['error'] = self.segment_error or f"Segment {index + 1} tekrar denemelere rağmen indirilemedi"
+                        self.is_running = False
+                    return
+                try:
+                    muxer.write_file(segment_file)
+                    state['written'] += 1
+                except MuxError as e:
+                    state['error'] = str(e)
+                    self.is_running = False
+                    return
+                finally:
+                    os.remove(segment_file)
         
-        return segment_files
+        writer_thread = threading.Thread(target=writer, daemon=True)
+        writer_thread.start()
+        self._download_segments(segments, base_url, on_segment_done)
+        with condition:
+            condition.notify_all()
+        writer_thread.join()
+        
+        if state['error'] or not self.is_running or not state['written']:
+            muxer.abort()
+            self._cleanup_temp_files()
+            if state['error']:
+                self.status_callback(f"Dönüştürme hatası: {state['error']}")
+            elif not self.is_running:
+                self.status_callback("İndirme iptal edildi.")
+            else:
+                self.status_callback("Hata: Hiçbir segment indirilemedi.")
+            return False
+        
+        self.status_callback("Dönüştürme tamamlanıyor...")
+        self.progress_callback(90)
+        try:
+            with self.metrics.span('mux_finish'):
+                muxer.finish()
+        except MuxError as e:
+            # Devam ettirilemeyen işin hazırlık dizini bırakılmaz
+            if not self.resumable:
+                self._cleanup_temp_files()
+            self.status_callback(f"Dönüştürme hatası: {str(e)}")
+            return False
+        self._move_into_place(staged_output)
+        
+        self.status_callback("İşlem tamamlandı!")
+        self.progress_callback(100)
+        return True
+    
+    def _normalize_output_path(self):
+        """Çıktı dosyasının uzantısını kontrol eder ve gerekirse düzeltir"""
+        if not self.output_path.lower().endswith('.mp4'):
+            self.output_path = os.path.splitext(self.output_path)[0] + '.mp4'
     
     def _merge_segments(self, segment_files):
-        """Segmentleri birleştirir ve MP4 formatına dönüştürür"""
+        """Segmentleri birleştirir ve MP4 formatına dönüştürür; iptal edildiyse False döndürür"""
         self.status_callback("Segmentler birleştiriliyor...")
         self.progress_callback(60)
         
         # Önce TS dosyalarını birleştir
         temp_ts_path = os.path.join(self.temp_dir, "combined.ts")
-        with open(temp_ts_path, 'wb') as outfile:
+        segment_files = [segment_file for segment_file in segment_files if os.path.exists(segment_file)]
+        with self.metrics.span('concat'), open(temp_ts_path, 'wb') as outfile:
+            # Boyut önceden bilindiği için alan tek seferde ayrılır, dosya parçalanmaz
+            preallocate(outfile, sum(os.path.getsize(segment_file) for segment_file in segment_files))
             for segment_file in segment_files:
-                if os.path.exists(segment_file):
-                    with open(segment_file, 'rb') as infile:
-                        outfile.write(infile.read())
+                with open(segment_file, 'rb') as infile:
+                    self.buffer_pool.copy(infile, outfile)
         
         self.progress_callback(70)
         
-        # TS dosyasını MP4'e dönüştür
-        output_file = self.output_path
-        
-        # Çıktı dosyasının uzantısını kontrol et ve gerekirse düzelt
-        if not output_file.lower().endswith('.mp4'):
-            output_file = os.path.splitext(output_file)[0] + '.mp4'
-            self.output_path = output_file
+        # TS dosyasını MP4'e dönüştür; FFmpeg hazırlık dizinine yazar, sonuç yeniden adlandırılarak yerine konur
+        self._normalize_output_path()
+        output_file = os.path.join(self.temp_dir, "output.mp4")
             
         self.status_callback("MP4 formatına dönüştürülüyor...")
         
         try:
-            # FFmpeg kontrolü
-            try:
-                subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
-            except (subprocess.SubprocessError, FileNotFoundError):
+            # FFmpeg kontrolü (uygulama başında bir kez yapılır)
+            ffmpeg = get_ffmpeg()
+            if not ffmpeg.available:
                 self.status_callback("FFmpeg bulunamadı. TS formatında kaydediliyor...")
-                shutil.copy(temp_ts_path, self.output_path)
+                self._move_into_place(temp_ts_path)
                 self.progress_callback(90)
                 self.status_callback("İşlem tamamlandı!")
                 self.progress_callback(100)
-                return
+                return True
                 
             # FFmpeg ile dönüştürme
             cmd = [
-                'ffmpeg',
+                *ffmpeg.command(),
                 '-i', temp_ts_path,
+                *self._get_trim_args(),
                 '-c:v', 'copy',
-                '-c:a', 'aac',
+                *ffmpeg.audio_codec_args(),
                 '-y',  # Varolan dosyanın üzerine yaz
                 output_file
             ]
             
-            process = subprocess.run(cmd, capture_output=True, text=True)
+            with self.metrics.span('mux'):
+                process = self._run_ffmpeg_process(cmd)
+            
+            if self.stop_requested:
+                if not self.resumable:
+                    self._cleanup_temp_files()
+                self.status_callback("İndirme iptal edildi.")
+                return False
             
             if process.returncode != 0:
                 self.status_callback(f"Dönüştürme hatası: {process.stderr}")
-                # Hata olursa TS dosyasını kopyala
-                shutil.copy(temp_ts_path, self.output_path)
+                # Hata olursa TS dosyasını yerine taşı
+                self._move_into_place(temp_ts_path)
             else:
+                self._move_into_place(output_file)
                 self.status_callback("Dönüştürme başarılı!")
                 
         except Exception as e:
             self.status_callback(f"Dönüştürme hatası: {str(e)}")
-            # Hata olursa TS dosyasını kopyala
-            shutil.copy(temp_ts_path, self.output_path)
+            # Hata olursa TS dosyasını yerine taşı
+            if os.path.exists(temp_ts_path):
+                self._move_into_place(temp_ts_path)
         
         self.progress_callback(90)
         self.status_callback("İşlem tamamlandı!")
         self.progress_callback(100)
+        return True
+    
+    def _run_ffmpeg_process(self, cmd):
+        """FFmpeg'i çalıştırır; stop() süreci sonlandırabilsin diye süreç saklanır"""
+        process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, errors='replace')
+        self._mux_process = process
+        try:
+            _, stderr = process.communicate()
+        finally:
+            self._mux_process = None
+        return subprocess.CompletedProcess(cmd, process.returncode, None, stderr)
+    
+    def _move_into_place(self, staged_path, output_path=None):
+        """Hazırlık dizinindeki dosyayı çıktı yoluna atomik olarak taşır"""
+        output_path = output_path or self.output_path
+        try:
+            os.replace(staged_path, output_path)
+        except OSError:
+            # Hazırlık dizini başka dosya sistemine düştüyse (çıktı klasörü yazılamıyordu) kopyalanır
+            shutil.move(staged_path, output_path)
+    
+    def _get_trim_args(self):
+        """İlk segmentin başına göre kesim için FFmpeg argümanlarını döndürür"""
+        args = []
+        if self.trim_start:
+            args += ['-ss', f"{self.trim_start:.3f}"]
+        if self.trim_duration:
+            args += ['-t', f"{self.trim_duration:.3f}"]
+        return args
     
     def _cleanup_temp_files(self):
         """Geçici dosyaları temizler"""
@@ -270,4 +997,27 @@ class KickDownloader:
             try:
                 shutil.rmtree(self.temp_dir)
             except Exception as e:
-                self.status_callback(f"Geçici dosya temizleme hatası: {str(e)}")
\ No newline at end of file
+                self.status_callback(f"Geçici dosya temizleme hatası: {str(e)}")
+                return
+            # Son iş bittiğinde çıktı klasöründe boş gizli dizin kalmasın
+            remove_staging_root(os.path.dirname(self.temp_dir))
+
+
+def get_existing_size(path):
+    """Yarım kalan parça dosyasının boyutu; dosya yoksa 0"""
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def remove_if_exists(path):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def preallocate(file, size):
+    """Dosya için diskte yer ayırır; desteklenmiyorsa sessizce geçer"""
+    if size <= 0 or not hasattr(os, 'posix_fallocate'):
+        return
+    try:
+        os.posix_fallocate(file.fileno(), 0, size)
+    except OSError:
+        pass
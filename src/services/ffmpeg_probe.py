@@ -0,0 +1,107 @@
+import re
+import shutil
+import threading
+import subprocess
+
+
+class FFmpegInfo:
+    """FFmpeg'in yolu, sürümü, kodlayıcıları ve desteklenen seçenekleri (uygulama başında bir kez sorgulanır)"""
+
+    def __init__(self, path=None, version=None, encoders=None, options=None):
+        self.path = path
+        self.version = version
+        # None: sorgulanamadı (eski davranış korunur), küme: FFmpeg'in bildirdiği değerler
+        self.encoders = encoders
+        self.options = options
+
+    @property
+    def available(self):
+        return self.path is not None
+
+    def has_encoder(self, name):
+        return self.encoders is None or name in self.encoders
+
+    def supports(self, option):
+        """Seçenek (ör. -nostdin) bu FFmpeg sürümünde varsa True döndürür"""
+        return self.options is not None and option.lstrip('-') in self.options
+
+    def command(self):
+        """Dosyadan okuyan dönüştürmeler için komutun başı"""
+        cmd = [self.path or 'ffmpeg', '-hide_banner']
+        if self.supports('-nostdin'):
+            # Arka planda çalışan FFmpeg terminal girdisini beklemesin
+            cmd.append('-nostdin')
+        return cmd
+
+    def audio_codec_args(self):
+        """AAC kodlayıcısı olmayan derlemelerde ses yeniden kodlanmadan kopyalanır"""
+        if self.has_encoder('aac'):
+            return ['-c:a', 'aac']
+        return ['-c:a', 'copy']
+
+    def describe(self):
+        if not self.available:
+            return {'available': False}
+        return {'available': True, 'path': self.path, 'version': self.version}
+
+
+def probe_ffmpeg(executable='ffmpeg'):
+    """FFmpeg'i bulur; sürüm, kodlayıcı listesi ve seçenekleri sorgular"""
+    path = shutil.which(executable)
+    if not path:
+        return FFmpegInfo()
+
+    output = _run(path, '-version')
+    if output is None:
+        return FFmpegInfo()
+    match = re.match(r'\S+ version (\S+)', output)
+    version = match.group(1) if match else None
+
+    return FFmpegInfo(
+        path=path,
+        version=version,
+        encoders=_parse_encoders(_run(path, '-hide_banner', '-encoders')),
+        options=_parse_options(_run(path, '-hide_banner', '-h', 'long')),
+    )
+
+
+def _run(path, *args):
+    try:
+        process = subprocess.run([path, *args], capture_output=True, text=True, errors='replace', timeout=10)
+    except (subprocess.SubprocessError, OSError):
+        return None
+    if process.returncode != 0:
+        return None
+    return process.stdout
+
+
+def _parse_encoders(output):
+    """' A....D aac   AAC (Advanced Audio Coding)' satırlarından kodlayıcı adlarını çıkarır"""
+    if not output or '------' not in output:
+        return None
+    encoders = set()
+    for line in output.split('------', 1)[1].splitlines():
+        parts = line.split()
+        if len(parts) >= 2:
+            encoders.add(parts[1])
+    return encoders
+
+
+def _parse_options(output):
+    """Yardım çıktısındaki '-seçenek' ile başlayan satırlardan seçenek adlarını çıkarır"""
+    if not output:
+        return None
+    return set(re.findall(r'^-([\w:]+)', output, re.MULTILINE))
+
+
+_ffmpeg = None
+_ffmpeg_lock = threading.Lock()
+
+
+def get_ffmpeg(refresh=False):
+    """Önbellekteki FFmpeg bilgisini döndürür; ilk çağrıda sorgular"""
+    global _ffmpeg
+    with _ffmpeg_lock:
+        if _ffmpeg is None or refresh:
+            _ffmpeg = probe_ffmpeg()
+        return _ffmpeg
@@ -0,0 +1,121 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from utils import get_app_data_directory
+
+
+class HistoryStore:
+    """İndirme geçmişini indeksli SQLite veritabanında tutar"""
+    DEFAULT_PAGE_SIZE = 50
+    COLUMNS = (
+        'title', 'streamer', 'thumbnail', 'created_at', 'video_id',
+        'file_path', 'start_time', 'end_time', 'download_date',
+    )
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or os.path.join(get_app_data_directory(), "history.db")
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        # Kayıtlar hem arayüzden hem indirme iş parçacıklarından gelir; tek bağlantı kilitle korunur
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS downloads (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    title TEXT,
+                    streamer TEXT,
+                    thumbnail TEXT,
+                    created_at TEXT,
+                    video_id TEXT,
+                    file_path TEXT NOT NULL UNIQUE,
+                    start_time INTEGER,
+                    end_time INTEGER,
+                    download_date TEXT NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_downloads_video_id ON downloads(video_id)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_downloads_streamer ON downloads(streamer)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_downloads_date ON downloads(download_date DESC, id DESC)")
+
+    def add(self, item):
+        """Kaydı ekler; aynı dosya yoluna tekrar indirildiyse kaydı günceller"""
+        row = {column: item.get(column) for column in self.COLUMNS}
+        row['download_date'] = row['download_date'] or datetime.now().isoformat()
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT INTO downloads ({', '.join(self.COLUMNS)}) "
+                f"VALUES ({', '.join(':' + column for column in self.COLUMNS)}) "
+                "ON CONFLICT(file_path) DO UPDATE SET "
+                + ", ".join(f"{column} = excluded.{column}" for column in self.COLUMNS if column != 'file_path'),
+                row
+            )
+        return row
+
+    def add_many(self, items):
+        """Taşıma için toplu ekleme; mevcut kayıtların üzerine yazmaz"""
+        rows = [
+            {column: item.get(column) for column in self.COLUMNS}
+            for item in items if item.get('file_path')
+        ]
+        for row in rows:
+            row['download_date'] = row['download_date'] or datetime.now().isoformat()
+        with self._lock, self._conn:
+            cursor = self._conn.executemany(
+                f"INSERT OR IGNORE INTO downloads ({', '.join(self.COLUMNS)}) "
+                f"VALUES ({', '.join(':' + column for column in self.COLUMNS)})",
+                rows
+            )
+        return cursor.rowcount
+
+    def get_page(self, offset=0, limit=DEFAULT_PAGE_SIZE, streamer=None, video_id=None):
+        """En yeni indirmeden başlayarak bir sayfa kayıt döndürür"""
+        conditions, params = [], []
+        if streamer:
+            conditions.append("streamer = ?")
+            params.append(streamer)
+        if video_id:
+            conditions.append("video_id = ?")
+            params.append(video_id)
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM downloads {where}"
+                "ORDER BY download_date DESC, id DESC LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM downloads").fetchone()[0]
+
+    def delete(self, file_path):
+        """Tek bir indirme kaydını dosya yoluna göre siler"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM downloads WHERE file_path = ?", (file_path,))
+        return cursor.rowcount > 0
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM downloads")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_history_store():
+    """Uygulama genelinde paylaşılan geçmiş veritabanını döndürür"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = HistoryStore()
+        return _store
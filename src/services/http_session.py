@@ -0,0 +1,114 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import PoolManager
+
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': '*/*',
+    'Accept-Language': 'tr-TR,tr;q=0.9,en-US;q=0.8,en;q=0.7',
+    'Origin': 'https://kick.com',
+    'Referer': 'https://kick.com/'
+}
+
+
+class _HostSizedPoolManager(PoolManager):
+    """Host bazında bağlantı havuzu boyutu uygulayan PoolManager"""
+
+    def __init__(self, host_pool_sizes, created_pools, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.host_pool_sizes = host_pool_sizes
+        self.created_pools = created_pools
+
+    def _new_pool(self, scheme, host, port, request_context=None):
+        if host in self.host_pool_sizes:
+            request_context = dict(request_context or self.connection_pool_kw)
+            request_context['maxsize'] = self.host_pool_sizes[host]
+        pool = super()._new_pool(scheme, host, port, request_context=request_context)
+        # İstatistikler için havuzları sakla (havuz yöneticisinden atılsa bile)
+        self.created_pools.append(pool)
+        return pool
+
+
+class _PooledAdapter(HTTPAdapter):
+    """Host bazında havuz boyutunu destekleyen HTTP adaptörü"""
+
+    def __init__(self, host_pool_sizes, created_pools, **kwargs):
+        self.host_pool_sizes = host_pool_sizes
+        self.created_pools = created_pools
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        self.poolmanager = _HostSizedPoolManager(
+            self.host_pool_sizes, self.created_pools,
+            num_pools=connections, maxsize=maxsize, block=block, **pool_kwargs
+        )
+
+
+class PooledSession:
+    """Keep-alive bağlantı havuzu kullanan paylaşımlı HTTP oturumu"""
+    DEFAULT_POOL_CONNECTIONS = 10
+    DEFAULT_POOL_MAXSIZE = 16
+
+    def __init__(self, pool_connections=DEFAULT_POOL_CONNECTIONS, pool_maxsize=DEFAULT_POOL_MAXSIZE,
+                 host_pool_sizes=None, headers=None):
+        self.host_pool_sizes = dict(host_pool_sizes or {})
+        self._pools = []
+        self._lock = threading.Lock()
+        self._request_count = 0
+
+        self.session = requests.Session()
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+
+        adapter = _PooledAdapter(
+            self.host_pool_sizes, self._pools,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def set_host_pool_size(self, host, size):
+        """Belirli bir host için havuz boyutunu ayarlar (yeni havuzlarda geçerli olur)"""
+        self.host_pool_sizes[host] = size
+
+    def get(self, url, **kwargs):
+        """Havuzdaki bağlantıları kullanarak GET isteği yapar"""
+        with self._lock:
+            self._request_count += 1
+        return self.session.get(url, **kwargs)
+
+    def get_stats(self):
+        """Bağlantı yeniden kullanım istatistiklerini döndürür"""
+        with self._lock:
+            pools = list(self._pools)
+            requests_made = self._request_count
+
+        connections = sum(pool.num_connections for pool in pools)
+        pool_requests = sum(pool.num_requests for pool in pools)
+        return {
+            'requests': requests_made,
+            'connections': connections,
+            # Yeni bağlantı açılmadan yapılan istekler = atlanan el sıkışmaları
+            'reused': max(0, pool_requests - connections),
+        }
+
+    def close(self):
+        self.session.close()
+
+
+_shared_session = None
+_shared_session_lock = threading.Lock()
+
+
+def get_session():
+    """Tüm indirme işlerinin kullandığı paylaşımlı oturumu döndürür"""
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            _shared_session = PooledSession()
+        return _shared_session
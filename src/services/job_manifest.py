@@ -0,0 +1,201 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import threading
+
+
+STAGING_DIR_NAME = "kickvod-jobs"
+# Çıktı klasörünün içindeki gizli hazırlık dizini; son dosya kopyalanmadan yeniden adlandırılır
+OUTPUT_STAGING_DIR_NAME = ".kickvod-staging"
+# Bu süreden uzun süre dokunulmamış iş dizinleri terk edilmiş sayılır
+STALE_JOB_MAX_AGE = 7 * 24 * 3600
+
+
+def get_staging_root(output_dir=None):
+    """İşlerin geçici dizinlerinin kök dizinini döndürür (mümkünse çıktıyla aynı dosya sisteminde)"""
+    if output_dir:
+        root = get_output_staging_dir(output_dir)
+        try:
+            os.makedirs(root, exist_ok=True)
+            return root
+        except OSError:
+            # Çıktı klasörüne yazılamıyorsa sistem geçici dizinine düş
+            pass
+
+    root = os.path.join(tempfile.gettempdir(), STAGING_DIR_NAME)
+    os.makedirs(root, exist_ok=True)
+    return root
+
+
+def get_output_staging_dir(output_dir):
+    """Çıktı klasöründeki hazırlık dizininin yolunu döndürür; dizini oluşturmaz"""
+    return os.path.join(output_dir, OUTPUT_STAGING_DIR_NAME)
+
+
+def create_temp_dir(output_dir=None):
+    """Devam ettirilmeyen işler için hazırlık kökünde yeni bir geçici dizin oluşturur"""
+    try:
+        return tempfile.mkdtemp(dir=get_staging_root(output_dir))
+    except FileNotFoundError:
+        # Başka bir iş boşalan hazırlık dizinini o arada silmiş olabilir
+        return tempfile.mkdtemp(dir=get_staging_root(output_dir))
+
+
+def remove_staging_root(staging_root):
+    """Çıktı klasöründeki hazırlık dizini boşaldıysa siler; başka işler kullanıyorsa dokunmaz"""
+    if os.path.basename(os.path.normpath(staging_root)) != OUTPUT_STAGING_DIR_NAME:
+        return
+    try:
+        os.rmdir(staging_root)
+    except OSError:
+        pass
+
+
+def get_job_key(source, start_time, end_time, variant=None, output_path=None):
+    """Aynı VOD, zaman aralığı, kalite ve çıktı dosyası için her seferinde aynı iş anahtarını üretir"""
+    raw = f"{source}|{start_time}|{end_time}"
+    if variant:
+        # Farklı kalitelerdeki işler aynı dizini paylaşıp birbirinin dosyalarını silmesin
+        raw += f"|{variant}"
+    if output_path:
+        # Aynı kesit farklı adlarla iki kez kuyruğa eklenirse işler ayrı dizinlerde çalışır
+        raw += f"|{get_output_target(output_path)}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+
+
+def get_output_target(output_path):
+    """Uzantı düzeltmesinden etkilenmeyen mutlak çıktı yolu (iş anahtarı ve çakışma kontrolü için)"""
+    return os.path.splitext(os.path.abspath(output_path))[0]
+
+
+def get_job_dir(job_key, root=None):
+    """İş anahtarına ait geçici dizini döndürür, yoksa oluşturur"""
+    job_dir = os.path.join(root or get_staging_root(), job_key)
+    os.makedirs(job_dir, exist_ok=True)
+    return job_dir
+
+
+class JobManifest:
+    """İşin indirilmiş segmentlerini diskte kayıt altında tutar"""
+    FILENAME = "manifest.json"
+    VERSION = 1
+
+    def __init__(self, job_dir, data):
+        self.job_dir = job_dir
+        self.path = os.path.join(job_dir, self.FILENAME)
+        self.data = data
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load_or_create(cls, job_dir, video_id, start_time, end_time, variant_url):
+        """Mevcut manifesti yükler; iş parametreleri değişmişse sıfırdan oluşturur"""
+        expected = {
+            'video_id': video_id,
+            'start_time': start_time,
+            'end_time': end_time,
+            'variant_url': variant_url,
+        }
+        path = os.path.join(job_dir, cls.FILENAME)
+
+        data = None
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = None
+
+        if not data or data.get('version') != cls.VERSION or \
+                any(data.get(key) != value for key, value in expected.items()):
+            # Farklı bir işin kalıntıları yeniden kullanılmamalı
+            cls._clear_segments(job_dir)
+            data = {'version': cls.VERSION, **expected, 'segments': {}}
+
+        manifest = cls(job_dir, data)
+        manifest.save()
+        return manifest
+
+    @staticmethod
+    def _clear_segments(job_dir):
+        for name in os.listdir(job_dir):
+            path = os.path.join(job_dir, name)
+            if name.startswith('segment_'):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            elif name.startswith('shard_') and os.path.isdir(path):
+                # Süreçlere bölünmüş indirmenin parça dizinleri de eski işe aittir
+                shutil.rmtree(path, ignore_errors=True)
+
+    def is_verified(self, segment_file):
+        """Segment dosyası manifestteki boyutla eşleşiyorsa True döndürür"""
+        entry = self.data['segments'].get(os.path.basename(segment_file))
+        if not entry:
+            return False
+        try:
+            return os.path.getsize(segment_file) == entry['size']
+        except OSError:
+            return False
+
+    def mark_completed(self, segment_file):
+        """Tamamlanan segmenti boyutuyla birlikte kaydeder"""
+        size = os.path.getsize(segment_file)
+        with self._lock:
+            self.data['segments'][os.path.basename(segment_file)] = {'size': size}
+            self._save_locked()
+
+    @property
+    def completed_count(self):
+        return len(self.data['segments'])
+
+    def save(self):
+        with self._lock:
+            self._save_locked()
+
+    def _save_locked(self):
+        self.data['updated_at'] = time.time()
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f)
+        os.replace(temp_path, self.path)
+
+
+def collect_stale_jobs(root=None, max_age=STALE_JOB_MAX_AGE):
+    """Uzun süredir dokunulmamış, terk edilmiş iş dizinlerini siler"""
+    root = root or get_staging_root()
+    # Hiç iş açılmamış çıktı klasöründe hazırlık dizini sırf temizlik için oluşturulmaz
+    if not os.path.isdir(root):
+        return []
+    now = time.time()
+    removed = []
+
+    for name in os.listdir(root):
+        job_dir = os.path.join(root, name)
+        if not os.path.isdir(job_dir):
+            continue
+
+        manifest_path = os.path.join(job_dir, JobManifest.FILENAME)
+        try:
+            last_touch = os.path.getmtime(manifest_path if os.path.exists(manifest_path) else job_dir)
+        except OSError:
+            continue
+
+        if now - last_touch > max_age:
+            shutil.rmtree(job_dir, ignore_errors=True)
+            removed.append(job_dir)
+
+    # Çıktı klasöründe boş kalan hazırlık dizini geride bırakılmaz
+    remove_staging_root(root)
+    return removed
+
+
+def collect_all_stale_jobs(output_dir=None):
+    """Sistem geçici dizinindeki ve çıktı klasöründeki terk edilmiş iş dizinlerini siler"""
+    removed = collect_stale_jobs()
+    if output_dir:
+        removed += collect_stale_jobs(get_output_staging_dir(output_dir))
+    return removed
@@ -0,0 +1,312 @@
+import os
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+from services.downloader import KickDownloader
+from services.job_manifest import create_temp_dir
+from services.stream_muxer import StreamMuxer, MuxError, is_ffmpeg_available
+
+
+class LivePlaylistTracker:
+    """Canlı playlist'i EXT-X-MEDIA-SEQUENCE ile takip eder, sadece yeni segmentleri çıkarır"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.last_sequence = None
+        # Önceki playlist penceresinin ilk sıra numarası ve süreksizlik sayacı (yeniden başlama tespiti için)
+        self.window_start = None
+        self.discontinuity_sequence = None
+        self.target_duration = None
+        self.ended = False
+        # Yeni segment gelmeden önce kaydırılıp düşen segment sayısı
+        self.skipped = 0
+
+    def update(self, text):
+        """Playlist metnini işler, [(sıra no, url, süre)] olarak yeni segmentleri döndürür"""
+        lines = text.splitlines()
+        media_sequence = 0
+        discontinuity_sequence = None
+        first_uri_line = None
+
+        # Başlık etiketleri segmentlerden önce gelir; ilk URI'ye kadar okunur
+        for number, line in enumerate(lines):
+            line = line.strip()
+            if line.startswith('#EXT-X-MEDIA-SEQUENCE:'):
+                media_sequence = int(line.split(':', 1)[1])
+            elif line.startswith('#EXT-X-DISCONTINUITY-SEQUENCE:'):
+                discontinuity_sequence = int(line.split(':', 1)[1])
+            elif line.startswith('#EXT-X-TARGETDURATION:'):
+                self.target_duration = float(line.split(':', 1)[1])
+            elif line.startswith('#EXTINF:'):
+                first_uri_line = number
+                break
+        self.ended = '#EXT-X-ENDLIST' in text
+
+        if first_uri_line is None:
+            return []
+
+        # Daha önce görülen segmentler ayrıştırılmadan atlanır
+        skip = 0
+        if self.last_sequence is not None:
+            skip = max(0, self.last_sequence + 1 - media_sequence)
+            if media_sequence > self.last_sequence + 1:
+                self.skipped += media_sequence - self.last_sequence - 1
+            elif skip and self._is_restart(media_sequence, discontinuity_sequence, lines, first_uri_line):
+                # Sıra numarası geri sardı (yayın yeniden başladı), playlist baştan yeni sayılır
+                skip = 0
+        if skip == 0 or self.window_start is None or media_sequence > self.window_start:
+            # Geride kalan bir CDN sunucusunun eski penceresi karşılaştırma tabanını geri çekmez
+            self.window_start = media_sequence
+        if discontinuity_sequence is not None:
+            self.discontinuity_sequence = discontinuity_sequence
+
+        new_segments = []
+        sequence = media_sequence
+        duration = None
+        for line in lines[first_uri_line:]:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith('#EXTINF:'):
+                duration = line.split(':', 1)[1].split(',', 1)[0]
+                continue
+            if line.startswith('#'):
+                continue
+            if skip:
+                skip -= 1
+            else:
+                url = line if line.startswith('http') else urljoin(self.base_url, line)
+                new_segments.append((sequence, url, float(duration or self.target_duration or 0)))
+            sequence += 1
+            duration = None
+
+        if new_segments:
+            self.last_sequence = new_segments[-1][0]
+        elif self.last_sequence is None:
+            self.last_sequence = sequence - 1
+        return new_segments
+
+    def _is_restart(self, media_sequence, discontinuity_sequence, lines, first_uri_line):
+        """Geri giden sıra numarası yayının yeniden başladığını mı, yoksa geride kalan bir CDN sunucusunu mu gösteriyor"""
+        if (discontinuity_sequence is not None and self.discontinuity_sequence is not None
+                and discontinuity_sequence != self.discontinuity_sequence):
+            return True
+        # Geride kalan sunucunun penceresi daha önce görülen pencereyle örtüşür; tamamen altında kalan playlist yenidir
+        return media_sequence + self._count_uris(lines, first_uri_line) <= self.window_start
+
+    @staticmethod
+    def _count_uris(lines, start):
+        return sum(1 for line in lines[start:] if line.strip() and not line.startswith('#'))
+
+
+class LiveRecorder(KickDownloader):
+    """Devam eden yayını kaydeder; end_time - start_time süre sınırıdır (0 ya da None: sınırsız)"""
+    # Kayda yayının bu kadar gerisinden başlanır (segment sayısı), gecikme düşük tutulur
+    LIVE_EDGE_SEGMENTS = 3
+    # Playlist'in sürekli aynı kaldığı durumda yayının düştüğü kabul edilir
+    MAX_STALE_POLLS = 20
+
+    def __init__(self, url, start_time, end_time, output_path, progress_callback, status_callback,
+                 complete_callback, **kwargs):
+        # Canlı playlist değişir ve segmentleri tekrar kullanılmaz; önbellek ve devam ettirme kapalı
+        kwargs.update(use_cache=False, use_segment_cache=False, resumable=False)
+        super().__init__(url, start_time, end_time, output_path, progress_callback, status_callback,
+                         complete_callback, **kwargs)
+        self.max_duration = max(0, (end_time or 0) - (start_time or 0)) or None
+        self.recorded_duration = 0.0
+        self.recorded_segments = 0
+        self._finish_requested = False
+
+    def stop(self, discard=False):
+        """Kaydı durdurur; discard verilmezse o ana kadar kaydedilen kısım dosyaya yazılır"""
+        if discard:
+            super().stop(discard=True)
+            return
+        self._finish_requested = True
+        self.stop_requested = True
+        self._stop_event.set()
+
+    def _download_process(self):
+        try:
+            self.status_callback("Canlı yayın bilgileri alınıyor...")
+
+            status_code, playlist_text = self._fetch_playlist(self.url)
+            if status_code != 200:
+                self.status_callback(f"Hata: Yayın bilgileri alınamadı. Durum kodu: {status_code}")
+                return
+
+            master_playlist = self._parse_playlist(self.url, playlist_text)
+            _, base_url = self._process_playlist(master_playlist)
+
+            output_dir = os.path.dirname(os.path.abspath(self.output_path))
+            os.makedirs(output_dir, exist_ok=True)
+            self.temp_dir = create_temp_dir(output_dir)
+
+            with self.metrics.span('live'):
+                recorded = self._record(base_url)
+            if recorded:
+                self.completed = True
+                self.complete_callback(self.output_path)
+        except Exception as e:
+            self.status_callback(f"Beklenmeyen hata: {str(e)}")
+            self.progress_callback(0)
+        finally:
+            self._cleanup_temp_files()
+
+    def _record(self, base_url):
+        """Playlist'i yoklayarak yeni segmentleri indirir ve sırayla çıktıya ekler"""
+        self._normalize_output_path()
+        use_ffmpeg = is_ffmpeg_available()
+        if not use_ffmpeg:
+            self.status_callback("FFmpeg bulunamadı. TS formatında kaydediliyor...")
+
+        # Kayıt doğrudan çıktı dosyasına yazılır (parçalı MP4 ya da TS); uygulama çökse de
+        # o ana kadar kaydedilen kısım oynatılabilir kalır
+        muxer = StreamMuxer(self.output_path, log_dir=self.temp_dir, use_ffmpeg=use_ffmpeg,
+                            chunk_size=self.chunk_size, buffer_pool=self.buffer_pool, fragmented=True)
+        muxer.open()
+
+        tracker = LivePlaylistTracker(base_url)
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        stale_polls = 0
+        error = None
+        first_poll = True
+        try:
+            while self.is_running and not self._finish_requested:
+                poll_started = time.monotonic()
+                text, error = self._poll_playlist()
+                if text is None:
+                    break
+
+                new_segments = tracker.update(text)
+                if first_poll:
+                    # Kayıt yayının en yeni birkaç segmentinden başlar
+                    new_segments = new_segments[-self.LIVE_EDGE_SEGMENTS:]
+                    first_poll = False
+                if tracker.skipped:
+                    self.status_callback(f"Uyarı: Yayın kaydı geride kaldı, {tracker.skipped} segment kaçırıldı.")
+                    tracker.skipped = 0
+
+                if new_segments:
+                    stale_polls = 0
+                    error = self._append_segments(new_segments, executor, muxer)
+                    if error:
+                        break
+                else:
+                    stale_polls += 1
+                    if stale_polls >= self.MAX_STALE_POLLS:
+                        self.status_callback("Yayın uzun süredir güncellenmiyor, kayıt bitiriliyor.")
+                        break
+
+                if tracker.ended:
+                    self.status_callback("Yayın sona erdi.")
+                    break
+                if self.max_duration and self.recorded_duration >= self.max_duration:
+                    self.status_callback("Süre sınırına ulaşıldı.")
+                    break
+
+                # HLS istemci kuralı: değişiklik varsa hedef süre, yoksa yarısı kadar bekle
+                target = tracker.target_duration or 6
+                interval = target if new_segments else target / 2
+                if self._stop_event.wait(max(0.0, interval - (time.monotonic() - poll_started))):
+                    break
+        except Exception as e:
+            # Ağ ya da disk hatası da olsa FFmpeg süreci açık kalmasın
+            error = str(e)
+        finally:
+            executor.shutdown(wait=True)
+
+        if error or (not self.is_running and not self._finish_requested) or not self.recorded_segments:
+            muxer.abort()
+            if error and self.recorded_segments:
+                # Son parçaya kadar yazılmış dosya oynatılabilir, silinmez
+                self.status_callback(f"Kayıt hatası: {error} (kaydedilen kısım korundu)")
+                return False
+            self._remove_output()
+            if error:
+                self.status_callback(f"Kayıt hatası: {error}")
+            elif not self.recorded_segments:
+                self.status_callback("Hata: Hiçbir segment kaydedilemedi.")
+            else:
+                self.status_callback("Kayıt iptal edildi.")
+            return False
+
+        self.status_callback("Kayıt tamamlanıyor...")
+        try:
+            with self.metrics.span('mux_finish'):
+                muxer.finish()
+        except MuxError as e:
+            self.status_callback(f"Dönüştürme hatası: {str(e)}")
+            return False
+
+        self.status_callback("Kayıt tamamlandı!")
+        self.progress_callback(100)
+        return True
+
+    def _poll_playlist(self):
+        """Canlı playlist'i alır; geçici hatalarda tekrar dener, (metin, hata) döndürür"""
+        max_retries = self.retry_policy.max_retries
+        for attempt in range(max_retries + 1):
+            try:
+                status_code, text = self._fetch_playlist(self.variant_url)
+                if status_code == 200:
+                    return text, None
+                error = f"Canlı playlist alınamadı. Durum kodu: {status_code}"
+            except requests.RequestException as e:
+                error = f"Canlı playlist alınamadı: {str(e)}"
+
+            if attempt < max_retries:
+                self.status_callback(f"{error}, tekrar deneniyor ({attempt + 1}/{max_retries})")
+                # Kayıt durdurulursa beklemeden çık
+                if self._stop_event.wait(self.retry_policy.get_delay(attempt)):
+                    return None, None
+        return None, error
+
+    def _append_segments(self, segments, executor, muxer):
+        """Yeni segmentleri paralel indirir, sırayla çıktıya yazar; hata varsa mesajını döndürür"""
+        if self.max_duration:
+            # Süre sınırını aşacak segmentler indirilmez
+            remaining = self.max_duration - self.recorded_duration
+            limited = []
+            for segment in segments:
+                if remaining <= 0:
+                    break
+                limited.append(segment)
+                remaining -= segment[2]
+            segments = limited
+
+        futures = [
+            executor.submit(self._download_segment_with_budget, sequence, url)
+            for sequence, url, _ in segments
+        ]
+        for (sequence, _, duration), future in zip(segments, futures):
+            segment_file = future.result()
+            if not segment_file:
+                if not self.is_running:
+                    return None
+                # Tekrar denemelere rağmen inmeyen canlı segment atlanır, kayıt sürer
+                self.status_callback(f"Uyarı: Segment {sequence} indirilemedi, atlanıyor.")
+                continue
+            try:
+                muxer.write_file(segment_file)
+            finally:
+                os.remove(segment_file)
+            self.recorded_segments += 1
+            self.recorded_duration += duration
+
+        self.status_callback(f"Kaydediliyor... {self._format_duration(self.recorded_duration)}")
+        if self.max_duration:
+            self.progress_callback(min(99, int(self.recorded_duration / self.max_duration * 100)))
+        return None
+
+    def _remove_output(self):
+        try:
+            os.remove(self.output_path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _format_duration(seconds):
+        seconds = int(seconds)
+        return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
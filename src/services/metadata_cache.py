@@ -0,0 +1,146 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from utils import get_app_data_directory
+
+
+class MetadataCache:
+    """Kick API yanıtları ve playlist'ler için TTL'li, boyutu sınırlı disk önbelleği"""
+    DEFAULT_TTL = 10 * 60
+    # Bitmiş VOD'ların verisi değişmez, uzun süre saklanabilir
+    IMMUTABLE_TTL = 30 * 24 * 3600
+    DEFAULT_MAX_BYTES = 20 * 1024 * 1024
+    MAX_PARSED_ITEMS = 32
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or os.path.join(get_app_data_directory(), "cache", "metadata")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Ayrıştırılmış playlist'ler bellekte tutulur, tekrar ayrıştırma yapılmaz
+        self._parsed = OrderedDict()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode('utf-8')).hexdigest() + ".json")
+
+    def get(self, key):
+        """Süresi dolmamış kaydı döndürür, yoksa None"""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if entry.get('key') != key or entry.get('expires_at', 0) < time.time():
+            self._remove(path)
+            return None
+
+        # LRU tahliyesi için erişim zamanını güncelle
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry['value']
+
+    def set(self, key, value, ttl=DEFAULT_TTL, immutable=False, video_id=None):
+        """Kaydı önbelleğe yazar"""
+        entry = {
+            'key': key,
+            'value': value,
+            'video_id': video_id,
+            'expires_at': time.time() + (self.IMMUTABLE_TTL if immutable else ttl),
+        }
+        path = self._path(key)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(temp_path, path)
+        self._evict()
+
+    def invalidate(self, key):
+        """Tek bir kaydı siler"""
+        self._remove(self._path(key))
+        with self._lock:
+            for parsed_key in [k for k in self._parsed if k[0] == key]:
+                del self._parsed[parsed_key]
+
+    def invalidate_video(self, video_id):
+        """Bir videoya ait tüm kayıtları siler"""
+        for path in self._entry_paths():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if entry.get('video_id') == video_id:
+                self.invalidate(entry['key'])
+
+    def clear(self):
+        """Önbelleği tamamen temizler"""
+        for path in self._entry_paths():
+            self._remove(path)
+        with self._lock:
+            self._parsed.clear()
+
+    def get_parsed(self, key, text, parser):
+        """Aynı içerik için ayrıştırılmış nesneyi bellekten döndürür"""
+        parsed_key = (key, hashlib.sha1(text.encode('utf-8')).hexdigest())
+        with self._lock:
+            if parsed_key in self._parsed:
+                self._parsed.move_to_end(parsed_key)
+                return self._parsed[parsed_key]
+
+        parsed = parser(text)
+        with self._lock:
+            self._parsed[parsed_key] = parsed
+            while len(self._parsed) > self.MAX_PARSED_ITEMS:
+                self._parsed.popitem(last=False)
+        return parsed
+
+    def _entry_paths(self):
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return []
+        return [os.path.join(self.cache_dir, name) for name in names if name.endswith(".json")]
+
+    def _evict(self):
+        """Toplam boyut sınırı aşıldıysa en uzun süredir kullanılmayan kayıtları siler"""
+        entries = []
+        total = 0
+        for path in self._entry_paths():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort()
+        while total > self.max_bytes and entries:
+            _, size, path = entries.pop(0)
+            self._remove(path)
+            total -= size
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_metadata_cache():
+    """Uygulama genelinde paylaşılan önbelleği döndürür"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = MetadataCache()
+        return _shared_cache
@@ -0,0 +1,200 @@
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+
+_global_listeners = []
+_global_listeners_lock = threading.Lock()
+
+
+def add_listener(listener):
+    """Tüm işlerin metrik olaylarını alacak dinleyici ekler: listener(event_dict)"""
+    with _global_listeners_lock:
+        _global_listeners.append(listener)
+
+
+def remove_listener(listener):
+    with _global_listeners_lock:
+        if listener in _global_listeners:
+            _global_listeners.remove(listener)
+
+
+class JobMetrics:
+    """Tek bir indirme işinin aşama süreleri ve segment ölçümleri"""
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.events = []
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener):
+        """Sadece bu işin olaylarını alacak dinleyici ekler"""
+        self._listeners.append(listener)
+
+    @contextmanager
+    def span(self, stage, **attributes):
+        """Bir aşamanın başlangıç ve bitişini ölçer"""
+        started_at = time.time()
+        started = time.monotonic()
+        ok = True
+        try:
+            yield
+        except BaseException:
+            ok = False
+            raise
+        finally:
+            self._emit({
+                'type': 'span',
+                'stage': stage,
+                'start': round(started_at, 3),
+                'duration': round(time.monotonic() - started, 4),
+                'ok': ok,
+                **attributes,
+            })
+
+    def record_segment(self, index, size, latency, retries=0, hedged=False, source='network', ok=True):
+        """Segment başına bayt, gecikme ve tekrar deneme bilgisini kaydeder"""
+        self._emit({
+            'type': 'segment',
+            'index': index,
+            'bytes': size,
+            'latency': round(latency, 4),
+            'retries': retries,
+            'hedged': hedged,
+            'source': source,
+            'ok': ok,
+        })
+
+    def _emit(self, event):
+        event = {'job': self.job_id, 'time': round(time.time(), 3), **event}
+        with self._lock:
+            self.events.append(event)
+        with _global_listeners_lock:
+            listeners = list(_global_listeners)
+        for listener in self._listeners + listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                # Hatalı bir dinleyici indirmeyi durdurmamalı
+                print(f"Metrik dinleyici hatası: {str(e)}")
+
+    def summary(self):
+        """Aşama toplamları ve segment istatistiklerini döndürür"""
+        with self._lock:
+            events = list(self.events)
+
+        stages = {}
+        segments = [event for event in events if event['type'] == 'segment']
+        for event in events:
+            if event['type'] == 'span':
+                stages[event['stage']] = stages.get(event['stage'], 0) + event['duration']
+
+        latencies = sorted(event['latency'] for event in segments if event['source'] == 'network' and event['ok'])
+        return {
+            'job': self.job_id,
+            'stages': {stage: round(duration, 4) for stage, duration in stages.items()},
+            'segments': len(segments),
+            'failed_segments': sum(1 for event in segments if not event['ok']),
+            'bytes': sum(event['bytes'] for event in segments),
+            'retries': sum(event['retries'] for event in segments),
+            'hedged': sum(1 for event in segments if event['hedged']),
+            'latency_p50': _percentile(latencies, 0.5),
+            'latency_p95': _percentile(latencies, 0.95),
+        }
+
+    def to_json_lines(self):
+        """Tüm olayları JSON satırları olarak döndürür"""
+        with self._lock:
+            return "".join(json.dumps(event, ensure_ascii=False) + "\n" for event in self.events)
+
+
+def _percentile(ordered, fraction):
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+class MetricsRegistry:
+    """Tüm işlerin olaylarını Prometheus sayaçlarında toplar"""
+    LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stage_seconds = {}
+        self.stage_count = {}
+        self.segments = {}
+        self.segment_bytes = 0
+        self.segment_retries = 0
+        self.hedged_segments = 0
+        self.latency_buckets = [0] * len(self.LATENCY_BUCKETS)
+        self.latency_sum = 0.0
+        self.latency_count = 0
+
+    def __call__(self, event):
+        with self._lock:
+            if event['type'] == 'span':
+                stage = event['stage']
+                self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + event['duration']
+                self.stage_count[stage] = self.stage_count.get(stage, 0) + 1
+            elif event['type'] == 'segment':
+                key = (event['source'], 'ok' if event['ok'] else 'failed')
+                self.segments[key] = self.segments.get(key, 0) + 1
+                self.segment_bytes += event['bytes']
+                self.segment_retries += event['retries']
+                self.hedged_segments += 1 if event['hedged'] else 0
+                if event['source'] == 'network' and event['ok']:
+                    self.latency_sum += event['latency']
+                    self.latency_count += 1
+                    for i, bound in enumerate(self.LATENCY_BUCKETS):
+                        if event['latency'] <= bound:
+                            self.latency_buckets[i] += 1
+
+    def export_prometheus(self):
+        """Prometheus metin biçiminde dışa aktarır"""
+        with self._lock:
+            lines = [
+                "# HELP kickvod_stage_seconds_total Aşamalarda geçen toplam süre",
+                "# TYPE kickvod_stage_seconds_total counter",
+            ]
+            for stage, seconds in sorted(self.stage_seconds.items()):
+                lines.append(f'kickvod_stage_seconds_total{{stage="{stage}"}} {seconds:.4f}')
+            lines += ["# TYPE kickvod_stage_runs_total counter"]
+            for stage, count in sorted(self.stage_count.items()):
+                lines.append(f'kickvod_stage_runs_total{{stage="{stage}"}} {count}')
+            lines += ["# TYPE kickvod_segments_total counter"]
+            for (source, status), count in sorted(self.segments.items()):
+                lines.append(f'kickvod_segments_total{{source="{source}",status="{status}"}} {count}')
+            lines += [
+                "# TYPE kickvod_segment_bytes_total counter",
+                f"kickvod_segment_bytes_total {self.segment_bytes}",
+                "# TYPE kickvod_segment_retries_total counter",
+                f"kickvod_segment_retries_total {self.segment_retries}",
+                "# TYPE kickvod_hedged_segments_total counter",
+                f"kickvod_hedged_segments_total {self.hedged_segments}",
+                "# HELP kickvod_segment_latency_seconds Ağdan indirilen segmentlerin süresi",
+                "# TYPE kickvod_segment_latency_seconds histogram",
+            ]
+            for bound, count in zip(self.LATENCY_BUCKETS, self.latency_buckets):
+                lines.append(f'kickvod_segment_latency_seconds_bucket{{le="{bound}"}} {count}')
+            lines += [
+                f'kickvod_segment_latency_seconds_bucket{{le="+Inf"}} {self.latency_count}',
+                f"kickvod_segment_latency_seconds_sum {self.latency_sum:.4f}",
+                f"kickvod_segment_latency_seconds_count {self.latency_count}",
+            ]
+        return "\n".join(lines) + "\n"
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """Süreç genelindeki Prometheus sayaçlarını döndürür (ilk çağrıda dinleyici olarak eklenir)"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = MetricsRegistry()
+            add_listener(_registry)
+        return _registry
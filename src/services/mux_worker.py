@@ -0,0 +1,53 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class MuxWorkerPool:
+    """Birleştirme ve FFmpeg dönüştürme adımları için sınırlı iş parçacığı havuzu
+
+    İndirmesi biten iş burada sıraya girer; böylece indirme yuvası bir sonraki işe geçer.
+    Sırada bekleyen iş sayısı da sınırlıdır, dolduğunda yeni iş indirme yuvasında bekler.
+    """
+    DEFAULT_MAX_WORKERS = 2
+    DEFAULT_MAX_PENDING = 4
+    # İptal isteği bu aralıklarla kontrol edilir
+    ACQUIRE_POLL_INTERVAL = 0.1
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, max_pending=DEFAULT_MAX_PENDING):
+        self.max_workers = max(1, int(max_workers))
+        self.max_pending = max(0, int(max_pending))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="kickvod-mux")
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_pending)
+
+    def acquire(self, cancel_event=None):
+        """Havuzda yer açılana kadar bekler; cancel_event set edilirse False döndürür"""
+        while not self._slots.acquire(timeout=self.ACQUIRE_POLL_INTERVAL):
+            if cancel_event is not None and cancel_event.is_set():
+                return False
+        return True
+
+    def submit(self, fn, *args):
+        """acquire ile alınan yeri kullanarak işi çalıştırır; yer iş bitince bırakılır"""
+        def run():
+            try:
+                return fn(*args)
+            finally:
+                self._slots.release()
+
+        try:
+            return self._executor.submit(run)
+        except RuntimeError:
+            self._slots.release()
+            raise
+
+
+_mux_pool = None
+_mux_pool_lock = threading.Lock()
+
+
+def get_mux_pool():
+    global _mux_pool
+    with _mux_pool_lock:
+        if _mux_pool is None:
+            _mux_pool = MuxWorkerPool()
+        return _mux_pool
@@ -0,0 +1,147 @@
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QualityPolicy:
+    """Master playlist'teki kalite seçeneklerinden hangisinin indirileceğini belirler"""
+    BEST = "best"
+    RESOLUTION = "resolution"
+    BANDWIDTH = "bandwidth"
+    AUTO = "auto"
+
+    # auto modunda kesitin indirilmesi için hedeflenen süre (saniye)
+    DEFAULT_TARGET_SECONDS = 120
+    # Hız ölçümü için indirilen ilk segment sayısı
+    PROBE_SEGMENTS = 3
+
+    def __init__(self, mode=BEST, height=None, max_bandwidth=None, target_seconds=DEFAULT_TARGET_SECONDS):
+        if mode not in (self.BEST, self.RESOLUTION, self.BANDWIDTH, self.AUTO):
+            raise ValueError(f"Bilinmeyen kalite modu: {mode}")
+        if mode == self.RESOLUTION and not height:
+            raise ValueError("Çözünürlük modu için yükseklik gereklidir")
+        if mode == self.BANDWIDTH and not max_bandwidth:
+            raise ValueError("Bant genişliği modu için üst sınır gereklidir")
+        self.mode = mode
+        self.height = height
+        self.max_bandwidth = max_bandwidth
+        self.target_seconds = target_seconds
+
+    @classmethod
+    def parse(cls, spec):
+        """Metin tanımından politika oluşturur: best, 720p, <=3mbps, auto, auto:300"""
+        if isinstance(spec, cls):
+            return spec
+        spec = (spec or cls.BEST).strip().lower()
+        if spec == cls.BEST:
+            return cls()
+        if spec.startswith(cls.AUTO):
+            _, _, target = spec.partition(':')
+            return cls(cls.AUTO, target_seconds=float(target) if target else cls.DEFAULT_TARGET_SECONDS)
+
+        match = re.fullmatch(r'(\d+)p?', spec)
+        if match:
+            return cls(cls.RESOLUTION, height=int(match.group(1)))
+
+        match = re.fullmatch(r'(?:<=)?\s*(\d+(?:\.\d+)?)\s*(k|m)bps', spec)
+        if match:
+            multiplier = 1000 if match.group(2) == 'k' else 1000 * 1000
+            return cls(cls.BANDWIDTH, max_bandwidth=int(float(match.group(1)) * multiplier))
+
+        raise ValueError(f"Geçersiz kalite tanımı: {spec} (örnek: best, 720p, <=3mbps, auto)")
+
+    def describe(self):
+        if self.mode == self.RESOLUTION:
+            return f"{self.height}p"
+        if self.mode == self.BANDWIDTH:
+            return f"<={self.max_bandwidth / 1e6:g}mbps"
+        if self.mode == self.AUTO:
+            return f"auto:{self.target_seconds:g}"
+        return self.BEST
+
+    def select(self, variants, clip_duration=None, probe=None):
+        """Seçilen kaliteyi döndürür; auto modunda probe() bayt/saniye hız ölçümü döndürmelidir"""
+        # Bant genişliği bilgisi olmayan seçenekler en sona düşer
+        ordered = sorted(variants, key=get_bandwidth, reverse=True)
+        if not ordered:
+            return None
+
+        if self.mode == self.RESOLUTION:
+            # Tam eşleşme yoksa istenenin altındaki en yüksek çözünürlük, o da yoksa en düşüğü
+            for variant in ordered:
+                height = get_height(variant)
+                if height is not None and height <= self.height:
+                    return variant
+            return ordered[-1]
+
+        if self.mode == self.BANDWIDTH:
+            for variant in ordered:
+                if get_bandwidth(variant) <= self.max_bandwidth:
+                    return variant
+            return ordered[-1]
+
+        if self.mode == self.AUTO and probe and clip_duration:
+            throughput = probe()
+            if throughput:
+                for variant in ordered:
+                    # Bit hızı x süre = indirilecek bayt; ölçülen hızla tahmini indirme süresi
+                    estimated = get_bandwidth(variant) / 8 * clip_duration / throughput
+                    if estimated <= self.target_seconds:
+                        return variant
+                return ordered[-1]
+
+        return ordered[0]
+
+
+def get_bandwidth(variant):
+    stream_info = variant.stream_info
+    return (stream_info.bandwidth or 0) if stream_info else 0
+
+
+def get_height(variant):
+    stream_info = variant.stream_info
+    if stream_info and stream_info.resolution:
+        return stream_info.resolution[1]
+    # Kick varyant adları "720p60/playlist.m3u8" biçimindedir
+    match = re.match(r'(\d+)p', variant.uri or '')
+    return int(match.group(1)) if match else None
+
+
+def describe_variant(variant, url):
+    """İşin metadata'sında gösterilecek kalite bilgisi"""
+    stream_info = variant.stream_info
+    height = get_height(variant)
+    return {
+        'url': url,
+        'name': variant.uri.split('/')[0] if variant.uri and '/' in variant.uri else variant.uri,
+        'bandwidth': get_bandwidth(variant) or None,
+        'resolution': "x".join(str(v) for v in stream_info.resolution) if stream_info and stream_info.resolution else None,
+        'height': height,
+    }
+
+
+def measure_throughput(session, segment_urls, timeout):
+    """Segmentleri paralel indirip toplam hızı bayt/saniye olarak ölçer"""
+    if not segment_urls:
+        return None
+
+    def fetch(url):
+        total = 0
+        with session.get(url, stream=True, timeout=timeout) as response:
+            if response.status_code != 200:
+                return 0
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                total += len(chunk)
+        return total
+
+    started = time.monotonic()
+    try:
+        with ThreadPoolExecutor(max_workers=len(segment_urls)) as executor:
+            total_bytes = sum(executor.map(fetch, segment_urls))
+    except Exception as e:
+        print(f"Hız ölçümü başarısız: {str(e)}")
+        return None
+    elapsed = time.monotonic() - started
+    if not total_bytes or elapsed <= 0:
+        return None
+    return total_bytes / elapsed
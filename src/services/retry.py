@@ -0,0 +1,54 @@
+import random
+import threading
+from collections import deque
+
+
+class SegmentFetchError(Exception):
+    """Segment isteği başarısız oldu; retryable False ise tekrar denemenin anlamı yok"""
+
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+# Geçici olduğu kabul edilen HTTP durum kodları
+RETRYABLE_STATUS_CODES = {408, 416, 425, 429, 500, 502, 503, 504}
+
+
+class RetryPolicy:
+    """Üstel geri çekilme ve rastgele sapma (jitter) ile yeniden deneme politikası"""
+    DEFAULT_MAX_RETRIES = 4
+    DEFAULT_BASE_DELAY = 0.5
+    DEFAULT_MAX_DELAY = 10.0
+
+    def __init__(self, max_retries=DEFAULT_MAX_RETRIES, base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY):
+        self.max_retries = max(0, int(max_retries))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def get_delay(self, attempt):
+        """attempt. başarısızlıktan sonra beklenecek süre ("full jitter")"""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+
+class LatencyTracker:
+    """Son segment sürelerinden yüzdelik dilim hesaplar (hedged istek eşiği için)"""
+
+    def __init__(self, window=200, min_samples=8):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, fraction):
+        """Yeterli örnek yoksa None döndürür"""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+        return ordered[index]
@@ -0,0 +1,231 @@
+import itertools
+import threading
+from collections import deque
+from services.downloader import KickDownloader
+from services.mux_worker import get_mux_pool
+from services.buffer_pool import get_buffer_pool
+from services.job_manifest import get_output_target
+
+
+class DownloadJob:
+    """Zamanlayıcıdaki tek bir indirme işinin durumu"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    # Segmentler indi, birleştirme/dönüştürme havuzunda sırada ya da çalışıyor
+    MUXING = "muxing"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    def __init__(self, job_id, url, start_time, end_time, output_path, video_info=None, options=None):
+        self.job_id = job_id
+        self.url = url
+        self.start_time = start_time
+        self.end_time = end_time
+        self.output_path = output_path
+        self.video_info = video_info or {}
+        self.options = options or {}
+        self.state = self.QUEUED
+        self.progress = 0
+        self.status = "Sırada"
+        self.downloader = None
+
+    @property
+    def variant(self):
+        """Kalite politikasına göre seçilen varyant (playlist işlenene kadar None)"""
+        return self.downloader.selected_variant if self.downloader else None
+
+    @property
+    def output_target(self):
+        """İşin yazacağı dosya; kesit listesinde ilk kesitin dosyası (çakışma kontrolü için)"""
+        output_path = self.output_path
+        if not output_path and self.options.get('clips'):
+            output_path = self.options['clips'][0]['output_path']
+        return get_output_target(output_path) if output_path else None
+
+    @property
+    def is_finished(self):
+        return self.state in (self.COMPLETED, self.FAILED, self.CANCELLED)
+
+
+class DownloadScheduler:
+    """İndirme işlerini kuyrukta tutar ve eşzamanlı iş sayısını sınırlar"""
+    DEFAULT_MAX_CONCURRENT_JOBS = 2
+    DEFAULT_SEGMENT_BUDGET = 16
+
+    def __init__(self, max_concurrent_jobs=DEFAULT_MAX_CONCURRENT_JOBS, segment_budget=DEFAULT_SEGMENT_BUDGET,
+                 on_progress=None, on_status=None, on_complete=None, on_state_change=None,
+                 downloader_class=KickDownloader, mux_pool=None, buffer_pool=None):
+        self.max_concurrent_jobs = max(1, int(max_concurrent_jobs))
+        self.segment_budget = max(1, int(segment_budget))
+        # Tüm işlerin segment istekleri bu bütçeyi paylaşır, böylece CDN aşırı yüklenmez
+        self.segment_semaphore = threading.BoundedSemaphore(self.segment_budget)
+        self.on_progress = on_progress
+        self.on_status = on_status
+        self.on_complete = on_complete
+        self.on_state_change = on_state_change
+        self.downloader_class = downloader_class
+        # Dönüştürme aşaması iş yuvası tutmaz; yeni işler önceki işler dönüştürülürken indirilir
+        self.mux_pool = mux_pool or get_mux_pool()
+        # Segment verisinin bellek bütçesi de tüm işler için ortaktır
+        self.buffer_pool = buffer_pool or get_buffer_pool()
+
+        self.jobs = {}
+        self._queue = deque()
+        self._running = set()
+        self._muxing = set()
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+        self._idle = threading.Condition(self._lock)
+
+    def submit(self, url, start_time, end_time, output_path, video_info=None, **options):
+        """Yeni bir iş kuyruğa ekler ve sırası geldiyse başlatır"""
+        with self._lock:
+            job = DownloadJob(next(self._ids), url, start_time, end_time, output_path, video_info, options)
+            self.jobs[job.job_id] = job
+            self._queue.append(job)
+        self._notify_state(job)
+        self._dispatch()
+        return job
+
+    def cancel(self, job_id):
+        """İşi iptal eder; kuyruktaysa hiç başlatılmaz"""
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if not job or job.is_finished:
+                return False
+            if job in self._queue:
+                self._queue.remove(job)
+                job.state = DownloadJob.CANCELLED
+                job.status = "İndirme iptal edildi"
+                self._idle.notify_all()
+                downloader = None
+            else:
+                downloader = job.downloader
+
+        if downloader:
+            # Durum, downloader iş parçacığı bittiğinde _on_finished içinde güncellenir
+            downloader.stop()
+        else:
+            self._notify_state(job)
+        return True
+
+    def cancel_all(self):
+        """Kuyruktaki ve çalışan tüm işleri iptal eder"""
+        for job_id in list(self.jobs):
+            self.cancel(job_id)
+
+    def get_jobs(self):
+        """Tüm işleri eklenme sırasıyla döndürür"""
+        with self._lock:
+            return [self.jobs[job_id] for job_id in sorted(self.jobs)]
+
+    @property
+    def pending_count(self):
+        with self._lock:
+            return len(self._queue)
+
+    @property
+    def running_count(self):
+        with self._lock:
+            return len(self._running)
+
+    @property
+    def muxing_count(self):
+        with self._lock:
+            return len(self._muxing)
+
+    def wait(self, timeout=None):
+        """Kuyruk boşalıp çalışan iş kalmayana kadar bekler"""
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._queue and not self._running and not self._muxing, timeout)
+
+    def _dispatch(self):
+        """Boş iş yuvası varsa kuyruktaki işleri başlatır"""
+        started = []
+        with self._lock:
+            while self._queue and len(self._running) < self.max_concurrent_jobs:
+                job = self._next_job()
+                if job is None:
+                    break
+                job.state = DownloadJob.RUNNING
+                job.status = "Başlatılıyor..."
+                job.downloader = self._create_downloader(job)
+                self._running.add(job)
+                started.append(job)
+
+        for job in started:
+            self._notify_state(job)
+            job.downloader.start()
+
+    def _next_job(self):
+        """Aynı dosyaya yazan bir iş çalışmıyorsa kuyruktaki ilk işi çıkarır"""
+        # Aynı kesit iki kez eklenirse ikincisi birincinin hazırlık dizinini ve dosyasını paylaşmasın diye bekler
+        active = {job.output_target for job in self._running | self._muxing}
+        for job in self._queue:
+            if job.output_target is None or job.output_target not in active:
+                self._queue.remove(job)
+                return job
+        return None
+
+    def _create_downloader(self, job):
+        options = {'max_workers': self.segment_budget, 'mux_pool': self.mux_pool, 'buffer_pool': self.buffer_pool}
+        options.update(job.options)
+        # Kesit listesi gibi farklı iş türleri kendi sınıflarını seçebilir
+        downloader_class = options.pop('downloader_class', self.downloader_class)
+        return downloader_class(
+            url=job.url,
+            start_time=job.start_time,
+            end_time=job.end_time,
+            output_path=job.output_path,
+            progress_callback=lambda value: self._on_progress(job, value),
+            status_callback=lambda message: self._on_status(job, message),
+            complete_callback=lambda output_path: self._on_complete(job, output_path),
+            video_id=job.video_info.get('video_id'),
+            segment_semaphore=self.segment_semaphore,
+            finished_callback=lambda downloader: self._on_finished(job, downloader),
+            download_done_callback=lambda downloader: self._on_download_done(job),
+            **options
+        )
+
+    def _on_progress(self, job, value):
+        job.progress = value
+        if self.on_progress:
+            self.on_progress(job, value)
+
+    def _on_status(self, job, message):
+        job.status = message
+        if self.on_status:
+            self.on_status(job, message)
+
+    def _on_complete(self, job, output_path):
+        job.output_path = output_path
+        job.state = DownloadJob.COMPLETED
+        if self.on_complete:
+            self.on_complete(job, output_path)
+
+    def _on_download_done(self, job):
+        """İş dönüştürme aşamasına geçti; yuvası kuyruktaki bir sonraki işe verilir"""
+        with self._lock:
+            self._running.discard(job)
+            self._muxing.add(job)
+            job.state = DownloadJob.MUXING
+
+        self._notify_state(job)
+        self._dispatch()
+
+    def _on_finished(self, job, downloader):
+        with self._lock:
+            self._running.discard(job)
+            self._muxing.discard(job)
+            if not downloader.completed:
+                # Kullanıcı durdurduysa iptal, aksi halde son durum mesajı hata nedenidir
+                job.state = DownloadJob.CANCELLED if downloader.stop_requested else DownloadJob.FAILED
+            self._idle.notify_all()
+
+        self._notify_state(job)
+        self._dispatch()
+
+    def _notify_state(self, job):
+        if self.on_state_change:
+            self.on_state_change(job)
@@ -0,0 +1,151 @@
+import os
+import shutil
+import hashlib
+import threading
+from collections import OrderedDict
+from utils import get_app_data_directory
+
+
+class SegmentCache:
+    """İşler arasında paylaşılan, boyutu sınırlı LRU segment önbelleği"""
+    DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or os.path.join(get_app_data_directory(), "cache", "segments")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._pins = {}
+        # Dosya adı -> boyut, en eski kullanılan başta
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._load_index()
+
+    def _load_index(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".ts"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, name, stat.st_size))
+
+        for _, name, size in sorted(entries):
+            self._entries[name] = size
+            self._total_bytes += size
+
+    def _name(self, segment_url):
+        # Segmentin tam URL'si VOD'u, kaliteyi ve segment sırasını birlikte belirler
+        return hashlib.sha1(segment_url.encode('utf-8')).hexdigest() + ".ts"
+
+    def pin(self, segment_urls):
+        """Çalışan işin kullandığı segmentleri iş bitene kadar tahliyeye karşı korur"""
+        with self._lock:
+            for segment_url in segment_urls:
+                name = self._name(segment_url)
+                self._pins[name] = self._pins.get(name, 0) + 1
+
+    def unpin(self, segment_urls):
+        with self._lock:
+            for segment_url in segment_urls:
+                name = self._name(segment_url)
+                count = self._pins.get(name, 0) - 1
+                if count > 0:
+                    self._pins[name] = count
+                else:
+                    self._pins.pop(name, None)
+        self._evict()
+
+    def fetch(self, segment_url, dest_path):
+        """Segment önbellekteyse dest_path'e bağlar/kopyalar ve True döndürür"""
+        name = self._name(segment_url)
+        path = os.path.join(self.cache_dir, name)
+        with self._lock:
+            if name not in self._entries:
+                return False
+            self._entries.move_to_end(name)
+
+        try:
+            _link_or_copy(path, dest_path)
+            os.utime(path)
+        except OSError:
+            # Dosya başka bir süreç tarafından silinmiş olabilir
+            self._forget(name)
+            return False
+        return True
+
+    def store(self, segment_url, source_path):
+        """İndirilen segmenti önbelleğe ekler"""
+        name = self._name(segment_url)
+        path = os.path.join(self.cache_dir, name)
+        with self._lock:
+            if name in self._entries:
+                self._entries.move_to_end(name)
+                return
+
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            _link_or_copy(source_path, temp_path)
+            os.replace(temp_path, path)
+            size = os.path.getsize(path)
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return
+
+        with self._lock:
+            if name not in self._entries:
+                self._entries[name] = size
+                self._total_bytes += size
+        self._evict()
+
+    def _forget(self, name):
+        with self._lock:
+            size = self._entries.pop(name, None)
+            if size is not None:
+                self._total_bytes -= size
+
+    def _evict(self):
+        """Boyut sınırı aşıldıysa sabitlenmemiş en eski segmentleri siler"""
+        victims = []
+        with self._lock:
+            for name in list(self._entries):
+                if self._total_bytes <= self.max_bytes:
+                    break
+                if name in self._pins:
+                    continue
+                self._total_bytes -= self._entries.pop(name)
+                victims.append(name)
+
+        for name in victims:
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+
+
+def _link_or_copy(source, dest):
+    """Aynı dosya sistemindeyse hard link oluşturur, değilse kopyalar"""
+    if os.path.exists(dest):
+        os.remove(dest)
+    try:
+        os.link(source, dest)
+    except OSError:
+        shutil.copyfile(source, dest)
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_segment_cache():
+    """Tüm işlerin paylaştığı segment önbelleğini döndürür"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = SegmentCache()
+        return _shared_cache
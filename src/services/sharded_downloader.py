@@ -0,0 +1,258 @@
+import os
+import json
+import queue
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from services.downloader import KickDownloader, preallocate
+from services.buffer_pool import BufferPool
+from services.job_manifest import JobManifest
+
+
+class ShardedKickDownloader(KickDownloader):
+    """Uzun aralıkları ardışık parçalara böler; her parça ayrı bir süreçte indirilip birleştirilir
+
+    TLS çözme ve dosya yazma tek çekirdeğe (GIL) bağlı kalmaz. Ana süreç parça
+    dosyalarını sırayla uç uca ekler ve FFmpeg dönüştürmesini yapar.
+    """
+    # Bundan kısa parçalarda süreç başlatma maliyeti kazancı aşar
+    MIN_SEGMENTS_PER_SHARD = 20
+    # Süreçlerden gelen ilerleme mesajları bu aralıkla beklenir
+    QUEUE_POLL_INTERVAL = 0.2
+
+    def __init__(self, url, start_time, end_time, output_path, progress_callback, status_callback,
+                 complete_callback, processes=None, **kwargs):
+        # Parçalar süreçlerde ayrı dosyalara yazılır, tek bir FFmpeg akışına aktarılamaz
+        kwargs['stream_to_muxer'] = False
+        super().__init__(url, start_time, end_time, output_path, progress_callback, status_callback,
+                         complete_callback, **kwargs)
+        self.processes = max(1, int(processes or os.cpu_count() or 1))
+        self._cancel_event = None
+
+    def stop(self, discard=False):
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+        super().stop(discard)
+
+    def _download_segments(self, segments, base_url, on_segment_done=None):
+        """Segmentleri parçalara bölüp süreç havuzunda indirir; parça dosyalarını sırasıyla döndürür"""
+        shard_count = min(self.processes, len(segments) // self.MIN_SEGMENTS_PER_SHARD)
+        if shard_count < 2:
+            return super()._download_segments(segments, base_url, on_segment_done)
+
+        segment_urls = self._get_segment_urls(segments, base_url)
+        total = len(segment_urls)
+        shards = []
+        for number in range(shard_count):
+            first = number * total // shard_count
+            last = (number + 1) * total // shard_count
+            shards.append({
+                'number': number,
+                'first': first,
+                'last': last,
+                'urls': segment_urls[first:last],
+                # Parça sınırları değişirse eski parçanın dosyaları yeniden kullanılmaz
+                'temp_dir': os.path.join(self.temp_dir, f"shard_{first:05d}_{last:05d}"),
+            })
+        self.status_callback(f"Toplam {total} segment {shard_count} süreçte indirilecek...")
+
+        options = {
+            'video_id': self.video_id,
+            'start_time': self.start_time,
+            'end_time': self.end_time,
+            'variant_url': self.variant_url,
+            'resumable': self.resumable,
+            # Zamanlayıcının segment bütçesi ve bellek bütçesi süreçlere bölünür
+            'max_workers': max(2, -(-self.max_workers // shard_count)),
+            'max_in_flight': max(2, -(-self.max_in_flight // shard_count)),
+            'memory_budget': self.buffer_pool.memory_budget // shard_count,
+            'chunk_size': self.chunk_size,
+            'timeout': self.timeout,
+            'hedge_requests': self.hedge_requests,
+        }
+
+        context = multiprocessing.get_context('spawn')
+        messages = context.Queue()
+        self._cancel_event = context.Event()
+        if not self.is_running:
+            self._cancel_event.set()
+
+        reader = threading.Thread(target=self._read_messages, args=(messages, total), daemon=True)
+        reader.start()
+        results = []
+        try:
+            with ProcessPoolExecutor(max_workers=shard_count, mp_context=context, initializer=_init_worker,
+                                     initargs=(messages, self._cancel_event)) as executor:
+                futures = [executor.submit(_download_shard, shard, options) for shard in shards]
+                for future in futures:
+                    try:
+                        results.append(future.result())
+                    except Exception as e:
+                        self.status_callback(f"Parça süreci hatası: {str(e)}")
+                        results.append(None)
+        finally:
+            messages.put(None)
+            reader.join()
+            messages.close()
+
+        failed = 0
+        for shard, result in zip(shards, results):
+            if result is None:
+                failed += len(shard['urls'])
+                continue
+            failed += result['failed']
+            with self._stats_lock:
+                self.segment_retries += result['retries']
+                self.hedged_segments += result['hedged']
+
+        if self.is_running:
+            self.failed_segments = failed
+        if failed or not self.is_running:
+            return []
+        return [result['path'] for result in results]
+
+    def _read_messages(self, messages, total):
+        """Süreçlerden gelen segment, ölçüm ve durum mesajlarını ana sürece aktarır"""
+        completed = 0
+        while True:
+            try:
+                message = messages.get(timeout=self.QUEUE_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            if message is None:
+                return
+
+            kind = message[0]
+            if kind == 'done':
+                completed += 1
+                if self.is_running:
+                    self.status_callback(f"Segment indiriliyor {completed}/{total}...")
+                    self.progress_callback(int((completed / total) * 50))
+            elif kind == 'segment':
+                _, index, fields = message
+                self.metrics.record_segment(index, **fields)
+            elif kind == 'status':
+                _, number, text = message
+                if self.is_running:
+                    self.status_callback(f"Parça {number + 1}: {text}")
+
+
+_messages = None
+_cancel_event = None
+
+
+def _init_worker(messages, cancel_event):
+    global _messages, _cancel_event
+    _messages = messages
+    _cancel_event = cancel_event
+
+
+def _shard_info(shard, options):
+    """Tamamlanmış parça dosyasının hangi varyant ve segment aralığına ait olduğu"""
+    return {'variant_url': options['variant_url'], 'first': shard['first'], 'last': shard['last']}
+
+
+def _is_reusable(shard_path, info_path, expected):
+    """Parça dosyası aynı varyant ve aralık için eksiksiz yazılmışsa True döndürür"""
+    try:
+        with open(info_path, 'r', encoding='utf-8') as f:
+            info = json.load(f)
+        size = os.path.getsize(shard_path)
+    except (OSError, ValueError):
+        return False
+    return all(info.get(key) == value for key, value in expected.items()) and info.get('size') == size
+
+
+def _download_shard(shard, options):
+    """Süreç havuzunda çalışır: parçanın segmentlerini indirir ve tek TS dosyasında birleştirir"""
+    temp_dir = shard['temp_dir']
+    shard_path = os.path.join(temp_dir, "shard.ts")
+    info_path = os.path.join(temp_dir, "shard.json")
+    expected = _shard_info(shard, options)
+    result = {'path': shard_path, 'failed': 0, 'retries': 0, 'hedged': 0}
+    os.makedirs(temp_dir, exist_ok=True)
+    if _is_reusable(shard_path, info_path, expected):
+        # Önceki denemede tamamlanmış parça
+        for _ in shard['urls']:
+            _messages.put(('done',))
+        return result
+    # Başka bir varyanta ait ya da bilgisi eksik parça yeniden indirilir
+    for path in (shard_path, info_path):
+        if os.path.exists(path):
+            os.remove(path)
+
+    def on_status(text):
+        # Segment başına ilerleme ana süreçte toplanır, sadece uyarı ve hatalar iletilir
+        if not text.startswith(("Segment indiriliyor", "Toplam")):
+            _messages.put(('status', shard['number'], text))
+
+    def on_metric(event):
+        if event['type'] == 'segment':
+            fields = {key: event[key] for key in ('retries', 'hedged', 'source', 'ok')}
+            fields.update(size=event['bytes'], latency=event['latency'])
+            _messages.put(('segment', shard['first'] + event['index'], fields))
+
+    downloader = KickDownloader(
+        None, options['start_time'], options['end_time'], shard_path,
+        lambda value: None, on_status, lambda path: None,
+        max_workers=options['max_workers'], max_in_flight=options['max_in_flight'],
+        chunk_size=options['chunk_size'], video_id=options['video_id'],
+        resumable=options['resumable'], use_cache=False,
+        # Disk önbelleğinin kilitleri süreç içidir, süreçler arasında paylaşılmaz
+        use_segment_cache=False,
+        connect_timeout=options['timeout'][0], read_timeout=options['timeout'][1],
+        hedge_requests=options['hedge_requests'],
+        buffer_pool=BufferPool(options['memory_budget'], buffer_size=options['chunk_size'])
+    )
+    downloader.metrics.add_listener(on_metric)
+    downloader.temp_dir = temp_dir
+    if options['resumable']:
+        downloader.manifest = JobManifest.load_or_create(
+            temp_dir, options['video_id'], options['start_time'], options['end_time'], options['variant_url']
+        )
+    downloader.is_running = not _cancel_event.is_set()
+
+    # Ana süreç iptal ederse süreçteki indirme de durdurulur
+    finished = threading.Event()
+
+    def watch_cancel():
+        while not finished.wait(ShardedKickDownloader.QUEUE_POLL_INTERVAL):
+            if _cancel_event.is_set():
+                downloader.stop()
+                return
+
+    threading.Thread(target=watch_cancel, daemon=True).start()
+    try:
+        segment_files = downloader._download_segment_urls(
+            shard['urls'], lambda index, segment_file: _messages.put(('done',))
+        )
+    finally:
+        finished.set()
+
+    result.update(
+        failed=downloader.failed_segments if downloader.is_running else len(shard['urls']),
+        retries=downloader.segment_retries,
+        hedged=downloader.hedged_segments,
+    )
+    if result['failed'] or len(segment_files) != len(shard['urls']):
+        result['failed'] = result['failed'] or len(shard['urls']) - len(segment_files)
+        return result
+
+    # Yarım parça dosyası tamamlanmış sayılmasın diye önce geçici adla yazılır
+    part_path = shard_path + ".part"
+    with open(part_path, 'wb') as outfile:
+        preallocate(outfile, sum(os.path.getsize(path) for path in segment_files))
+        for path in segment_files:
+            with open(path, 'rb') as infile:
+                downloader.buffer_pool.copy(infile, outfile)
+    os.replace(part_path, shard_path)
+    # Parça bilgisi dosyadan sonra yazılır; bilgi varsa parça eksiksizdir
+    info_part = info_path + ".part"
+    with open(info_part, 'w', encoding='utf-8') as f:
+        json.dump({**expected, 'size': os.path.getsize(shard_path)}, f)
+    os.replace(info_part, info_path)
+
+    # Parça dosyası yazıldıktan sonra segmentlere gerek kalmaz, disk kullanımı artmaz
+    for path in segment_files:
+        os.remove(path)
+    return result
@@ -0,0 +1,108 @@
+import os
+import shutil
+import subprocess
+from services.ffmpeg_probe import get_ffmpeg
+
+
+class MuxError(Exception):
+    """Akış halinde birleştirme sırasında oluşan hata"""
+
+
+def is_ffmpeg_available():
+    """Sistemde çalıştırılabilir bir FFmpeg olup olmadığını döndürür (sonuç önbellektedir)"""
+    return get_ffmpeg().available
+
+
+class StreamMuxer:
+    """Sıralı segment verisini FFmpeg'in stdin'ine (ya da doğrudan TS dosyasına) aktarır"""
+
+    def __init__(self, output_path, trim_args=None, log_dir=None, use_ffmpeg=True, chunk_size=64 * 1024,
+                 buffer_pool=None, fragmented=False):
+        self.output_path = output_path
+        self.trim_args = trim_args or []
+        # Parçalı MP4 her anahtar karede diske yazılır; süreç yarıda kesilse de dosya oynatılabilir kalır
+        self.fragmented = fragmented
+        self.log_path = os.path.join(log_dir, "ffmpeg.log") if log_dir else os.devnull
+        self.use_ffmpeg = use_ffmpeg
+        self.chunk_size = chunk_size
+        # Verilirse kopyalama paylaşımlı tampon havuzundan alınan tamponla yapılır
+        self.buffer_pool = buffer_pool
+        self.process = None
+        self.sink = None
+        self._log_file = None
+
+    def open(self):
+        if not self.use_ffmpeg:
+            # FFmpeg yoksa segmentler TS olarak doğrudan çıktı dosyasına eklenir
+            self.sink = open(self.output_path, 'wb')
+            return
+
+        ffmpeg = get_ffmpeg()
+        cmd = [
+            ffmpeg.path or 'ffmpeg',
+            '-hide_banner',
+            '-f', 'mpegts',
+            '-i', 'pipe:0',
+            *self.trim_args,
+            '-c:v', 'copy',
+            *ffmpeg.audio_codec_args(),
+            *(['-movflags', 'frag_keyframe+empty_moov', '-f', 'mp4'] if self.fragmented else []),
+            '-y',  # Varolan dosyanın üzerine yaz
+            self.output_path
+        ]
+        # stderr dolup FFmpeg'i kilitlemesin diye dosyaya yönlendirilir
+        self._log_file = open(self.log_path, 'wb')
+        self.process = subprocess.Popen(
+            cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=self._log_file
+        )
+        self.sink = self.process.stdin
+
+    def write_file(self, path):
+        """Segment dosyasının içeriğini akışa yazar"""
+        try:
+            with open(path, 'rb') as infile:
+                if self.buffer_pool:
+                    self.buffer_pool.copy(infile, self.sink)
+                else:
+                    shutil.copyfileobj(infile, self.sink, self.chunk_size)
+        except (OSError, ValueError) as e:
+            # Kapanmış stdin POSIX'te BrokenPipeError, Windows'ta OSError(EINVAL) verir
+            raise MuxError(f"FFmpeg akışı kapandı: {self._read_log() or str(e)}")
+
+    def finish(self):
+        """Akışı kapatır ve dönüştürmenin bitmesini bekler"""
+        try:
+            self.sink.close()
+        except OSError:
+            pass
+
+        if not self.process:
+            return
+
+        returncode = self.process.wait()
+        self._close_log()
+        if returncode != 0:
+            raise MuxError(self._read_log() or f"FFmpeg çıkış kodu: {returncode}")
+
+    def abort(self):
+        """Yarım kalan akışı sonlandırır"""
+        try:
+            self.sink.close()
+        except (OSError, AttributeError):
+            pass
+        if self.process and self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+        self._close_log()
+
+    def _close_log(self):
+        if self._log_file:
+            self._log_file.close()
+            self._log_file = None
+
+    def _read_log(self):
+        if self.log_path == os.devnull or not os.path.exists(self.log_path):
+            return ""
+        with open(self.log_path, 'r', encoding='utf-8', errors='replace') as f:
+            # Sadece son satırlar hata nedenini anlatır
+            return f.read()[-500:].strip()
@@ -0,0 +1,139 @@
+import os
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from services.http_session import get_session
+from utils import get_app_data_directory
+
+
+class ThumbnailCache:
+    """Geçmiş listesi için küçültülmüş küçük resimleri yerelde saklar"""
+    DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+    # Liste öğeleri 100x60; yüksek DPI ekranlar için iki katı saklanır
+    THUMBNAIL_SIZE = (200, 120)
+    MAX_WORKERS = 2
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES, session=None):
+        self.cache_dir = cache_dir or os.path.join(get_app_data_directory(), "thumbnails")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.session = session or get_session()
+        self._lock = threading.Lock()
+        # URL -> bekleyen geri çağrılar; aynı resim için tek istek atılır
+        self._pending = {}
+        self._executor = ThreadPoolExecutor(max_workers=self.MAX_WORKERS, thread_name_prefix="thumbnail")
+
+    def _path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode('utf-8')).hexdigest() + ".jpg")
+
+    def get(self, url):
+        """Önbellekteki yerel dosya yolunu döndürür, yoksa None"""
+        if not url:
+            return None
+        path = self._path(url)
+        if not os.path.exists(path):
+            return None
+        # LRU tahliyesi için erişim zamanını güncelle
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+
+    def request(self, url, callback):
+        """Resmi arka planda indirir; hazır olunca callback(yerel_yol) çağrılır"""
+        if not url:
+            return
+        with self._lock:
+            if url in self._pending:
+                self._pending[url].append(callback)
+                return
+            self._pending[url] = [callback]
+        self._executor.submit(self._fetch, url)
+
+    def _fetch(self, url):
+        path = None
+        try:
+            response = self.session.get(url, timeout=(10, 30))
+            if response.status_code == 200 and response.content:
+                path = self._store(url, response.content)
+        except Exception as e:
+            print(f"Küçük resim indirilemedi: {str(e)}")
+
+        with self._lock:
+            callbacks = self._pending.pop(url, [])
+        if path:
+            for callback in callbacks:
+                try:
+                    callback(path)
+                except Exception as e:
+                    print(f"Küçük resim geri çağrı hatası: {str(e)}")
+
+    def _store(self, url, data):
+        # Küçültülemeyen resim önbelleğe alınmaz; tam boyutlu kopya bellek ve disk harcar
+        data = self._downscale(data)
+        if data is None:
+            return None
+        path = self._path(url)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        self._evict()
+        return path
+
+    def _downscale(self, data):
+        """Resmi küçültüp JPEG olarak döndürür; Pillow yoksa veya resim okunamazsa None"""
+        try:
+            from PIL import Image
+        except ImportError:
+            print("Küçük resim küçültülemedi: Pillow kurulu değil")
+            return None
+
+        import io
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                image = image.convert('RGB')
+                image.thumbnail(self.THUMBNAIL_SIZE)
+                output = io.BytesIO()
+                image.save(output, format='JPEG', quality=85)
+                return output.getvalue()
+        except Exception as e:
+            print(f"Küçük resim küçültülemedi: {str(e)}")
+            return None
+
+    def _evict(self):
+        """Toplam boyut sınırı aşılırsa en uzun süredir kullanılmayan resimleri siler"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".jpg"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, path, stat.st_size))
+
+        total = sum(size for _, _, size in entries)
+        for _, path, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_thumbnail_cache():
+    """Uygulama genelinde paylaşılan küçük resim önbelleğini döndürür"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ThumbnailCache()
+        return _cache
@@ -0,0 +1,39 @@
+import bisect
+
+
+class SegmentTimeline:
+    """Segment EXTINF sürelerinden oluşturulan kümülatif zaman indeksi"""
+
+    def __init__(self, segments, default_duration=6):
+        # offsets[i] = i. segmentin başlangıç zamanı, offsets[-1] = toplam süre
+        self.offsets = [0.0]
+        for segment in segments:
+            duration = segment.duration if segment.duration else default_duration
+            self.offsets.append(self.offsets[-1] + float(duration))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def total_duration(self):
+        return self.offsets[-1]
+
+    def segment_start(self, index):
+        """Segmentin yayın içindeki başlangıç zamanını döndürür"""
+        return self.offsets[index]
+
+    def find_range(self, start_time, end_time):
+        """[start_time, end_time] aralığını kapsayan segmentlerin [ilk, son) indekslerini döndürür"""
+        count = len(self)
+        if count == 0:
+            return 0, 0
+
+        # start_time'ı içeren segment: başlangıcı start_time'dan küçük/eşit olan son segment
+        first = bisect.bisect_right(self.offsets, start_time) - 1
+        first = min(max(first, 0), count - 1)
+
+        # end_time'dan önce başlayan son segmente kadar (dahil)
+        last = bisect.bisect_left(self.offsets, end_time, lo=first + 1)
+        last = min(max(last, first + 1), count)
+
+        return first, last
@@ -40,7 +40,7 @@ def create_app_bar(page, minimize_app, close_app):
 
 def create_download_dialog(url_input, start_time, end_time, output_dir_text, title_input, progress_bar, 
                           status_text, download_button, cancel_button, 
-                          cancel_download, start_download, reset_form):
+                          cancel_download, start_download, reset_form, quality_input=None):
     """İndirme diyalog penceresini oluşturur"""
     return ft.AlertDialog(
         modal=True,
@@ -62,7 +62,8 @@ def create_download_dialog(url_input, start_time, end_time, output_dir_text, tit
                 ft.Text("Süre:", weight=ft.FontWeight.BOLD),
                 ft.Row([
                     start_time,
-                    end_time
+                    end_time,
+                    *([quality_input] if quality_input else [])
                 ]),
                 
                 ft.Text("Başlık (İsteğe Bağlı):", weight=ft.FontWeight.BOLD),
@@ -111,7 +112,35 @@ def create_download_dialog(url_input, start_time, end_time, output_dir_text, tit
         on_dismiss=lambda e: reset_form()
     )
 
-def create_download_history_item(history_item, on_click_handler, open_folder_handler=None, delete_handler=None):
+def create_thumbnail(thumbnail_url, thumbnail_cache=None, width=100, height=60):
+    """Yerel önbellekteki küçük resmi gösterir; yoksa yer tutucu gösterip arka planda indirir"""
+    local_path = thumbnail_cache.get(thumbnail_url) if thumbnail_cache else None
+    if local_path:
+        return ft.Image(src=local_path, width=width, height=height, fit=ft.ImageFit.COVER)
+    
+    # Yer tutucu ağ gerektirmez
+    container = ft.Container(
+        ft.Icon(ft.icons.MOVIE, color=ft.colors.GREY),
+        width=width,
+        height=height,
+        bgcolor=ft.colors.with_opacity(0.1, ft.colors.WHITE),
+        alignment=ft.alignment.center
+    )
+    
+    def show_thumbnail(path):
+        container.content = ft.Image(src=path, width=width, height=height, fit=ft.ImageFit.COVER)
+        try:
+            container.update()
+        except Exception:
+            # Öğe listeden kaldırılmış olabilir
+            pass
+    
+    if thumbnail_cache and thumbnail_url:
+        thumbnail_cache.request(thumbnail_url, show_thumbnail)
+    return container
+
+def create_download_history_item(history_item, on_click_handler, open_folder_handler=None, delete_handler=None,
+                                 thumbnail_cache=None):
     """İndirme geçmişi öğesi oluşturur"""
     # Tarih biçimlendirme
     try:
@@ -120,11 +149,6 @@ def create_download_history_item(history_item, on_click_handler, open_folder_han
     except:
         date_str = "Bilinmeyen tarih"
     
-    # Thumbnail veya varsayılan
-    thumbnail_url = history_item.get('thumbnail')
-    if not thumbnail_url:
-        thumbnail_url = "https://via.placeholder.com/150?text=No+Thumbnail"
-    
     # Başlık
     title = f"{history_item.get('streamer', '')}: {history_item.get('title', 'İsimsiz Yayın')}"
     
@@ -150,55 +174,13 @@ def create_download_history_item(history_item, on_click_handler, open_folder_han
     )
     
     return ft.ListTile(
-        leading=ft.Image(src=thumbnail_url, width=100, height=60, fit=ft.ImageFit.COVER),
+        leading=create_thumbnail(history_item.get('thumbnail'), thumbnail_cache),
         title=ft.Text(title, size=14),
         subtitle=ft.Text(date_str, size=12),
         on_click=lambda e: on_click_handler(file_path),
         trailing=menu_button
     )
 
-def create_recent_downloads_list(history_items, open_file_handler, open_folder_handler=None, delete_handler=None):
-    """Son indirilen videoları içeren listeyi oluşturur"""
-    list_items = []
-    
-    # Başlık ekle
-    list_items.append(
-        ft.Container(
-            ft.Text("Son İndirilenler", size=16),
-            padding=ft.Padding(
-                left=14,
-                top=10,
-                right=0,
-                bottom=10
-            )
-        )
-    )
-    
-    # Geçmiş öğeleri yoksa mesaj göster
-    if not history_items:
-        list_items.append(
-            ft.Container(
-                ft.Text("Henüz indirilmiş video bulunmuyor", 
-                      italic=True, 
-                      color=ft.colors.GREY),
-                padding=ft.padding.only(left=20, top=10)
-            )
-        )
-    else:
-        # Her geçmiş öğesi için bir liste öğesi oluştur
-        for item in history_items:
-            list_items.append(create_download_history_item(
-                item, 
-                open_file_handler,
-                open_folder_handler,
-                delete_handler
-            ))
-    
-    return ft.SafeArea(
-        ft.Column(controls=list_items),
-        expand=True,
-    )
-
 def open_local_file(path):
     """Sistem dosya yöneticisinde dosyayı açar"""
     if os.path.exists(path):
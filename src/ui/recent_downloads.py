@@ -0,0 +1,136 @@
+import threading
+import flet as ft
+from ui.components import create_download_history_item
+from services.thumbnail_cache import get_thumbnail_cache
+
+
+class RecentDownloadsList:
+    """Son indirilenleri sayfa sayfa yükleyen, tekil ekleme/silme ile güncellenen liste"""
+    DEFAULT_PAGE_SIZE = 30
+    # Listenin sonuna bu kadar piksel kala sonraki sayfa yüklenir
+    LOAD_MORE_THRESHOLD = 300
+    ITEM_EXTENT = 76
+
+    def __init__(self, load_page, open_file_handler, open_folder_handler=None, delete_handler=None,
+                 page_size=DEFAULT_PAGE_SIZE, thumbnail_cache=None):
+        self.load_page = load_page  # load_page(offset, limit) -> kayıt listesi
+        self.open_file_handler = open_file_handler
+        self.open_folder_handler = open_folder_handler
+        self.delete_handler = delete_handler
+        self.page_size = page_size
+        # Küçük resimler ağdan bir kez alınır, liste yerel dosyaları gösterir
+        self.thumbnail_cache = thumbnail_cache or get_thumbnail_cache()
+        self._lock = threading.Lock()
+        # dosya yolu -> liste öğesi; aynı dosya tekrar indirildiğinde eski öğe değiştirilir
+        self._items = {}
+        self._loaded = 0
+        self._has_more = True
+
+        self.empty_text = ft.Container(
+            ft.Text("Henüz indirilmiş video bulunmuyor",
+                    italic=True,
+                    color=ft.colors.GREY),
+            padding=ft.padding.only(left=20, top=10),
+            visible=False
+        )
+        # item_extent ile ListView sadece görünen öğeleri çizer
+        self.list_view = ft.ListView(
+            expand=True,
+            item_extent=self.ITEM_EXTENT,
+            on_scroll=self._on_scroll,
+            on_scroll_interval=100
+        )
+        self.control = ft.SafeArea(
+            ft.Column(
+                controls=[
+                    ft.Container(
+                        ft.Text("Son İndirilenler", size=16),
+                        padding=ft.Padding(
+                            left=14,
+                            top=10,
+                            right=0,
+                            bottom=10
+                        )
+                    ),
+                    self.empty_text,
+                    self.list_view,
+                ],
+                expand=True
+            ),
+            expand=True,
+        )
+
+        self._load_next_page()
+        self.empty_text.visible = not self._items
+
+    def _create_item(self, history_item):
+        return create_download_history_item(
+            history_item,
+            self.open_file_handler,
+            self.open_folder_handler,
+            self.delete_handler,
+            self.thumbnail_cache
+        )
+
+    def _load_next_page(self):
+        """Sonraki sayfayı listenin sonuna ekler; yeni öğe eklendiyse True döndürür"""
+        with self._lock:
+            if not self._has_more:
+                return False
+            rows = self.load_page(self._loaded, self.page_size)
+            self._loaded += len(rows)
+            self._has_more = len(rows) == self.page_size
+            added = False
+            for row in rows:
+                key = row.get('file_path')
+                if key in self._items:
+                    continue
+                item = self._create_item(row)
+                self._items[key] = item
+                self.list_view.controls.append(item)
+                added = True
+            return added
+
+    def _on_scroll(self, e):
+        if e.max_scroll_extent is None or e.pixels < e.max_scroll_extent - self.LOAD_MORE_THRESHOLD:
+            return
+        if self._load_next_page():
+            self._update()
+
+    def insert(self, history_item):
+        """Yeni indirmeyi listenin başına ekler"""
+        key = history_item.get('file_path')
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self.list_view.controls.remove(previous)
+            else:
+                # Veritabanında yeni kayıt en başa geldi, sonraki sayfanın başlangıcı kayar
+                self._loaded += 1
+            item = self._create_item(history_item)
+            self._items[key] = item
+            self.list_view.controls.insert(0, item)
+            self.empty_text.visible = False
+        self._update()
+
+    def remove(self, file_path):
+        """Silinen indirmeyi listeden çıkarır"""
+        with self._lock:
+            item = self._items.pop(file_path, None)
+            if item is None:
+                return
+            self.list_view.controls.remove(item)
+            self._loaded = max(0, self._loaded - 1)
+            self.empty_text.visible = not self._items
+            needs_more = self._has_more and len(self._items) < self.page_size
+        # Liste kısaldıysa görünür alanı doldurmak için sonraki sayfayı getir
+        if needs_more:
+            self._load_next_page()
+        self._update()
+
+    def _update(self):
+        try:
+            self.control.update()
+        except Exception as e:
+            # Kontrol henüz sayfaya eklenmemiş olabilir
+            print(f"Liste güncelleme hatası: {str(e)}")
@@ -0,0 +1,68 @@
+import time
+import threading
+
+
+class UIUpdateDispatcher:
+    """Kontrol değişikliklerini biriktirip sabit kare hızında tek seferde gönderir"""
+    DEFAULT_FPS = 10
+
+    def __init__(self, page, fps=DEFAULT_FPS):
+        self.page = page
+        self.interval = 1.0 / max(1, fps)
+        # (kontrol kimliği, özellik) -> (kontrol, değer); aynı özelliğe gelen son değer kazanır
+        self._pending = {}
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._thread = None
+
+    def start(self):
+        if self._thread:
+            return
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+    def set(self, control, attribute, value):
+        """Kontrol özelliğini bir sonraki karede güncellenmek üzere işaretler"""
+        with self._condition:
+            self._pending[(id(control), attribute)] = (control, value)
+            self._condition.notify_all()
+
+    def discard(self, control):
+        """Kontrol için bekleyen güncellemeleri iptal eder (doğrudan değer atanmadan önce)"""
+        with self._condition:
+            for key in [key for key in self._pending if key[0] == id(control)]:
+                del self._pending[key]
+
+    def flush(self):
+        """Bekleyen tüm değişiklikleri uygular ve sadece değişen kontrolleri günceller"""
+        with self._condition:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        controls = {}
+        for (control_id, attribute), (control, value) in pending.items():
+            setattr(control, attribute, value)
+            controls[control_id] = control
+
+        try:
+            self.page.update(*controls.values())
+        except Exception as e:
+            # Sayfa kapanmış olabilir, dağıtıcı iş parçacığı ölmemeli
+            print(f"Arayüz güncelleme hatası: {str(e)}")
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._stopped)
+                if self._stopped:
+                    return
+            self.flush()
+            # Bir sonraki kareye kadar gelen değişiklikler birikir
+            time.sleep(self.interval)
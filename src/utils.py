@@ -1,9 +1,12 @@
 import re
-import requests
 import json
 import os
 import pathlib
 from datetime import datetime, timedelta
+from services.http_session import get_session
+
+# Benchmark ve testlerde yerel sunucuya yönlendirmek için değiştirilebilir
+KICK_API_BASE = os.environ.get("KICKVOD_API_BASE", "https://kick.com").rstrip('/')
 
 def time_str_to_seconds(time_str):
     """HH:MM:SS formatındaki zamanı saniyeye çevirir"""
@@ -27,29 +30,14 @@ def extract_video_id(url):
     return None
 
 
-def get_m3u8_url_from_kick_api(video_url):
+def get_m3u8_url_from_kick_api(video_url, use_cache=True):
     """Kick.com video URL'sinden m3u8 URL'sini alır"""
     video_id = extract_video_id(video_url)
     
     if not video_id:
         raise ValueError("Geçersiz Kick.com video URL'si. Video ID bulunamadı.")
     
-    # API isteği
-    api_url = f"https://kick.com/api/v1/video/{video_id}"
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Accept': 'application/json',
-        'Origin': 'https://kick.com',
-        'Referer': 'https://kick.com/'
-    }
-    
-    response = requests.get(api_url, headers=headers)
-    if response.status_code != 200:
-        raise ValueError(f"API isteği başarısız oldu. Durum kodu: {response.status_code}")
-    
-    # JSON verisini ayrıştır
-    data = response.json()
+    data = _fetch_video_data(video_id, use_cache)
     
     # başlık ve thumbnail bilgisini al
     if 'livestream' in data:
@@ -79,6 +67,79 @@ def get_m3u8_url_from_kick_api(video_url):
         raise ValueError("API yanıtında m3u8 URL'si bulunamadı")
 
 
+def extract_channel_slug(url):
+    """Kick.com kanal URL'sinden kanal adını çıkarır"""
+    match = re.search(r'kick\.com/([A-Za-z0-9_-]+)/?(?:$|\?)', url.strip())
+    if match:
+        return match.group(1)
+    # Sadece kanal adı verilmiş olabilir
+    if re.fullmatch(r'[A-Za-z0-9_-]+', url.strip()):
+        return url.strip()
+    return None
+
+
+def get_live_m3u8_url(channel_url):
+    """Yayındaki kanalın canlı m3u8 URL'sini ve yayın bilgisini alır"""
+    slug = extract_channel_slug(channel_url)
+    if not slug:
+        raise ValueError("Geçersiz Kick.com kanal URL'si.")
+    
+    # Canlı yayın bilgisi sürekli değiştiği için önbelleğe alınmaz
+    api_url = f"{KICK_API_BASE}/api/v2/channels/{slug}"
+    response = get_session().get(api_url, headers={'Accept': 'application/json'})
+    if response.status_code != 200:
+        raise ValueError(f"API isteği başarısız oldu. Durum kodu: {response.status_code}")
+    
+    data = response.json()
+    livestream = data.get('livestream') or {}
+    if not livestream or not data.get('playback_url'):
+        raise ValueError("Kanal şu anda yayında değil.")
+    
+    return data['playback_url'], {
+        'title': livestream.get('session_title', 'İsimsiz Yayın'),
+        'streamer': (data.get('user') or {}).get('username', slug),
+        'thumbnail': (livestream.get('thumbnail') or {}).get('url'),
+        'created_at': livestream.get('created_at', datetime.now().isoformat()),
+        'video_id': None
+    }
+
+
+def _fetch_video_data(video_id, use_cache=True):
+    """Video API yanıtını önbellekten ya da Kick API'sinden alır"""
+    from services.metadata_cache import get_metadata_cache
+    
+    api_url = f"{KICK_API_BASE}/api/v1/video/{video_id}"
+    cache = get_metadata_cache() if use_cache else None
+    
+    if cache:
+        data = cache.get(api_url)
+        if data is not None:
+            return data
+    
+    # Varsayılan başlıklar paylaşımlı oturumda tanımlı, sadece Accept değişir
+    response = get_session().get(api_url, headers={'Accept': 'application/json'})
+    if response.status_code != 200:
+        raise ValueError(f"API isteği başarısız oldu. Durum kodu: {response.status_code}")
+    
+    # JSON verisini ayrıştır
+    data = response.json()
+    
+    if cache:
+        # Yayını bitmiş VOD'ların bilgisi değişmez
+        is_live = (data.get('livestream') or {}).get('is_live', False)
+        cache.set(api_url, data, immutable=not is_live, video_id=video_id)
+    
+    return data
+
+
+def get_app_data_directory():
+    """Önbellek gibi uygulama verilerinin tutulduğu dizini döndürür, yoksa oluşturur"""
+    app_data_dir = pathlib.Path.home() / ".kickvod"
+    app_data_dir.mkdir(parents=True, exist_ok=True)
+    
+    return str(app_data_dir)
+
+
 def get_download_directory():
     """İndirme dizinini döndürür, yoksa oluşturur"""
     # Kullanıcının Documents klasörünü al
@@ -87,7 +148,7 @@ def get_download_directory():
     
     # kickvod klasörünü oluştur
     kickvod_dir = documents / "kickvod"
-    kickvod_dir.mkdir(exist_ok=True)
+    kickvod_dir.mkdir(parents=True, exist_ok=True)
     
     return str(kickvod_dir)
 
@@ -121,20 +182,19 @@ def get_download_path(video_info, start_time_seconds, end_time_seconds, custom_t
 
 
 class DownloadHistoryManager:
-    """İndirme geçmişini yönetir"""
+    """İndirme geçmişini yönetir (SQLite veritabanında, sınırsız saklama)"""
+    # Eski sürümlerin client storage'da tuttuğu JSON anahtarı (sadece taşıma için)
     HISTORY_KEY = "download_history"
-    MAX_HISTORY_ITEMS = 50
+    PAGE_SIZE = 50
     
-    def __init__(self, page):
+    def __init__(self, page, store=None):
+        from services.history_store import get_history_store
         self.page = page
+        self.store = store or get_history_store()
     
     def save_download(self, video_info, file_path, start_time, end_time):
-        """İndirme geçmişine yeni bir kayıt ekler"""
-        # Mevcut geçmişi al
-        history = self.get_history()
-        
-        # Yeni indirme bilgisini ekle
-        history.insert(0, {
+        """İndirme geçmişine yeni bir kayıt ekler ve eklenen kaydı döndürür"""
+        return self.store.add({
             'title': video_info.get('title', 'İsimsiz Yayın'),
             'streamer': video_info.get('streamer', 'bilinmeyen'),
             'thumbnail': video_info.get('thumbnail', None),
@@ -145,33 +205,47 @@ class DownloadHistoryManager:
             'end_time': end_time,
             'download_date': datetime.now().isoformat()
         })
-        
-        # Geçmişi sınırla (en son 50 indirme)
-        history = history[:self.MAX_HISTORY_ITEMS]
-        
-        # Client storage'a kaydet
-        self.page.client_storage.set(self.HISTORY_KEY, json.dumps(history))
-        
-        return history
     
-    def get_history(self):
-        """İndirme geçmişini döndürür"""
-        history_json = self.page.client_storage.get(self.HISTORY_KEY)
-        
-        if history_json:
-            try:
-                return json.loads(history_json)
-            except:
-                return []
-        else:
-            return []
+    def get_history(self, offset=0, limit=PAGE_SIZE):
+        """İndirme geçmişinin bir sayfasını en yeniden eskiye döndürür"""
+        return self.store.get_page(offset, limit)
+    
+    def get_count(self):
+        return self.store.count()
+    
+    def delete_download(self, file_path):
+        """Tek bir kaydı dosya yoluna göre siler"""
+        return self.store.delete(file_path)
     
     def clear_history(self):
         """İndirme geçmişini temizler"""
-        self.page.client_storage.remove(self.HISTORY_KEY)
+        self.store.clear()
+    
+    def migrate(self):
+        """Eski client storage ve dosya tabanlı geçmişi veritabanına taşır"""
+        migrated = self.migrate_from_client_storage()
+        return self.migrate_from_file() or migrated
+    
+    def migrate_from_client_storage(self):
+        """Client storage'daki JSON geçmişi veritabanına taşır"""
+        try:
+            history_json = self.page.client_storage.get(self.HISTORY_KEY)
+        except Exception as e:
+            print(f"Client storage okunamadı: {str(e)}")
+            return False
+        if not history_json:
+            return False
+        
+        try:
+            self.store.add_many(json.loads(history_json))
+            self.page.client_storage.remove(self.HISTORY_KEY)
+            return True
+        except Exception as e:
+            print(f"Geçmiş taşıma hatası: {str(e)}")
+            return False
         
     def migrate_from_file(self):
-        """Dosya tabanlı geçmişi client storage'a taşır"""
+        """Dosya tabanlı geçmişi veritabanına taşır"""
         download_dir = get_download_directory()
         history_file = os.path.join(download_dir, "download_history.json")
         
@@ -180,12 +254,12 @@ class DownloadHistoryManager:
                 with open(history_file, 'r', encoding='utf-8') as f:
                     history = json.load(f)
                     
-                # Client storage'a kaydet
-                self.page.client_storage.set(self.HISTORY_KEY, json.dumps(history))
+                # Veritabanına kaydet
+                self.store.add_many(history)
                 
                 # Eski dosyayı yedekle
                 backup_file = os.path.join(download_dir, "download_history.json.bak")
-                os.rename(history_file, backup_file)
+                os.replace(history_file, backup_file)
                 
                 return True
             except Exception as e:
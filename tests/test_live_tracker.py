@@ -0,0 +1,89 @@
+"""Canlı playlist takipçisinin yeni segmentleri, kaymaları ve yeniden başlamaları doğru ayırdığını doğrular"""
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+from services.live_recorder import LivePlaylistTracker
+
+BASE_URL = "https://cdn.example/live/"
+
+
+def playlist(first, count, discontinuity=None, ended=False):
+    lines = ["#EXTM3U", "#EXT-X-TARGETDURATION:2", f"#EXT-X-MEDIA-SEQUENCE:{first}"]
+    if discontinuity is not None:
+        lines.append(f"#EXT-X-DISCONTINUITY-SEQUENCE:{discontinuity}")
+    for sequence in range(first, first + count):
+        lines += ["#EXTINF:2.000,", f"seg_{sequence}.ts"]
+    if ended:
+        lines.append("#EXT-X-ENDLIST")
+    return "\n".join(lines)
+
+
+def sequences(segments):
+    return [sequence for sequence, _, _ in segments]
+
+
+def test_first_poll_returns_whole_window():
+    tracker = LivePlaylistTracker(BASE_URL)
+    segments = tracker.update(playlist(10, 4))
+
+    assert sequences(segments) == [10, 11, 12, 13]
+    assert segments[0][1] == BASE_URL + "seg_10.ts"
+    assert segments[0][2] == 2.0
+    assert tracker.target_duration == 2.0
+
+
+def test_only_new_segments_are_returned():
+    tracker = LivePlaylistTracker(BASE_URL)
+    tracker.update(playlist(10, 4))
+
+    assert sequences(tracker.update(playlist(12, 4))) == [14, 15]
+    assert tracker.update(playlist(12, 4)) == []
+    assert tracker.skipped == 0
+
+
+def test_lagging_edge_does_not_repeat_segments():
+    tracker = LivePlaylistTracker(BASE_URL)
+    tracker.update(playlist(10, 4))
+    tracker.update(playlist(12, 4))
+
+    # Geride kalan CDN sunucusu eski pencereyi döndürür; görülen segmentler tekrar gelmez
+    assert tracker.update(playlist(10, 4)) == []
+    assert tracker.window_start == 12
+    assert sequences(tracker.update(playlist(13, 4))) == [16]
+
+
+def test_restart_below_window_starts_over():
+    tracker = LivePlaylistTracker(BASE_URL)
+    tracker.update(playlist(100, 4))
+
+    # Yeni pencere öncekinin tamamen altında: yayın yeniden başladı
+    assert sequences(tracker.update(playlist(0, 3))) == [0, 1, 2]
+    assert tracker.window_start == 0
+    assert sequences(tracker.update(playlist(1, 3))) == [3]
+
+
+def test_discontinuity_change_starts_over():
+    tracker = LivePlaylistTracker(BASE_URL)
+    tracker.update(playlist(10, 4, discontinuity=0))
+
+    # Pencere örtüşse de süreksizlik sayacı değiştiyse playlist yenidir
+    assert sequences(tracker.update(playlist(11, 4, discontinuity=1))) == [11, 12, 13, 14]
+    assert tracker.discontinuity_sequence == 1
+
+
+def test_skipped_segments_are_counted():
+    tracker = LivePlaylistTracker(BASE_URL)
+    tracker.update(playlist(10, 4))
+
+    assert sequences(tracker.update(playlist(20, 4))) == [20, 21, 22, 23]
+    assert tracker.skipped == 6
+
+
+def test_endlist_marks_stream_ended():
+    tracker = LivePlaylistTracker(BASE_URL)
+    tracker.update(playlist(10, 4))
+
+    assert sequences(tracker.update(playlist(10, 5, ended=True))) == [14]
+    assert tracker.ended
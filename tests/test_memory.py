@@ -0,0 +1,63 @@
+"""Segment boyutu büyüdükçe indirme sürecinin bellek kullanımının sabit kaldığını doğrular"""
+import os
+import sys
+import json
+import subprocess
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(ROOT_DIR, "src")
+sys.path.insert(0, os.path.join(ROOT_DIR, "benchmarks"))
+from hls_server import HLSStandInServer, ServerConfig
+
+MB = 1024 * 1024
+
+# Sunucu test sürecinde çalışır; indirme ayrı süreçte ölçülür ki sunucunun bellekteki segmentleri sayılmasın
+DOWNLOAD_SCRIPT = """
+import sys, json, threading, tracemalloc
+sys.path.insert(0, sys.argv[1])
+from services.downloader import KickDownloader
+
+tracemalloc.start()
+finished = threading.Event()
+messages = []
+downloader = KickDownloader(
+    sys.argv[2], 0, 10 ** 6, sys.argv[3], lambda value: None, messages.append, lambda path: None,
+    use_cache=False, use_segment_cache=False, resumable=False,
+    finished_callback=lambda d: finished.set()
+)
+downloader.start()
+finished.wait(120)
+_, peak = tracemalloc.get_traced_memory()
+print(json.dumps({'completed': downloader.completed, 'peak': peak, 'status': messages[-1:]}))
+"""
+
+
+def measure_peak(tmp_path, segment_size):
+    server = HLSStandInServer(ServerConfig(segment_count=6, segment_size=segment_size, latency=0)).start()
+    try:
+        output_path = str(tmp_path / f"clip_{segment_size}.mp4")
+        env = dict(os.environ, HOME=str(tmp_path), PATH="")
+        process = subprocess.run(
+            [sys.executable, "-c", DOWNLOAD_SCRIPT, SRC_DIR, f"{server.base_url}/vod/master.m3u8", output_path],
+            capture_output=True, text=True, env=env, timeout=180
+        )
+    finally:
+        server.stop()
+
+    assert process.returncode == 0, process.stderr
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    assert result['completed'], result['status']
+    assert os.path.getsize(output_path) == 6 * segment_size
+    return result['peak']
+
+
+@pytest.mark.parametrize("small, large", [(1 * MB, 16 * MB)])
+def test_peak_memory_does_not_grow_with_segment_size(tmp_path, small, large):
+    small_peak = measure_peak(tmp_path, small)
+    large_peak = measure_peak(tmp_path, large)
+
+    # Segment gövdeleri parça parça diske yazılır; tek bir segment bile belleğe alınmamalı
+    assert large_peak < large
+    assert large_peak - small_peak < 2 * MB